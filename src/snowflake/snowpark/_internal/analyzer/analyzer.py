@@ -2,9 +2,10 @@
 #
 # Copyright (c) 2012-2024 Snowflake Computing Inc. All rights reserved.
 #
+import threading
 import uuid
 from collections import Counter, defaultdict
-from typing import TYPE_CHECKING, DefaultDict, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Callable, DefaultDict, Dict, List, Optional, Union
 
 import snowflake.snowpark
 from snowflake.snowpark._internal.analyzer.analyzer_utils import (
@@ -152,18 +153,105 @@ from snowflake.snowpark._internal.utils import quote_name
 from snowflake.snowpark.types import _NumericType
 
 ARRAY_BIND_THRESHOLD = 512
+# the default number of values above which local data is uploaded as a Parquet file
+LOCAL_DATA_UPLOAD_THRESHOLD = 100_000
 
 if TYPE_CHECKING:
     import snowflake.snowpark.session
 
 
+def _depends_on_analysis_context(expr: Expression) -> bool:
+    """Returns whether the SQL generated for ``expr``, not including the expressions in it,
+    depends on the state of the analyzer or on the dataframe aliases, or whether generating it
+    has side effects, e.g. registering generated aliases or sending telemetry."""
+    return (
+        isinstance(expr, (Attribute, Alias, ScalarSubquery))
+        or (isinstance(expr, (UnresolvedAttribute, Star)) and expr.df_alias is not None)
+        or getattr(expr, "api_call_source", None) is not None
+    )
+
+
+class TypeDispatcher:
+    """A registry of handlers keyed by class. A class without its own handler is handled by
+    the handler of the nearest class in its method resolution order, and the result of that
+    lookup is cached per class, so finding the handler of a node is a dictionary lookup."""
+
+    def __init__(self) -> None:
+        self._handlers: Dict[type, Callable] = {}
+        self._resolved: Dict[type, Optional[Callable]] = {}
+
+    def register(self, *types: type) -> Callable[[Callable], Callable]:
+        """Registers the decorated function as the handler of ``types`` and their subclasses."""
+
+        def decorator(handler: Callable) -> Callable:
+            for t in types:
+                self._handlers[t] = handler
+            self._resolved.clear()
+            return handler
+
+        return decorator
+
+    def lookup(self, cls: type) -> Optional[Callable]:
+        try:
+            return self._resolved[cls]
+        except KeyError:
+            handler = next(
+                (self._handlers[c] for c in cls.__mro__ if c in self._handlers), None
+            )
+            self._resolved[cls] = handler
+            return handler
+
+
+# Handlers take the analyzer, the expression, the dataframe aliases and parse_local_name,
+# and return the SQL of the expression.
+EXPRESSION_HANDLERS = TypeDispatcher()
+# Handlers take the analyzer, the logical plan, its resolved children and the dataframe
+# aliases, and return the SnowflakePlan of the logical plan.
+PLAN_HANDLERS = TypeDispatcher()
+
+
+class _AnalysisState(threading.local):
+    """The state of the plan that an :class:`Analyzer` is resolving. It's kept per thread, so
+    the actions run by :meth:`Session.run_concurrently` can resolve their plans at the same
+    time."""
+
+    def __init__(self) -> None:
+        self.generated_alias_maps = {}
+        self.subquery_plans = []
+        self.alias_maps_to_use: Optional[Dict[uuid.UUID, str]] = None
+        # the number of analyzed expressions whose SQL depends on the analysis context
+        self.context_dependent_analyses = 0
+
+
 class Analyzer:
     def __init__(self, session: "snowflake.snowpark.session.Session") -> None:
         self.session = session
         self.plan_builder = SnowflakePlanBuilder(self.session)
-        self.generated_alias_maps = {}
-        self.subquery_plans = []
-        self.alias_maps_to_use: Optional[Dict[uuid.UUID, str]] = None
+        self._state = _AnalysisState()
+
+    @property
+    def generated_alias_maps(self) -> Dict[uuid.UUID, str]:
+        return self._state.generated_alias_maps
+
+    @generated_alias_maps.setter
+    def generated_alias_maps(self, value: Dict[uuid.UUID, str]) -> None:
+        self._state.generated_alias_maps = value
+
+    @property
+    def subquery_plans(self) -> List[SnowflakePlan]:
+        return self._state.subquery_plans
+
+    @subquery_plans.setter
+    def subquery_plans(self, value: List[SnowflakePlan]) -> None:
+        self._state.subquery_plans = value
+
+    @property
+    def alias_maps_to_use(self) -> Optional[Dict[uuid.UUID, str]]:
+        return self._state.alias_maps_to_use
+
+    @alias_maps_to_use.setter
+    def alias_maps_to_use(self, value: Optional[Dict[uuid.UUID, str]]) -> None:
+        self._state.alias_maps_to_use = value
 
     def analyze(
         self,
@@ -171,373 +259,594 @@ class Analyzer:
         df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
         parse_local_name=False,
     ) -> str:
-        if isinstance(expr, GroupingSetsExpression):
-            return grouping_set_expression(
-                [
-                    [
-                        self.analyze(
-                            a, df_aliased_col_name_to_real_col_name, parse_local_name
-                        )
-                        for a in arg
-                    ]
-                    for arg in expr.args
-                ]
+        # The SQL of an expression is memoized in the expression, unless it, or any expression in
+        # it, depends on the state of this analyzer or on the dataframe aliases, or has side
+        # effects, so unchanged subexpressions are only analyzed once across plans.
+        if not isinstance(expr, Expression):
+            return self.do_analyze(
+                expr, df_aliased_col_name_to_real_col_name, parse_local_name
             )
+        if expr._analyzed_sql is not None and parse_local_name in expr._analyzed_sql:
+            return expr._analyzed_sql[parse_local_name]
+        context_dependent_analyses = self._state.context_dependent_analyses
+        sql = self.do_analyze(
+            expr, df_aliased_col_name_to_real_col_name, parse_local_name
+        )
+        if _depends_on_analysis_context(expr):
+            self._state.context_dependent_analyses += 1
+        elif self._state.context_dependent_analyses == context_dependent_analyses:
+            if expr._analyzed_sql is None:
+                expr._analyzed_sql = {}
+            expr._analyzed_sql[parse_local_name] = sql
+        return sql
+
+    def do_analyze(
+        self,
+        expr: Union[Expression, NamedExpression],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name=False,
+    ) -> str:
+        handler = EXPRESSION_HANDLERS.lookup(type(expr))
+        if handler is None:
+            raise SnowparkClientExceptionMessages.PLAN_INVALID_TYPE(
+                str(expr)
+            )  # pragma: no cover
+        return handler(
+            self, expr, df_aliased_col_name_to_real_col_name, parse_local_name
+        )
 
-        if isinstance(expr, Like):
-            return like_expression(
-                self.analyze(
-                    expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                self.analyze(
-                    expr.pattern, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-            )
+    @EXPRESSION_HANDLERS.register(GroupingSetsExpression)
+    def _analyze_grouping_sets_expression(
+        self,
+        expr: GroupingSetsExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return grouping_set_expression(
+            [
+                [
+                    self.analyze(
+                        a, df_aliased_col_name_to_real_col_name, parse_local_name
+                    )
+                    for a in arg
+                ]
+                for arg in expr.args
+            ]
+        )
 
-        if isinstance(expr, RegExp):
-            return regexp_expression(
-                self.analyze(
-                    expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                self.analyze(
-                    expr.pattern, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-            )
+    @EXPRESSION_HANDLERS.register(Like)
+    def _analyze_like(
+        self,
+        expr: Like,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return like_expression(
+            self.analyze(
+                expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            self.analyze(
+                expr.pattern, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+        )
 
-        if isinstance(expr, Collate):
-            collation_spec = (
-                expr.collation_spec.upper() if parse_local_name else expr.collation_spec
-            )
-            return collate_expression(
-                self.analyze(
-                    expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                collation_spec,
-            )
+    @EXPRESSION_HANDLERS.register(RegExp)
+    def _analyze_reg_exp(
+        self,
+        expr: RegExp,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return regexp_expression(
+            self.analyze(
+                expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            self.analyze(
+                expr.pattern, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+        )
 
-        if isinstance(expr, (SubfieldString, SubfieldInt)):
-            field = expr.field
-            if parse_local_name and isinstance(field, str):
-                field = field.upper()
-            return subfield_expression(
-                self.analyze(
-                    expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                field,
-            )
+    @EXPRESSION_HANDLERS.register(Collate)
+    def _analyze_collate(
+        self,
+        expr: Collate,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        collation_spec = (
+            expr.collation_spec.upper() if parse_local_name else expr.collation_spec
+        )
+        return collate_expression(
+            self.analyze(
+                expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            collation_spec,
+        )
 
-        if isinstance(expr, CaseWhen):
-            return case_when_expression(
-                [
-                    (
-                        self.analyze(
-                            condition,
-                            df_aliased_col_name_to_real_col_name,
-                            parse_local_name,
-                        ),
-                        self.analyze(
-                            value,
-                            df_aliased_col_name_to_real_col_name,
-                            parse_local_name,
-                        ),
-                    )
-                    for condition, value in expr.branches
-                ],
-                self.analyze(
-                    expr.else_value,
-                    df_aliased_col_name_to_real_col_name,
-                    parse_local_name,
-                )
-                if expr.else_value
-                else "NULL",
-            )
+    @EXPRESSION_HANDLERS.register(SubfieldString, SubfieldInt)
+    def _analyze_subfield(
+        self,
+        expr: Union[SubfieldString, SubfieldInt],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        field = expr.field
+        if parse_local_name and isinstance(field, str):
+            field = field.upper()
+        return subfield_expression(
+            self.analyze(
+                expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            field,
+        )
 
-        if isinstance(expr, MultipleExpression):
-            return block_expression(
-                [
+    @EXPRESSION_HANDLERS.register(CaseWhen)
+    def _analyze_case_when(
+        self,
+        expr: CaseWhen,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return case_when_expression(
+            [
+                (
                     self.analyze(
-                        expression,
+                        condition,
                         df_aliased_col_name_to_real_col_name,
                         parse_local_name,
-                    )
-                    for expression in expr.expressions
-                ]
-            )
-
-        if isinstance(expr, InExpression):
-            return in_expression(
-                self.analyze(
-                    expr.columns, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                [
+                    ),
                     self.analyze(
-                        expression,
+                        value,
                         df_aliased_col_name_to_real_col_name,
                         parse_local_name,
-                    )
-                    for expression in expr.values
-                ],
+                    ),
+                )
+                for condition, value in expr.branches
+            ],
+            self.analyze(
+                expr.else_value,
+                df_aliased_col_name_to_real_col_name,
+                parse_local_name,
             )
+            if expr.else_value
+            else "NULL",
+        )
 
-        if isinstance(expr, GroupingSet):
-            return self.grouping_extractor(expr, df_aliased_col_name_to_real_col_name)
-
-        if isinstance(expr, WindowExpression):
-            return window_expression(
-                self.analyze(
-                    expr.window_function,
-                    df_aliased_col_name_to_real_col_name,
-                    parse_local_name,
-                ),
+    @EXPRESSION_HANDLERS.register(MultipleExpression)
+    def _analyze_multiple_expression(
+        self,
+        expr: MultipleExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return block_expression(
+            [
                 self.analyze(
-                    expr.window_spec,
+                    expression,
                     df_aliased_col_name_to_real_col_name,
                     parse_local_name,
-                ),
-            )
-        if isinstance(expr, WindowSpecDefinition):
-            return window_spec_expression(
-                [
-                    self.analyze(
-                        x, df_aliased_col_name_to_real_col_name, parse_local_name
-                    )
-                    for x in expr.partition_spec
-                ],
-                [
-                    self.analyze(
-                        x, df_aliased_col_name_to_real_col_name, parse_local_name
-                    )
-                    for x in expr.order_spec
-                ],
+                )
+                for expression in expr.expressions
+            ]
+        )
+
+    @EXPRESSION_HANDLERS.register(InExpression)
+    def _analyze_in_expression(
+        self,
+        expr: InExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return in_expression(
+            self.analyze(
+                expr.columns, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            [
                 self.analyze(
-                    expr.frame_spec,
+                    expression,
                     df_aliased_col_name_to_real_col_name,
                     parse_local_name,
-                ),
-            )
-        if isinstance(expr, SpecifiedWindowFrame):
-            return specified_window_frame_expression(
-                expr.frame_type.sql,
-                self.window_frame_boundary(
-                    self.to_sql_avoid_offset(
-                        expr.lower, df_aliased_col_name_to_real_col_name
-                    )
-                ),
-                self.window_frame_boundary(
-                    self.to_sql_avoid_offset(
-                        expr.upper, df_aliased_col_name_to_real_col_name
-                    )
-                ),
-            )
-        if isinstance(expr, UnspecifiedFrame):
-            return ""
-        if isinstance(expr, SpecialFrameBoundary):
-            return expr.sql
+                )
+                for expression in expr.values
+            ],
+        )
 
-        if isinstance(expr, Literal):
-            sql = to_sql(expr.value, expr.datatype)
-            if parse_local_name:
-                sql = sql.upper()
-            return sql
-
-        if isinstance(expr, Interval):
-            return expr.sql
-
-        if isinstance(expr, Attribute):
-            assert self.alias_maps_to_use is not None
-            name = self.alias_maps_to_use.get(expr.expr_id, expr.name)
-            return quote_name(name)
-
-        if isinstance(expr, UnresolvedAttribute):
-            if expr.df_alias:
-                if expr.df_alias in df_aliased_col_name_to_real_col_name:
-                    return df_aliased_col_name_to_real_col_name[expr.df_alias].get(
-                        expr.name, expr.name
-                    )
-                else:
-                    raise SnowparkClientExceptionMessages.DF_ALIAS_NOT_RECOGNIZED(
-                        expr.df_alias
-                    )
-            return expr.name
+    @EXPRESSION_HANDLERS.register(GroupingSet)
+    def _analyze_grouping_set(
+        self,
+        expr: GroupingSet,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return self.grouping_extractor(expr, df_aliased_col_name_to_real_col_name)
+
+    @EXPRESSION_HANDLERS.register(WindowExpression)
+    def _analyze_window_expression(
+        self,
+        expr: WindowExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return window_expression(
+            self.analyze(
+                expr.window_function,
+                df_aliased_col_name_to_real_col_name,
+                parse_local_name,
+            ),
+            self.analyze(
+                expr.window_spec,
+                df_aliased_col_name_to_real_col_name,
+                parse_local_name,
+            ),
+        )
 
-        if isinstance(expr, FunctionExpression):
-            if expr.api_call_source is not None:
-                self.session._conn._telemetry_client.send_function_usage_telemetry(
-                    expr.api_call_source, TelemetryField.FUNC_CAT_USAGE.value
+    @EXPRESSION_HANDLERS.register(WindowSpecDefinition)
+    def _analyze_window_spec_definition(
+        self,
+        expr: WindowSpecDefinition,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return window_spec_expression(
+            [
+                self.analyze(x, df_aliased_col_name_to_real_col_name, parse_local_name)
+                for x in expr.partition_spec
+            ],
+            [
+                self.analyze(x, df_aliased_col_name_to_real_col_name, parse_local_name)
+                for x in expr.order_spec
+            ],
+            self.analyze(
+                expr.frame_spec,
+                df_aliased_col_name_to_real_col_name,
+                parse_local_name,
+            ),
+        )
+
+    @EXPRESSION_HANDLERS.register(SpecifiedWindowFrame)
+    def _analyze_specified_window_frame(
+        self,
+        expr: SpecifiedWindowFrame,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return specified_window_frame_expression(
+            expr.frame_type.sql,
+            self.window_frame_boundary(
+                self.to_sql_avoid_offset(
+                    expr.lower, df_aliased_col_name_to_real_col_name
                 )
-            func_name = expr.name.upper() if parse_local_name else expr.name
-            return function_expression(
-                func_name,
-                [
-                    self.to_sql_avoid_offset(c, df_aliased_col_name_to_real_col_name)
-                    for c in expr.children
-                ],
-                expr.is_distinct,
-            )
+            ),
+            self.window_frame_boundary(
+                self.to_sql_avoid_offset(
+                    expr.upper, df_aliased_col_name_to_real_col_name
+                )
+            ),
+        )
 
-        if isinstance(expr, Star):
-            if expr.df_alias:
-                # This is only hit by col(<df_alias>)
-                if expr.df_alias not in df_aliased_col_name_to_real_col_name:
-                    raise SnowparkClientExceptionMessages.DF_ALIAS_NOT_RECOGNIZED(
-                        expr.df_alias
-                    )
-                columns = df_aliased_col_name_to_real_col_name[expr.df_alias]
-                return ",".join(columns.values())
-            if not expr.expressions:
-                return "*"
+    @EXPRESSION_HANDLERS.register(UnspecifiedFrame)
+    def _analyze_unspecified_frame(
+        self,
+        expr: UnspecifiedFrame,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return ""
+
+    @EXPRESSION_HANDLERS.register(SpecialFrameBoundary)
+    def _analyze_special_frame_boundary(
+        self,
+        expr: SpecialFrameBoundary,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return expr.sql
+
+    @EXPRESSION_HANDLERS.register(Literal)
+    def _analyze_literal(
+        self,
+        expr: Literal,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        sql = to_sql(expr.value, expr.datatype)
+        if parse_local_name:
+            sql = sql.upper()
+        return sql
+
+    @EXPRESSION_HANDLERS.register(Interval)
+    def _analyze_interval(
+        self,
+        expr: Interval,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return expr.sql
+
+    @EXPRESSION_HANDLERS.register(Attribute)
+    def _analyze_attribute(
+        self,
+        expr: Attribute,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        assert self.alias_maps_to_use is not None
+        name = self.alias_maps_to_use.get(expr.expr_id, expr.name)
+        return quote_name(name)
+
+    @EXPRESSION_HANDLERS.register(UnresolvedAttribute)
+    def _analyze_unresolved_attribute(
+        self,
+        expr: UnresolvedAttribute,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        if expr.df_alias:
+            if expr.df_alias in df_aliased_col_name_to_real_col_name:
+                return df_aliased_col_name_to_real_col_name[expr.df_alias].get(
+                    expr.name, expr.name
+                )
             else:
-                # This case is hit by df.col("*")
-                return ",".join(
-                    [
-                        self.analyze(e, df_aliased_col_name_to_real_col_name)
-                        for e in expr.expressions
-                    ]
+                raise SnowparkClientExceptionMessages.DF_ALIAS_NOT_RECOGNIZED(
+                    expr.df_alias
                 )
+        return expr.name
 
-        if isinstance(expr, SnowflakeUDF):
-            if expr.api_call_source is not None:
-                self.session._conn._telemetry_client.send_function_usage_telemetry(
-                    expr.api_call_source, TelemetryField.FUNC_CAT_USAGE.value
-                )
-            func_name = expr.udf_name.upper() if parse_local_name else expr.udf_name
-            return function_expression(
-                func_name,
-                [
-                    self.analyze(
-                        x, df_aliased_col_name_to_real_col_name, parse_local_name
-                    )
-                    for x in expr.children
-                ],
-                False,
+    @EXPRESSION_HANDLERS.register(FunctionExpression)
+    def _analyze_function_expression(
+        self,
+        expr: FunctionExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        if expr.api_call_source is not None:
+            self.session._conn._telemetry_client.send_function_usage_telemetry(
+                expr.api_call_source, TelemetryField.FUNC_CAT_USAGE.value
             )
+        func_name = expr.name.upper() if parse_local_name else expr.name
+        return function_expression(
+            func_name,
+            [
+                self.to_sql_avoid_offset(c, df_aliased_col_name_to_real_col_name)
+                for c in expr.children
+            ],
+            expr.is_distinct,
+        )
 
-        if isinstance(expr, TableFunctionExpression):
-            if expr.api_call_source is not None:
-                self.session._conn._telemetry_client.send_function_usage_telemetry(
-                    expr.api_call_source, TelemetryField.FUNC_CAT_USAGE.value
+    @EXPRESSION_HANDLERS.register(Star)
+    def _analyze_star(
+        self,
+        expr: Star,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        if expr.df_alias:
+            # This is only hit by col(<df_alias>)
+            if expr.df_alias not in df_aliased_col_name_to_real_col_name:
+                raise SnowparkClientExceptionMessages.DF_ALIAS_NOT_RECOGNIZED(
+                    expr.df_alias
                 )
-            return self.table_function_expression_extractor(
-                expr, df_aliased_col_name_to_real_col_name
-            )
-
-        if isinstance(expr, TableFunctionPartitionSpecDefinition):
-            return table_function_partition_spec(
-                expr.over,
-                [
-                    self.analyze(
-                        x, df_aliased_col_name_to_real_col_name, parse_local_name
-                    )
-                    for x in expr.partition_spec
-                ]
-                if expr.partition_spec
-                else [],
+            columns = df_aliased_col_name_to_real_col_name[expr.df_alias]
+            return ",".join(columns.values())
+        if not expr.expressions:
+            return "*"
+        else:
+            # This case is hit by df.col("*")
+            return ",".join(
                 [
-                    self.analyze(
-                        x, df_aliased_col_name_to_real_col_name, parse_local_name
-                    )
-                    for x in expr.order_spec
+                    self.analyze(e, df_aliased_col_name_to_real_col_name)
+                    for e in expr.expressions
                 ]
-                if expr.order_spec
-                else [],
             )
 
-        if isinstance(expr, UnaryExpression):
-            return self.unary_expression_extractor(
-                expr, df_aliased_col_name_to_real_col_name, parse_local_name
+    @EXPRESSION_HANDLERS.register(SnowflakeUDF)
+    def _analyze_snowflake_u_d_f(
+        self,
+        expr: SnowflakeUDF,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        if expr.api_call_source is not None:
+            self.session._conn._telemetry_client.send_function_usage_telemetry(
+                expr.api_call_source, TelemetryField.FUNC_CAT_USAGE.value
             )
+        func_name = expr.udf_name.upper() if parse_local_name else expr.udf_name
+        return function_expression(
+            func_name,
+            [
+                self.analyze(x, df_aliased_col_name_to_real_col_name, parse_local_name)
+                for x in expr.children
+            ],
+            False,
+        )
 
-        if isinstance(expr, SortOrder):
-            return order_expression(
-                self.analyze(
-                    expr.child, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                expr.direction.sql,
-                expr.null_ordering.sql,
+    @EXPRESSION_HANDLERS.register(TableFunctionExpression)
+    def _analyze_table_function_expression(
+        self,
+        expr: TableFunctionExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        if expr.api_call_source is not None:
+            self.session._conn._telemetry_client.send_function_usage_telemetry(
+                expr.api_call_source, TelemetryField.FUNC_CAT_USAGE.value
             )
+        return self.table_function_expression_extractor(
+            expr, df_aliased_col_name_to_real_col_name
+        )
 
-        if isinstance(expr, ScalarSubquery):
-            self.subquery_plans.append(expr.plan)
-            return subquery_expression(expr.plan.queries[-1].sql)
-
-        if isinstance(expr, WithinGroup):
-            return within_group_expression(
-                self.analyze(
-                    expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                [
-                    self.analyze(e, df_aliased_col_name_to_real_col_name)
-                    for e in expr.order_by_cols
-                ],
-            )
+    @EXPRESSION_HANDLERS.register(TableFunctionPartitionSpecDefinition)
+    def _analyze_table_function_partition_spec_definition(
+        self,
+        expr: TableFunctionPartitionSpecDefinition,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return table_function_partition_spec(
+            expr.over,
+            [
+                self.analyze(x, df_aliased_col_name_to_real_col_name, parse_local_name)
+                for x in expr.partition_spec
+            ]
+            if expr.partition_spec
+            else [],
+            [
+                self.analyze(x, df_aliased_col_name_to_real_col_name, parse_local_name)
+                for x in expr.order_spec
+            ]
+            if expr.order_spec
+            else [],
+        )
 
-        if isinstance(expr, BinaryExpression):
-            return self.binary_operator_extractor(
-                expr, df_aliased_col_name_to_real_col_name, parse_local_name
-            )
+    @EXPRESSION_HANDLERS.register(UnaryExpression)
+    def _analyze_unary_expression(
+        self,
+        expr: UnaryExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return self.unary_expression_extractor(
+            expr, df_aliased_col_name_to_real_col_name, parse_local_name
+        )
 
-        if isinstance(expr, InsertMergeExpression):
-            return insert_merge_statement(
-                self.analyze(expr.condition, df_aliased_col_name_to_real_col_name)
-                if expr.condition
-                else None,
-                [
-                    self.analyze(k, df_aliased_col_name_to_real_col_name)
-                    for k in expr.keys
-                ],
-                [
-                    self.analyze(v, df_aliased_col_name_to_real_col_name)
-                    for v in expr.values
-                ],
-            )
+    @EXPRESSION_HANDLERS.register(SortOrder)
+    def _analyze_sort_order(
+        self,
+        expr: SortOrder,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return order_expression(
+            self.analyze(
+                expr.child, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            expr.direction.sql,
+            expr.null_ordering.sql,
+        )
 
-        if isinstance(expr, UpdateMergeExpression):
-            return update_merge_statement(
-                self.analyze(expr.condition, df_aliased_col_name_to_real_col_name)
-                if expr.condition
-                else None,
-                {
-                    self.analyze(k, df_aliased_col_name_to_real_col_name): self.analyze(
-                        v, df_aliased_col_name_to_real_col_name
-                    )
-                    for k, v in expr.assignments.items()
-                },
-            )
+    @EXPRESSION_HANDLERS.register(ScalarSubquery)
+    def _analyze_scalar_subquery(
+        self,
+        expr: ScalarSubquery,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        self.subquery_plans.append(expr.plan)
+        return subquery_expression(expr.plan.queries[-1].sql)
 
-        if isinstance(expr, DeleteMergeExpression):
-            return delete_merge_statement(
-                self.analyze(expr.condition, df_aliased_col_name_to_real_col_name)
-                if expr.condition
-                else None
-            )
+    @EXPRESSION_HANDLERS.register(WithinGroup)
+    def _analyze_within_group(
+        self,
+        expr: WithinGroup,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return within_group_expression(
+            self.analyze(
+                expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            [
+                self.analyze(e, df_aliased_col_name_to_real_col_name)
+                for e in expr.order_by_cols
+            ],
+        )
 
-        if isinstance(expr, ListAgg):
-            return list_agg(
-                self.analyze(
-                    expr.col, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                str_to_sql(expr.delimiter),
-                expr.is_distinct,
-            )
+    @EXPRESSION_HANDLERS.register(BinaryExpression)
+    def _analyze_binary_expression(
+        self,
+        expr: BinaryExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return self.binary_operator_extractor(
+            expr, df_aliased_col_name_to_real_col_name, parse_local_name
+        )
 
-        if isinstance(expr, RankRelatedFunctionExpression):
-            return rank_related_function_expression(
-                expr.sql,
-                self.analyze(
-                    expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
-                ),
-                expr.offset,
-                self.analyze(
-                    expr.default, df_aliased_col_name_to_real_col_name, parse_local_name
+    @EXPRESSION_HANDLERS.register(InsertMergeExpression)
+    def _analyze_insert_merge_expression(
+        self,
+        expr: InsertMergeExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return insert_merge_statement(
+            self.analyze(expr.condition, df_aliased_col_name_to_real_col_name)
+            if expr.condition
+            else None,
+            [self.analyze(k, df_aliased_col_name_to_real_col_name) for k in expr.keys],
+            [
+                self.analyze(v, df_aliased_col_name_to_real_col_name)
+                for v in expr.values
+            ],
+        )
+
+    @EXPRESSION_HANDLERS.register(UpdateMergeExpression)
+    def _analyze_update_merge_expression(
+        self,
+        expr: UpdateMergeExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return update_merge_statement(
+            self.analyze(expr.condition, df_aliased_col_name_to_real_col_name)
+            if expr.condition
+            else None,
+            {
+                self.analyze(k, df_aliased_col_name_to_real_col_name): self.analyze(
+                    v, df_aliased_col_name_to_real_col_name
                 )
-                if expr.default
-                else None,
-                expr.ignore_nulls,
-            )
+                for k, v in expr.assignments.items()
+            },
+        )
+
+    @EXPRESSION_HANDLERS.register(DeleteMergeExpression)
+    def _analyze_delete_merge_expression(
+        self,
+        expr: DeleteMergeExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return delete_merge_statement(
+            self.analyze(expr.condition, df_aliased_col_name_to_real_col_name)
+            if expr.condition
+            else None
+        )
 
-        raise SnowparkClientExceptionMessages.PLAN_INVALID_TYPE(
-            str(expr)
-        )  # pragma: no cover
+    @EXPRESSION_HANDLERS.register(ListAgg)
+    def _analyze_list_agg(
+        self,
+        expr: ListAgg,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return list_agg(
+            self.analyze(
+                expr.col, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            str_to_sql(expr.delimiter),
+            expr.is_distinct,
+        )
+
+    @EXPRESSION_HANDLERS.register(RankRelatedFunctionExpression)
+    def _analyze_rank_related_function_expression(
+        self,
+        expr: RankRelatedFunctionExpression,
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+        parse_local_name: bool,
+    ) -> str:
+        return rank_related_function_expression(
+            expr.sql,
+            self.analyze(
+                expr.expr, df_aliased_col_name_to_real_col_name, parse_local_name
+            ),
+            expr.offset,
+            self.analyze(
+                expr.default, df_aliased_col_name_to_real_col_name, parse_local_name
+            )
+            if expr.default
+            else None,
+            expr.ignore_nulls,
+        )
 
     def table_function_expression_extractor(
         self,
@@ -709,6 +1018,13 @@ class Analyzer:
         self.subquery_plans = []
         self.generated_alias_maps = {}
 
+        if isinstance(logical_plan, SnowflakePlan):
+            # A SnowflakePlan, e.g. the plan of the DataFrame that a new DataFrame is built
+            # on, is already resolved and has no children, so it's returned as it is
+            # without going through do_resolve.
+            self.alias_maps_to_use = {}
+            return logical_plan
+
         result = self.do_resolve(logical_plan)
 
         result.add_aliases(self.generated_alias_maps)
@@ -766,412 +1082,568 @@ class Analyzer:
         resolved_children: Dict[LogicalPlan, SnowflakePlan],
         df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
     ) -> SnowflakePlan:
-        if isinstance(logical_plan, SnowflakePlan):
-            return logical_plan
-
-        if isinstance(logical_plan, TableFunctionJoin):
-            return self.plan_builder.join_table_function(
-                self.analyze(
-                    logical_plan.table_function, df_aliased_col_name_to_real_col_name
-                ),
-                resolved_children[logical_plan.children[0]],
-                logical_plan,
-                logical_plan.left_cols,
-                logical_plan.right_cols,
-                self.session.conf.get("use_constant_subquery_alias", False),
+        handler = PLAN_HANDLERS.lookup(type(logical_plan))
+        if handler is None:
+            raise TypeError(
+                f"Cannot resolve type logical_plan of {type(logical_plan).__name__} to a SnowflakePlan"
             )
+        return handler(
+            self, logical_plan, resolved_children, df_aliased_col_name_to_real_col_name
+        )
 
-        if isinstance(logical_plan, TableFunctionRelation):
-            return self.plan_builder.from_table_function(
-                self.analyze(
-                    logical_plan.table_function, df_aliased_col_name_to_real_col_name
-                ),
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(SnowflakePlan)
+    def _resolve_snowflake_plan(
+        self,
+        logical_plan: SnowflakePlan,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return logical_plan
 
-        if isinstance(logical_plan, Lateral):
-            return self.plan_builder.lateral(
-                self.analyze(
-                    logical_plan.table_function, df_aliased_col_name_to_real_col_name
-                ),
-                resolved_children[logical_plan.children[0]],
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(TableFunctionJoin)
+    def _resolve_table_function_join(
+        self,
+        logical_plan: TableFunctionJoin,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.join_table_function(
+            self.analyze(
+                logical_plan.table_function, df_aliased_col_name_to_real_col_name
+            ),
+            resolved_children[logical_plan.children[0]],
+            logical_plan,
+            logical_plan.left_cols,
+            logical_plan.right_cols,
+            self.session.conf.get("use_constant_subquery_alias", False),
+        )
 
-        if isinstance(logical_plan, Aggregate):
-            return self.plan_builder.aggregate(
-                [
-                    self.to_sql_avoid_offset(expr, df_aliased_col_name_to_real_col_name)
-                    for expr in logical_plan.grouping_expressions
-                ],
-                [
-                    self.analyze(expr, df_aliased_col_name_to_real_col_name)
-                    for expr in logical_plan.aggregate_expressions
-                ],
-                resolved_children[logical_plan.child],
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(TableFunctionRelation)
+    def _resolve_table_function_relation(
+        self,
+        logical_plan: TableFunctionRelation,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.from_table_function(
+            self.analyze(
+                logical_plan.table_function, df_aliased_col_name_to_real_col_name
+            ),
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, Project):
-            return self.plan_builder.project(
-                list(
-                    map(
-                        lambda x: self.analyze(x, df_aliased_col_name_to_real_col_name),
-                        logical_plan.project_list,
-                    )
-                ),
-                resolved_children[logical_plan.child],
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(Lateral)
+    def _resolve_lateral(
+        self,
+        logical_plan: Lateral,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.lateral(
+            self.analyze(
+                logical_plan.table_function, df_aliased_col_name_to_real_col_name
+            ),
+            resolved_children[logical_plan.children[0]],
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, Filter):
-            return self.plan_builder.filter(
-                self.analyze(
-                    logical_plan.condition, df_aliased_col_name_to_real_col_name
-                ),
-                resolved_children[logical_plan.child],
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(Aggregate)
+    def _resolve_aggregate(
+        self,
+        logical_plan: Aggregate,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.aggregate(
+            [
+                self.to_sql_avoid_offset(expr, df_aliased_col_name_to_real_col_name)
+                for expr in logical_plan.grouping_expressions
+            ],
+            [
+                self.analyze(expr, df_aliased_col_name_to_real_col_name)
+                for expr in logical_plan.aggregate_expressions
+            ],
+            resolved_children[logical_plan.child],
+            logical_plan,
+        )
+
+    @PLAN_HANDLERS.register(Project)
+    def _resolve_project(
+        self,
+        logical_plan: Project,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.project(
+            list(
+                map(
+                    lambda x: self.analyze(x, df_aliased_col_name_to_real_col_name),
+                    logical_plan.project_list,
+                )
+            ),
+            resolved_children[logical_plan.child],
+            logical_plan,
+        )
+
+    @PLAN_HANDLERS.register(Filter)
+    def _resolve_filter(
+        self,
+        logical_plan: Filter,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.filter(
+            self.analyze(logical_plan.condition, df_aliased_col_name_to_real_col_name),
+            resolved_children[logical_plan.child],
+            logical_plan,
+        )
 
+    @PLAN_HANDLERS.register(Sample)
+    def _resolve_sample(
+        self,
+        logical_plan: Sample,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
         # Add a sample stop to the plan being built
-        if isinstance(logical_plan, Sample):
-            return self.plan_builder.sample(
-                resolved_children[logical_plan.child],
-                logical_plan,
-                logical_plan.probability_fraction,
-                logical_plan.row_count,
-            )
+        return self.plan_builder.sample(
+            resolved_children[logical_plan.child],
+            logical_plan,
+            logical_plan.probability_fraction,
+            logical_plan.row_count,
+        )
 
-        if isinstance(logical_plan, Join):
-            join_condition = (
-                self.analyze(
-                    logical_plan.join_condition, df_aliased_col_name_to_real_col_name
-                )
-                if logical_plan.join_condition
-                else ""
-            )
-            match_condition = (
-                self.analyze(
-                    logical_plan.match_condition, df_aliased_col_name_to_real_col_name
-                )
-                if logical_plan.match_condition
-                else ""
+    @PLAN_HANDLERS.register(Join)
+    def _resolve_join(
+        self,
+        logical_plan: Join,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        join_condition = (
+            self.analyze(
+                logical_plan.join_condition, df_aliased_col_name_to_real_col_name
             )
-            return self.plan_builder.join(
-                resolved_children[logical_plan.left],
-                resolved_children[logical_plan.right],
-                logical_plan.join_type,
-                join_condition,
-                match_condition,
-                logical_plan,
-                self.session.conf.get("use_constant_subquery_alias", False),
+            if logical_plan.join_condition
+            else ""
+        )
+        match_condition = (
+            self.analyze(
+                logical_plan.match_condition, df_aliased_col_name_to_real_col_name
             )
+            if logical_plan.match_condition
+            else ""
+        )
+        return self.plan_builder.join(
+            resolved_children[logical_plan.left],
+            resolved_children[logical_plan.right],
+            logical_plan.join_type,
+            join_condition,
+            match_condition,
+            logical_plan,
+            self.session.conf.get("use_constant_subquery_alias", False),
+        )
 
-        if isinstance(logical_plan, Sort):
-            return self.plan_builder.sort(
-                [
-                    self.analyze(x, df_aliased_col_name_to_real_col_name)
-                    for x in logical_plan.order
-                ],
-                resolved_children[logical_plan.child],
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(Sort)
+    def _resolve_sort(
+        self,
+        logical_plan: Sort,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.sort(
+            [
+                self.analyze(x, df_aliased_col_name_to_real_col_name)
+                for x in logical_plan.order
+            ],
+            resolved_children[logical_plan.child],
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, SetOperation):
-            return self.plan_builder.set_operator(
-                resolved_children[logical_plan.left],
-                resolved_children[logical_plan.right],
-                logical_plan.sql,
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(SetOperation)
+    def _resolve_set_operation(
+        self,
+        logical_plan: SetOperation,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.set_operator(
+            resolved_children[logical_plan.left],
+            resolved_children[logical_plan.right],
+            logical_plan.sql,
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, Range):
-            # schema of Range. Since this corresponds to the Snowflake column "id"
-            # (quoted lower-case) it's a little hard for users. So we switch it to
-            # the column name "ID" == id == Id
-            return self.plan_builder.query(
-                range_statement(
-                    logical_plan.start, logical_plan.end, logical_plan.step, "id"
-                ),
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(Range)
+    def _resolve_range(
+        self,
+        logical_plan: Range,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        # schema of Range. Since this corresponds to the Snowflake column "id"
+        # (quoted lower-case) it's a little hard for users. So we switch it to
+        # the column name "ID" == id == Id
+        return self.plan_builder.query(
+            range_statement(
+                logical_plan.start, logical_plan.end, logical_plan.step, "id"
+            ),
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, SnowflakeValues):
-            if logical_plan.schema_query:
-                schema_query = logical_plan.schema_query
-            else:
-                schema_query = schema_query_for_values_statement(logical_plan.output)
-
-            if logical_plan.data:
-                if (
-                    len(logical_plan.output) * len(logical_plan.data)
-                    < ARRAY_BIND_THRESHOLD
-                ):
-                    return self.plan_builder.query(
-                        values_statement(logical_plan.output, logical_plan.data),
-                        logical_plan,
-                        schema_query=schema_query,
-                    )
-                else:
-                    return self.plan_builder.large_local_relation_plan(
-                        logical_plan.output,
-                        logical_plan.data,
-                        logical_plan,
-                        schema_query=schema_query,
-                    )
-            else:
+    @PLAN_HANDLERS.register(SnowflakeValues)
+    def _resolve_snowflake_values(
+        self,
+        logical_plan: SnowflakeValues,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        if logical_plan.schema_query:
+            schema_query = logical_plan.schema_query
+        else:
+            schema_query = schema_query_for_values_statement(logical_plan.output)
+
+        if logical_plan.data:
+            if len(logical_plan.output) * len(logical_plan.data) < ARRAY_BIND_THRESHOLD:
                 return self.plan_builder.query(
-                    empty_values_statement(logical_plan.output),
+                    values_statement(logical_plan.output, logical_plan.data),
                     logical_plan,
                     schema_query=schema_query,
                 )
-
-        if isinstance(logical_plan, UnresolvedRelation):
-            return self.plan_builder.table(logical_plan.name)
-
-        if isinstance(logical_plan, SnowflakeCreateTable):
-            return self.plan_builder.save_as_table(
-                logical_plan.table_name,
-                logical_plan.column_names,
-                logical_plan.mode,
-                logical_plan.table_type,
-                [
-                    self.analyze(x, df_aliased_col_name_to_real_col_name)
-                    for x in logical_plan.clustering_exprs
-                ],
-                resolved_children[logical_plan.children[0]],
-            )
-
-        if isinstance(logical_plan, Limit):
-            on_top_of_order_by = isinstance(
-                logical_plan.child, SnowflakePlan
-            ) and isinstance(logical_plan.child.source_plan, Sort)
-            return self.plan_builder.limit(
-                self.to_sql_avoid_offset(
-                    logical_plan.limit_expr, df_aliased_col_name_to_real_col_name
-                ),
-                self.to_sql_avoid_offset(
-                    logical_plan.offset_expr, df_aliased_col_name_to_real_col_name
-                ),
-                resolved_children[logical_plan.child],
-                on_top_of_order_by,
-                logical_plan,
-            )
-
-        if isinstance(logical_plan, Pivot):
-            if (
-                len(logical_plan.grouping_columns) != 0
-                and logical_plan.aggregates[0].children is not None
-            ):
-                # Currently snowflake pivot creates a group by from all columns outside of
-                # pivot column and aggregate column. In order to implement df.group_by().pivot(),
-                # we need to first select only the columns that need to be involved in this
-                # operation, and then apply pivot operation. Here, we will first use project
-                # plan to select group_by, pivot and aggregate column and then apply the pivot
-                # logic.
-                #     project_cols = grouping_cols + pivot_col + aggregate_col
-                project_exprs = [
-                    *logical_plan.grouping_columns,
-                    logical_plan.aggregates[0].children[
-                        0
-                    ],  # aggregate column is first child in logical_plan.aggregates
-                    logical_plan.pivot_column,
-                ]
-                child = self.plan_builder.project(
-                    [
-                        self.analyze(col, df_aliased_col_name_to_real_col_name)
-                        for col in project_exprs
-                    ],
-                    resolved_children[logical_plan.child],
+            else:
+                return self.plan_builder.large_local_relation_plan(
+                    logical_plan.output,
+                    logical_plan.data,
                     logical_plan,
+                    schema_query=schema_query,
                 )
-            else:
-                child = resolved_children[logical_plan.child]
+        else:
+            return self.plan_builder.query(
+                empty_values_statement(logical_plan.output),
+                logical_plan,
+                schema_query=schema_query,
+            )
 
-            # We retrieve the pivot_values for generating SQL using types:
-            # List[str] => explicit list of pivot values
-            # ScalarSubquery => dynamic pivot subquery
-            # None => dynamic pivot ANY subquery
+    @PLAN_HANDLERS.register(UnresolvedRelation)
+    def _resolve_unresolved_relation(
+        self,
+        logical_plan: UnresolvedRelation,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.table(logical_plan.name)
 
-            if isinstance(logical_plan.pivot_values, List):
-                pivot_values = [
-                    self.analyze(pv, df_aliased_col_name_to_real_col_name)
-                    for pv in logical_plan.pivot_values
-                ]
-            elif isinstance(logical_plan.pivot_values, ScalarSubquery):
-                pivot_values = self.analyze(
-                    logical_plan.pivot_values, df_aliased_col_name_to_real_col_name
-                )
-            else:
-                pivot_values = None
+    @PLAN_HANDLERS.register(SnowflakeCreateTable)
+    def _resolve_snowflake_create_table(
+        self,
+        logical_plan: SnowflakeCreateTable,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.save_as_table(
+            logical_plan.table_name,
+            logical_plan.column_names,
+            logical_plan.mode,
+            logical_plan.table_type,
+            [
+                self.analyze(x, df_aliased_col_name_to_real_col_name)
+                for x in logical_plan.clustering_exprs
+            ],
+            resolved_children[logical_plan.children[0]],
+        )
 
-            pivot_plan = self.plan_builder.pivot(
-                self.analyze(
-                    logical_plan.pivot_column, df_aliased_col_name_to_real_col_name
-                ),
-                pivot_values,
-                self.analyze(
-                    logical_plan.aggregates[0], df_aliased_col_name_to_real_col_name
-                ),
-                self.analyze(
-                    logical_plan.default_on_null, df_aliased_col_name_to_real_col_name
-                )
-                if logical_plan.default_on_null
-                else None,
-                child,
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(Limit)
+    def _resolve_limit(
+        self,
+        logical_plan: Limit,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        on_top_of_order_by = isinstance(
+            logical_plan.child, SnowflakePlan
+        ) and isinstance(logical_plan.child.source_plan, Sort)
+        return self.plan_builder.limit(
+            self.to_sql_avoid_offset(
+                logical_plan.limit_expr, df_aliased_col_name_to_real_col_name
+            ),
+            self.to_sql_avoid_offset(
+                logical_plan.offset_expr, df_aliased_col_name_to_real_col_name
+            ),
+            resolved_children[logical_plan.child],
+            on_top_of_order_by,
+            logical_plan,
+        )
 
-            # If this is a dynamic pivot, then we can't use child.schema_query which is used in the schema_query
-            # sql generator by default because it is simplified and won't fetch the output columns from the underlying
-            # source.  So in this case we use the actual pivot query as the schema query.
-            if logical_plan.pivot_values is None or isinstance(
-                logical_plan.pivot_values, ScalarSubquery
-            ):
-                # TODO (SNOW-916744): Using the original query here does not work if the query depends on a temp
-                # table as it may not exist at later point in time when dataframe.schema is called.
-                pivot_plan.schema_query = pivot_plan.queries[-1].sql
-
-            return pivot_plan
-
-        if isinstance(logical_plan, Unpivot):
-            return self.plan_builder.unpivot(
-                logical_plan.value_column,
-                logical_plan.name_column,
+    @PLAN_HANDLERS.register(Pivot)
+    def _resolve_pivot(
+        self,
+        logical_plan: Pivot,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        if (
+            len(logical_plan.grouping_columns) != 0
+            and logical_plan.aggregates[0].children is not None
+        ):
+            # Currently snowflake pivot creates a group by from all columns outside of
+            # pivot column and aggregate column. In order to implement df.group_by().pivot(),
+            # we need to first select only the columns that need to be involved in this
+            # operation, and then apply pivot operation. Here, we will first use project
+            # plan to select group_by, pivot and aggregate column and then apply the pivot
+            # logic.
+            #     project_cols = grouping_cols + pivot_col + aggregate_col
+            project_exprs = [
+                *logical_plan.grouping_columns,
+                logical_plan.aggregates[0].children[
+                    0
+                ],  # aggregate column is first child in logical_plan.aggregates
+                logical_plan.pivot_column,
+            ]
+            child = self.plan_builder.project(
                 [
-                    self.analyze(c, df_aliased_col_name_to_real_col_name)
-                    for c in logical_plan.column_list
+                    self.analyze(col, df_aliased_col_name_to_real_col_name)
+                    for col in project_exprs
                 ],
                 resolved_children[logical_plan.child],
                 logical_plan,
             )
+        else:
+            child = resolved_children[logical_plan.child]
+
+        # We retrieve the pivot_values for generating SQL using types:
+        # List[str] => explicit list of pivot values
+        # ScalarSubquery => dynamic pivot subquery
+        # None => dynamic pivot ANY subquery
+
+        if isinstance(logical_plan.pivot_values, List):
+            pivot_values = [
+                self.analyze(pv, df_aliased_col_name_to_real_col_name)
+                for pv in logical_plan.pivot_values
+            ]
+        elif isinstance(logical_plan.pivot_values, ScalarSubquery):
+            pivot_values = self.analyze(
+                logical_plan.pivot_values, df_aliased_col_name_to_real_col_name
+            )
+        else:
+            pivot_values = None
 
-        if isinstance(logical_plan, Rename):
-            return self.plan_builder.rename(
-                logical_plan.column_map,
-                resolved_children[logical_plan.child],
-                logical_plan,
+        pivot_plan = self.plan_builder.pivot(
+            self.analyze(
+                logical_plan.pivot_column, df_aliased_col_name_to_real_col_name
+            ),
+            pivot_values,
+            self.analyze(
+                logical_plan.aggregates[0], df_aliased_col_name_to_real_col_name
+            ),
+            self.analyze(
+                logical_plan.default_on_null, df_aliased_col_name_to_real_col_name
             )
+            if logical_plan.default_on_null
+            else None,
+            child,
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, CreateViewCommand):
-            if isinstance(logical_plan.view_type, PersistedView):
-                is_temp = False
-            elif isinstance(logical_plan.view_type, LocalTempView):
-                is_temp = True
-            else:
-                raise SnowparkClientExceptionMessages.PLAN_ANALYZER_UNSUPPORTED_VIEW_TYPE(
-                    str(logical_plan.view_type)
-                )
+        # If this is a dynamic pivot, then we can't use child.schema_query which is used in the schema_query
+        # sql generator by default because it is simplified and won't fetch the output columns from the underlying
+        # source.  So in this case we use the actual pivot query as the schema query.
+        if logical_plan.pivot_values is None or isinstance(
+            logical_plan.pivot_values, ScalarSubquery
+        ):
+            # TODO (SNOW-916744): Using the original query here does not work if the query depends on a temp
+            # table as it may not exist at later point in time when dataframe.schema is called.
+            pivot_plan.schema_query = pivot_plan.queries[-1].sql
 
-            return self.plan_builder.create_or_replace_view(
-                logical_plan.name, resolved_children[logical_plan.child], is_temp
-            )
+        return pivot_plan
 
-        if isinstance(logical_plan, CreateDynamicTableCommand):
-            return self.plan_builder.create_or_replace_dynamic_table(
-                logical_plan.name,
-                logical_plan.warehouse,
-                logical_plan.lag,
-                resolved_children[logical_plan.child],
-            )
+    @PLAN_HANDLERS.register(Unpivot)
+    def _resolve_unpivot(
+        self,
+        logical_plan: Unpivot,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.unpivot(
+            logical_plan.value_column,
+            logical_plan.name_column,
+            [
+                self.analyze(c, df_aliased_col_name_to_real_col_name)
+                for c in logical_plan.column_list
+            ],
+            resolved_children[logical_plan.child],
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, CopyIntoTableNode):
-            format_type_options = (
-                logical_plan.format_type_options.copy()
-                if logical_plan.format_type_options
-                else {}
-            )
-            format_name = (logical_plan.cur_options or {}).get("FORMAT_NAME")
-            if format_name is not None:
-                format_type_options["FORMAT_NAME"] = format_name
-            assert logical_plan.file_format is not None
-            return self.plan_builder.copy_into_table(
-                path=logical_plan.file_path,
-                table_name=logical_plan.table_name,
-                files=logical_plan.files,
-                pattern=logical_plan.pattern,
-                file_format=logical_plan.file_format,
-                format_type_options=format_type_options,
-                copy_options=logical_plan.copy_options,
-                validation_mode=logical_plan.validation_mode,
-                column_names=logical_plan.column_names,
-                transformations=[
-                    self.analyze(x, df_aliased_col_name_to_real_col_name)
-                    for x in logical_plan.transformations
-                ]
-                if logical_plan.transformations
-                else None,
-                user_schema=logical_plan.user_schema,
-                create_table_from_infer_schema=logical_plan.create_table_from_infer_schema,
-            )
+    @PLAN_HANDLERS.register(Rename)
+    def _resolve_rename(
+        self,
+        logical_plan: Rename,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.rename(
+            logical_plan.column_map,
+            resolved_children[logical_plan.child],
+            logical_plan,
+        )
 
-        if isinstance(logical_plan, CopyIntoLocationNode):
-            return self.plan_builder.copy_into_location(
-                query=resolved_children[logical_plan.child],
-                stage_location=logical_plan.stage_location,
-                partition_by=self.analyze(
-                    logical_plan.partition_by, df_aliased_col_name_to_real_col_name
-                )
-                if logical_plan.partition_by
-                else None,
-                file_format_name=logical_plan.file_format_name,
-                file_format_type=logical_plan.file_format_type,
-                format_type_options=logical_plan.format_type_options,
-                header=logical_plan.header,
-                **logical_plan.copy_options,
+    @PLAN_HANDLERS.register(CreateViewCommand)
+    def _resolve_create_view_command(
+        self,
+        logical_plan: CreateViewCommand,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        if isinstance(logical_plan.view_type, PersistedView):
+            is_temp = False
+        elif isinstance(logical_plan.view_type, LocalTempView):
+            is_temp = True
+        else:
+            raise SnowparkClientExceptionMessages.PLAN_ANALYZER_UNSUPPORTED_VIEW_TYPE(
+                str(logical_plan.view_type)
             )
 
-        if isinstance(logical_plan, TableUpdate):
-            return self.plan_builder.update(
-                logical_plan.table_name,
-                {
-                    self.analyze(k, df_aliased_col_name_to_real_col_name): self.analyze(
-                        v, df_aliased_col_name_to_real_col_name
-                    )
-                    for k, v in logical_plan.assignments.items()
-                },
-                self.analyze(
-                    logical_plan.condition, df_aliased_col_name_to_real_col_name
-                )
-                if logical_plan.condition
-                else None,
-                logical_plan.source_data,
-                logical_plan,
-            )
+        return self.plan_builder.create_or_replace_view(
+            logical_plan.name, resolved_children[logical_plan.child], is_temp
+        )
 
-        if isinstance(logical_plan, TableDelete):
-            return self.plan_builder.delete(
-                logical_plan.table_name,
-                self.analyze(
-                    logical_plan.condition, df_aliased_col_name_to_real_col_name
-                )
-                if logical_plan.condition
-                else None,
-                logical_plan.source_data,
-                logical_plan,
-            )
+    @PLAN_HANDLERS.register(CreateDynamicTableCommand)
+    def _resolve_create_dynamic_table_command(
+        self,
+        logical_plan: CreateDynamicTableCommand,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.create_or_replace_dynamic_table(
+            logical_plan.name,
+            logical_plan.warehouse,
+            logical_plan.lag,
+            resolved_children[logical_plan.child],
+        )
 
-        if isinstance(logical_plan, TableMerge):
-            return self.plan_builder.merge(
-                logical_plan.table_name,
-                logical_plan.source,
-                self.analyze(
-                    logical_plan.join_expr, df_aliased_col_name_to_real_col_name
-                ),
-                [
-                    self.analyze(c, df_aliased_col_name_to_real_col_name)
-                    for c in logical_plan.clauses
-                ],
-                logical_plan,
+    @PLAN_HANDLERS.register(CopyIntoTableNode)
+    def _resolve_copy_into_table_node(
+        self,
+        logical_plan: CopyIntoTableNode,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        format_type_options = (
+            logical_plan.format_type_options.copy()
+            if logical_plan.format_type_options
+            else {}
+        )
+        format_name = (logical_plan.cur_options or {}).get("FORMAT_NAME")
+        if format_name is not None:
+            format_type_options["FORMAT_NAME"] = format_name
+        assert logical_plan.file_format is not None
+        return self.plan_builder.copy_into_table(
+            path=logical_plan.file_path,
+            table_name=logical_plan.table_name,
+            files=logical_plan.files,
+            pattern=logical_plan.pattern,
+            file_format=logical_plan.file_format,
+            format_type_options=format_type_options,
+            copy_options=logical_plan.copy_options,
+            validation_mode=logical_plan.validation_mode,
+            column_names=logical_plan.column_names,
+            transformations=[
+                self.analyze(x, df_aliased_col_name_to_real_col_name)
+                for x in logical_plan.transformations
+            ]
+            if logical_plan.transformations
+            else None,
+            user_schema=logical_plan.user_schema,
+            create_table_from_infer_schema=logical_plan.create_table_from_infer_schema,
+        )
+
+    @PLAN_HANDLERS.register(CopyIntoLocationNode)
+    def _resolve_copy_into_location_node(
+        self,
+        logical_plan: CopyIntoLocationNode,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.copy_into_location(
+            query=resolved_children[logical_plan.child],
+            stage_location=logical_plan.stage_location,
+            partition_by=self.analyze(
+                logical_plan.partition_by, df_aliased_col_name_to_real_col_name
             )
+            if logical_plan.partition_by
+            else None,
+            file_format_name=logical_plan.file_format_name,
+            file_format_type=logical_plan.file_format_type,
+            format_type_options=logical_plan.format_type_options,
+            header=logical_plan.header,
+            **logical_plan.copy_options,
+        )
 
-        if isinstance(logical_plan, Selectable):
-            return self.plan_builder.select_statement(logical_plan)
+    @PLAN_HANDLERS.register(TableUpdate)
+    def _resolve_table_update(
+        self,
+        logical_plan: TableUpdate,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.update(
+            logical_plan.table_name,
+            {
+                self.analyze(k, df_aliased_col_name_to_real_col_name): self.analyze(
+                    v, df_aliased_col_name_to_real_col_name
+                )
+                for k, v in logical_plan.assignments.items()
+            },
+            self.analyze(logical_plan.condition, df_aliased_col_name_to_real_col_name)
+            if logical_plan.condition
+            else None,
+            logical_plan.source_data,
+            logical_plan,
+        )
 
-        raise TypeError(
-            f"Cannot resolve type logical_plan of {type(logical_plan).__name__} to a SnowflakePlan"
+    @PLAN_HANDLERS.register(TableDelete)
+    def _resolve_table_delete(
+        self,
+        logical_plan: TableDelete,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.delete(
+            logical_plan.table_name,
+            self.analyze(logical_plan.condition, df_aliased_col_name_to_real_col_name)
+            if logical_plan.condition
+            else None,
+            logical_plan.source_data,
+            logical_plan,
         )
 
+    @PLAN_HANDLERS.register(TableMerge)
+    def _resolve_table_merge(
+        self,
+        logical_plan: TableMerge,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.merge(
+            logical_plan.table_name,
+            logical_plan.source,
+            self.analyze(logical_plan.join_expr, df_aliased_col_name_to_real_col_name),
+            [
+                self.analyze(c, df_aliased_col_name_to_real_col_name)
+                for c in logical_plan.clauses
+            ],
+            logical_plan,
+        )
+
+    @PLAN_HANDLERS.register(Selectable)
+    def _resolve_selectable(
+        self,
+        logical_plan: Selectable,
+        resolved_children: Dict[LogicalPlan, SnowflakePlan],
+        df_aliased_col_name_to_real_col_name: DefaultDict[str, Dict[str, str]],
+    ) -> SnowflakePlan:
+        return self.plan_builder.select_statement(logical_plan)
+
     def create_select_statement(self, *args, **kwargs):
         return SelectStatement(*args, **kwargs)
 
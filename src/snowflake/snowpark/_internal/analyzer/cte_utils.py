@@ -4,8 +4,20 @@
 
 import hashlib
 import logging
+import re
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Optional, Sequence, Set, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from snowflake.snowpark._internal.analyzer.analyzer_utils import (
     SPACE,
@@ -23,6 +35,57 @@ if TYPE_CHECKING:
 
     TreeNode = Union[SnowflakePlan, Selectable]
 
+# matches the queries that select all columns of an object, e.g. " SELECT  *  FROM (db.sch.t)"
+_TABLE_SCAN_PATTERN = re.compile(
+    r"\s*SELECT\s+\*\s+FROM\s+(\([^\s()]+\)|[^\s()]+)\s*", re.IGNORECASE
+)
+
+
+def get_tree_node_query(node: "TreeNode") -> str:
+    """Returns the query of a node in query plan tree, without CTEs."""
+    from snowflake.snowpark._internal.analyzer.select_statement import Selectable
+
+    return node.sql_query if isinstance(node, Selectable) else node.queries[-1].sql
+
+
+def _get_children(node: "TreeNode") -> List["TreeNode"]:
+    from snowflake.snowpark._internal.analyzer.select_statement import Selectable
+
+    # converting non-SELECT child query to SELECT query here,
+    # so we can further optimize
+    return [
+        child.to_subqueryable() if isinstance(child, Selectable) else child
+        for child in node.children_plan_nodes
+    ]
+
+
+def _traverse_in_post_order(
+    root: "TreeNode", visit_children: Callable[["TreeNode"], bool] = lambda _: True
+) -> Tuple[List["TreeNode"], Dict["TreeNode", List["TreeNode"]]]:
+    """
+    Returns the distinct nodes of the query plan tree rooted at ``root`` in post-traversal order,
+    and a mapping from these nodes to their children. A node that appears more than once in the
+    tree is only visited once, and the children of a node are only visited if ``visit_children``
+    returns True for it. The traversal uses an explicit stack, so deep trees don't hit the
+    recursion limit.
+    """
+    children_map = {root: _get_children(root) if visit_children(root) else []}
+    post_order = []
+    stack = [(root, iter(children_map[root]))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            if child not in children_map:
+                children_map[child] = (
+                    _get_children(child) if visit_children(child) else []
+                )
+                stack.append((child, iter(children_map[child])))
+                break
+        else:
+            stack.pop()
+            post_order.append(node)
+    return post_order, children_map
+
 
 def find_duplicate_subtrees(root: "TreeNode") -> Set["TreeNode"]:
     """
@@ -47,20 +110,26 @@ def find_duplicate_subtrees(root: "TreeNode") -> Set["TreeNode"]:
 
     This function is used to only include nodes that should be converted to CTEs.
     """
-    from snowflake.snowpark._internal.analyzer.select_statement import Selectable
+    return set(_find_duplicate_subtree_counts(root))
+
 
+def _find_duplicate_subtree_counts(root: "TreeNode") -> Dict["TreeNode", int]:
+    """
+    Returns a mapping from the duplicate subtrees in query plan tree (see
+    :func:`find_duplicate_subtrees`) to the number of times they appear in the tree.
+    """
+    post_order, children_map = _traverse_in_post_order(root)
+
+    # The number of times a node appears in the tree is the sum of the numbers of times
+    # its parents appear in the tree, so it is computed from the root down, visiting each
+    # distinct node once, instead of walking every path of the tree.
     node_count_map = defaultdict(int)
     node_parents_map = defaultdict(set)
-
-    def traverse(node: "TreeNode") -> None:
-        node_count_map[node] += 1
-        for child in node.children_plan_nodes:
-            # converting non-SELECT child query to SELECT query here,
-            # so we can further optimize
-            if isinstance(child, Selectable):
-                child = child.to_subqueryable()
+    node_count_map[root] = 1
+    for node in reversed(post_order):
+        for child in children_map[node]:
+            node_count_map[child] += node_count_map[node]
             node_parents_map[child].add(node)
-            traverse(child)
 
     def is_duplicate_subtree(node: "TreeNode") -> bool:
         is_duplicate_node = node_count_map[node] > 1
@@ -76,60 +145,137 @@ def find_duplicate_subtrees(root: "TreeNode") -> Set["TreeNode"]:
                     return True
         return False
 
-    traverse(root)
-    return {node for node in node_count_map if is_duplicate_subtree(node)}
+    return {
+        node: count
+        for node, count in node_count_map.items()
+        if is_duplicate_subtree(node)
+    }
 
 
-def create_cte_query(node: "TreeNode", duplicate_plan_set: Set["TreeNode"]) -> str:
-    from snowflake.snowpark._internal.analyzer.select_statement import Selectable
+class CTECostModel:
+    """
+    Decides which duplicate subtrees of a query plan are converted to CTEs. A duplicate
+    subtree that is not converted to a CTE is inlined, i.e., its query is repeated wherever
+    the subtree appears in the plan.
 
-    plan_to_query_map = {}
-    duplicate_plan_to_cte_map = {}
-    duplicate_plan_to_table_name_map = {}
+    The default model inlines scans of tables, which read the same data whether they are
+    converted to CTEs or not, so converting them only makes the query longer, and converts
+    every other duplicate subtree to a CTE.
+    """
 
-    def build_plan_to_query_map_in_post_order(node: "TreeNode") -> None:
+    def should_convert_to_cte(self, query: str, reference_count: int) -> bool:
         """
-        Builds a mapping from query plans to queries that are optimized with CTEs,
-        in post-traversal order. We can get the final query from the mapping value of the root node.
-        The reason of using poster-traversal order is that chained CTEs have to be built
-        from bottom (innermost subquery) to top (outermost query).
+        Returns whether a duplicate subtree is converted to a CTE.
+
+        Args:
+            query: The query of the subtree, without CTEs.
+            reference_count: The number of times the subtree appears in the plan.
         """
-        if node in plan_to_query_map:
-            return
+        return not is_table_scan(query)
 
-        if not node.children_plan_nodes or not node.placeholder_query:
-            plan_to_query_map[node] = (
-                node.sql_query if isinstance(node, Selectable) else node.queries[-1].sql
-            )
+
+def is_table_scan(query: str) -> bool:
+    """Returns whether ``query`` selects all columns of a table, view or other object."""
+    return _TABLE_SCAN_PATTERN.fullmatch(query) is not None
+
+
+def choose_duplicate_subtrees_for_cte(
+    root: "TreeNode", cost_model: CTECostModel
+) -> Tuple[Set["TreeNode"], Set["TreeNode"]]:
+    """
+    Returns the duplicate subtrees in query plan tree that ``cost_model`` converts to CTEs,
+    and the ones it inlines.
+    """
+    cte_plan_set, inlined_plan_set = set(), set()
+    for node, count in _find_duplicate_subtree_counts(root).items():
+        if cost_model.should_convert_to_cte(get_tree_node_query(node), count):
+            cte_plan_set.add(node)
         else:
-            plan_to_query_map[node] = node.placeholder_query
-            for child in node.children_plan_nodes:
-                if isinstance(child, Selectable):
-                    child = child.to_subqueryable()
-                build_plan_to_query_map_in_post_order(child)
-                # replace the placeholder (id) with child query
-                plan_to_query_map[node] = plan_to_query_map[node].replace(
-                    child._id, plan_to_query_map[child]
-                )
+            inlined_plan_set.add(node)
+    return cte_plan_set, inlined_plan_set
+
+
+def _split_placeholder_query(
+    placeholder_query: str, children: List["TreeNode"]
+) -> List[Union[str, "TreeNode"]]:
+    """Splits a placeholder query at the ids of the children it holds, replacing the ids with
+    the child nodes."""
+    occurrences = []
+    for child in {child._id: child for child in children}.values():
+        position = placeholder_query.find(child._id)
+        while position != -1:
+            occurrences.append((position, child))
+            position = placeholder_query.find(child._id, position + len(child._id))
+    occurrences.sort(key=lambda occurrence: occurrence[0])
+
+    fragments = []
+    start = 0
+    for position, child in occurrences:
+        if position > start:
+            fragments.append(placeholder_query[start:position])
+        fragments.append(child)
+        start = position + len(child._id)
+    if start < len(placeholder_query):
+        fragments.append(placeholder_query[start:])
+    return fragments
+
+
+def create_cte_query(root: "TreeNode", duplicate_plan_set: Set["TreeNode"]) -> str:
+    """
+    Returns the query of ``root`` in which the duplicate subtrees are converted to CTEs.
+
+    The query of each node is built in post-traversal order, because chained CTEs have to be
+    built from bottom (innermost subquery) to top (outermost query). It is kept as a list of
+    fragments, in which a child node stands for the query of that child, instead of a string
+    in which the placeholders (ids) of the children are replaced by their queries, so the
+    queries of the children are not copied into the query of every parent, and the final
+    query is only assembled at the end.
+    """
+    post_order, children_map = _traverse_in_post_order(
+        root,
+        lambda node: bool(node.children_plan_nodes) and bool(node.placeholder_query),
+    )
+    plan_to_query_map: Dict["TreeNode", List[Union[str, "TreeNode"]]] = {}
+    duplicate_plan_to_cte_map = {}
+    duplicate_plan_to_table_name_map = {}
+
+    for node in post_order:
+        children = children_map[node]
+        if not children or not node.placeholder_query:
+            query = [get_tree_node_query(node)]
+        else:
+            query = _split_placeholder_query(node.placeholder_query, children)
 
         # duplicate subtrees will be converted CTEs
         if node in duplicate_plan_set:
             # when a subquery is converted a CTE to with clause,
             # it will be replaced by `SELECT * from TEMP_TABLE` in the original query
             table_name = random_name_for_temp_object(TempObjectType.CTE)
-            select_stmt = project_statement([], table_name)
             duplicate_plan_to_table_name_map[node] = table_name
-            duplicate_plan_to_cte_map[node] = plan_to_query_map[node]
-            plan_to_query_map[node] = select_stmt
+            duplicate_plan_to_cte_map[node] = query
+            query = [project_statement([], table_name)]
+        plan_to_query_map[node] = query
 
-    build_plan_to_query_map_in_post_order(node)
+    def to_sql(query: List[Union[str, "TreeNode"]]) -> str:
+        parts = []
+        stack = [iter(query)]
+        while stack:
+            for fragment in stack[-1]:
+                if isinstance(fragment, str):
+                    parts.append(fragment)
+                else:
+                    stack.append(iter(plan_to_query_map[fragment]))
+                    break
+            else:
+                stack.pop()
+        return "".join(parts)
 
     # construct with clause
     with_stmt = cte_statement(
-        list(duplicate_plan_to_cte_map.values()),
+        [to_sql(query) for query in duplicate_plan_to_cte_map.values()],
         list(duplicate_plan_to_table_name_map.values()),
     )
-    final_query = with_stmt + SPACE + plan_to_query_map[node]
+    final_query = with_stmt + SPACE + to_sql(plan_to_query_map[root])
     return final_query
 
 
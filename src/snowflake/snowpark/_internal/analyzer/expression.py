@@ -4,7 +4,7 @@
 
 import copy
 import uuid
-from typing import TYPE_CHECKING, AbstractSet, Any, List, Optional, Tuple
+from typing import TYPE_CHECKING, AbstractSet, Any, Dict, List, Optional, Tuple
 
 import snowflake.snowpark._internal.utils
 
@@ -50,6 +50,10 @@ class Expression:
     But the constructor accepts a single child. This might be refactored in the future.
     """
 
+    # The SQL text of this expression generated by Analyzer.analyze(), keyed by the value of
+    # parse_local_name, if it doesn't depend on the analysis context. See Analyzer.analyze().
+    _analyzed_sql: Optional[Dict[bool, str]] = None
+
     def __init__(self, child: Optional["Expression"] = None) -> None:
         """
         Subclasses will override these attributes
@@ -2,16 +2,72 @@
 # Copyright (c) 2012-2024 Snowflake Computing Inc. All rights reserved.
 #
 
-from typing import TYPE_CHECKING, List, Union
+from collections import OrderedDict
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import snowflake.snowpark
 from snowflake.connector.cursor import ResultMetadata, SnowflakeCursor
 from snowflake.snowpark._internal.analyzer.analyzer_utils import (
     quote_name_without_upper_casing,
 )
-from snowflake.snowpark._internal.analyzer.expression import Attribute
+from snowflake.snowpark._internal.analyzer.binary_expression import (
+    Add,
+    And,
+    EqualTo,
+    GreaterThan,
+    GreaterThanOrEqual,
+    LessThan,
+    LessThanOrEqual,
+    Multiply,
+    NotEqualTo,
+    Or,
+    Subtract,
+)
+from snowflake.snowpark._internal.analyzer.expression import (
+    Attribute,
+    Expression,
+    FunctionExpression,
+    Literal,
+    Star,
+    UnresolvedAttribute,
+)
+from snowflake.snowpark._internal.analyzer.sort_expression import SortOrder
+from snowflake.snowpark._internal.analyzer.unary_expression import (
+    Alias,
+    Cast,
+    IsNotNull,
+    IsNull,
+    Not,
+    UnaryMinus,
+    UnresolvedAlias,
+)
 from snowflake.snowpark._internal.type_utils import convert_metadata_to_sp_type
-from snowflake.snowpark.types import DecimalType, LongType, StringType
+from snowflake.snowpark._internal.utils import quote_name
+from snowflake.snowpark.types import (
+    BooleanType,
+    DataType,
+    DateType,
+    DecimalType,
+    DoubleType,
+    LongType,
+    StringType,
+    TimestampTimeZone,
+    TimestampType,
+    TimeType,
+    _FractionalType,
+    _IntegralType,
+    _NumericType,
+)
 
 if TYPE_CHECKING:
     import snowflake.snowpark.session
@@ -23,6 +79,81 @@ if TYPE_CHECKING:
     except ImportError:
         ResultMetadataV2 = ResultMetadata
 
+# The default number of describe results kept by a session when the describe cache is enabled.
+DESCRIBE_CACHE_MAX_SIZE = 1024
+
+# Queries starting with these commands may change the result of describing other queries,
+# e.g. a table is dropped or altered, privileges are revoked, or session parameters such as
+# TIMESTAMP_TYPE_MAPPING are changed, so they invalidate the describe cache.
+DESCRIBE_CACHE_INVALIDATING_COMMANDS = (
+    "alter",
+    "drop",
+    "create",
+    "grant",
+    "revoke",
+    "undrop",
+    "use",
+)
+
+
+class DescribeCacheInfo(NamedTuple):
+    """Statistics of the describe cache of a session."""
+
+    hits: int
+    misses: int
+    max_size: int
+    current_size: int
+
+
+class DescribeQueryCache:
+    """A thread-safe, size-bounded LRU cache of the attributes returned by describing a query.
+
+    Keys are built by the caller and are expected to contain everything the describe result
+    depends on besides the query text, e.g. the current database, schema and role.
+    """
+
+    def __init__(self, max_size: int = DESCRIBE_CACHE_MAX_SIZE) -> None:
+        self.enabled = False
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Hashable, List[Attribute]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[List[Attribute]]:
+        with self._lock:
+            attributes = self._cache.get(key)
+            if attributes is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+        # return new Attribute objects so plans never share expression ids
+        return [Attribute(a.name, a.datatype, a.nullable) for a in attributes]
+
+    def put(self, key: Hashable, attributes: List[Attribute]) -> None:
+        with self._lock:
+            self._cache[key] = [
+                Attribute(a.name, a.datatype, a.nullable) for a in attributes
+            ]
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def info(self) -> DescribeCacheInfo:
+        with self._lock:
+            return DescribeCacheInfo(
+                self.hits, self.misses, self.max_size, len(self._cache)
+            )
+
+
+def is_describe_cache_invalidating_query(sql: str) -> bool:
+    return sql.strip().lower().startswith(DESCRIBE_CACHE_INVALIDATING_COMMANDS)
+
 
 def command_attributes() -> List[Attribute]:
     return [Attribute('"status"', StringType())]
@@ -144,3 +275,270 @@ def run_new_describe(
         return cursor._describe_internal(query)  # pyright: ignore
     else:
         return cursor.describe(query)
+
+
+# The data type and nullability of an expression.
+_ExpressionType = Tuple[DataType, bool]
+
+# Functions that always return FLOAT when all of their arguments are numeric.
+FLOAT_RESULT_FUNCTIONS = frozenset(
+    (
+        "acos",
+        "asin",
+        "atan",
+        "atan2",
+        "cbrt",
+        "cos",
+        "cosh",
+        "degrees",
+        "exp",
+        "ln",
+        "log",
+        "radians",
+        "sin",
+        "sinh",
+        "sqrt",
+        "tan",
+        "tanh",
+    )
+)
+
+# Functions that return the type of their first argument when it is an integer or a FLOAT
+# and all of the other arguments are integers.
+NUMERIC_PRESERVING_FUNCTIONS = frozenset(("abs", "ceil", "floor", "round"))
+
+
+def _is_integral(datatype: DataType) -> bool:
+    return isinstance(datatype, _IntegralType) or (
+        isinstance(datatype, DecimalType) and datatype.scale == 0
+    )
+
+
+def _is_float(datatype: DataType) -> bool:
+    return isinstance(datatype, _FractionalType) and not isinstance(
+        datatype, DecimalType
+    )
+
+
+def _is_comparable(left: DataType, right: DataType) -> bool:
+    if isinstance(left, _NumericType) and isinstance(right, _NumericType):
+        return True
+    if isinstance(left, TimestampType) and isinstance(right, TimestampType):
+        return left.tz == right.tz
+    return type(left) is type(right) and isinstance(
+        left, (StringType, BooleanType, DateType, TimeType)
+    )
+
+
+def _cast_result_type(source: DataType, to: DataType) -> Optional[DataType]:
+    """Returns the type Snowflake reports for ``cast(<source> as <to>)``, or None if the cast
+    may not be valid or the result type depends on session parameters."""
+    if isinstance(source, (DateType, TimestampType)):
+        valid_targets = (DateType, TimestampType, StringType)
+    elif isinstance(source, TimeType):
+        valid_targets = (TimeType, StringType)
+    elif isinstance(source, (_NumericType, BooleanType)):
+        valid_targets = (_NumericType, BooleanType, StringType)
+    elif isinstance(source, StringType):
+        valid_targets = (DataType,)
+    else:
+        return None
+    if not isinstance(to, valid_targets):
+        return None
+
+    if _is_integral(to):
+        return LongType()
+    if isinstance(to, DecimalType):
+        return DecimalType(to.precision, to.scale)
+    if _is_float(to):
+        return DoubleType()
+    if isinstance(to, StringType):
+        return StringType(to.length or StringType._MAX_LENGTH)
+    if isinstance(to, (BooleanType, DateType, TimeType)):
+        return type(to)()
+    # TIMESTAMP without a time zone follows the TIMESTAMP_TYPE_MAPPING session parameter
+    if isinstance(to, TimestampType) and to.tz != TimestampTimeZone.DEFAULT:
+        return TimestampType(to.tz)
+    return None
+
+
+def _infer_expression_type(
+    expr: Expression,
+    columns: Dict[str, Optional[Attribute]],
+    expr_to_alias: Dict,
+) -> Optional[_ExpressionType]:
+    """Returns the data type and nullability of an expression evaluated over ``columns``, or
+    None if it cannot be derived locally."""
+    if isinstance(expr, (Attribute, UnresolvedAttribute)):
+        column = _resolve_column(expr, columns, expr_to_alias)
+        return (column.datatype, column.nullable) if column else None
+
+    if isinstance(expr, Literal):
+        if isinstance(expr.value, bool) and isinstance(expr.datatype, BooleanType):
+            return BooleanType(), False
+        if isinstance(expr.value, int) and isinstance(expr.datatype, _IntegralType):
+            return LongType(), False
+        return None
+
+    if isinstance(expr, (SortOrder, UnaryMinus, Not, IsNull, IsNotNull, Cast)):
+        child = _infer_expression_type(expr.child, columns, expr_to_alias)
+        if child is None:
+            return None
+        datatype, nullable = child
+        if isinstance(expr, SortOrder):
+            return child
+        if isinstance(expr, UnaryMinus):
+            if _is_integral(datatype):
+                return LongType(), nullable
+            return (DoubleType(), nullable) if _is_float(datatype) else None
+        if isinstance(expr, Not):
+            return child if isinstance(datatype, BooleanType) else None
+        if isinstance(expr, (IsNull, IsNotNull)):
+            return BooleanType(), False
+        # try_cast only accepts string input
+        if expr.try_ and not isinstance(datatype, StringType):
+            return None
+        to = _cast_result_type(datatype, expr.to)
+        return (to, nullable or expr.try_) if to else None
+
+    if isinstance(
+        expr,
+        (
+            Add,
+            Subtract,
+            Multiply,
+            EqualTo,
+            NotEqualTo,
+            GreaterThan,
+            GreaterThanOrEqual,
+            LessThan,
+            LessThanOrEqual,
+            And,
+            Or,
+        ),
+    ):
+        left = _infer_expression_type(expr.left, columns, expr_to_alias)
+        right = _infer_expression_type(expr.right, columns, expr_to_alias)
+        if left is None or right is None:
+            return None
+        nullable = left[1] or right[1]
+        if isinstance(expr, (And, Or)):
+            if isinstance(left[0], BooleanType) and isinstance(right[0], BooleanType):
+                return BooleanType(), nullable
+            return None
+        if isinstance(expr, (Add, Subtract, Multiply)):
+            if _is_integral(left[0]) and _is_integral(right[0]):
+                return LongType(), nullable
+            if (
+                isinstance(left[0], _NumericType)
+                and isinstance(right[0], _NumericType)
+                and (_is_float(left[0]) or _is_float(right[0]))
+            ):
+                return DoubleType(), nullable
+            return None
+        return (BooleanType(), nullable) if _is_comparable(left[0], right[0]) else None
+
+    if isinstance(expr, FunctionExpression) and not expr.is_distinct:
+        name = expr.name.lower()
+        if (
+            name not in FLOAT_RESULT_FUNCTIONS
+            and name not in NUMERIC_PRESERVING_FUNCTIONS
+        ):
+            return None
+        arguments = [
+            _infer_expression_type(c, columns, expr_to_alias) for c in expr.children
+        ]
+        if not arguments or any(a is None for a in arguments):
+            return None
+        nullable = any(a[1] for a in arguments)
+        if name in FLOAT_RESULT_FUNCTIONS:
+            if all(isinstance(a[0], _NumericType) for a in arguments):
+                return DoubleType(), nullable
+            return None
+        if not all(_is_integral(a[0]) for a in arguments[1:]):
+            return None
+        if _is_integral(arguments[0][0]):
+            return LongType(), nullable
+        return (DoubleType(), nullable) if _is_float(arguments[0][0]) else None
+
+    return None
+
+
+def _resolve_column(
+    expr: Union[Attribute, UnresolvedAttribute],
+    columns: Dict[str, Optional[Attribute]],
+    expr_to_alias: Dict,
+) -> Optional[Attribute]:
+    if isinstance(expr, Attribute):
+        name = expr_to_alias.get(expr.expr_id, expr.name)
+    elif expr.is_sql_text or expr.df_alias:
+        return None
+    else:
+        name = expr.name
+    # ambiguous column names are stored as None
+    return columns.get(name)
+
+
+def infer_select_attributes(
+    projection: Optional[List[Expression]],
+    where: Optional[Expression],
+    order_by: Optional[List[Expression]],
+    child_attributes: List[Attribute],
+    expr_to_alias: Dict,
+) -> Optional[List[Attribute]]:
+    """Derives the output attributes of ``SELECT <projection> FROM <child> WHERE <where>
+    ORDER BY <order_by>`` from the attributes of the child, without describing the query.
+
+    Only column references, aliases and a set of expressions whose result type Snowflake
+    determines from the input types alone are supported. Returns None when any expression
+    can't be derived locally, in which case the query has to be described instead.
+    """
+    columns: Dict[str, Optional[Attribute]] = {}
+    for attr in child_attributes:
+        columns[attr.name] = None if attr.name in columns else attr
+
+    # validate the clauses locally as well, so errors in them are still reported when
+    # the schema is requested
+    if where is not None:
+        where_type = _infer_expression_type(where, columns, expr_to_alias)
+        if where_type is None or not isinstance(where_type[0], BooleanType):
+            return None
+    for expr in order_by or []:
+        if _infer_expression_type(expr, columns, expr_to_alias) is None:
+            return None
+
+    if not projection:
+        return [Attribute(a.name, a.datatype, a.nullable) for a in child_attributes]
+
+    attributes = []
+    for expr in projection:
+        if isinstance(expr, UnresolvedAlias):
+            # the output name is derived from the sql text unless it's a column reference
+            expr = expr.child
+        if isinstance(expr, Alias):
+            expr_type = _infer_expression_type(expr.child, columns, expr_to_alias)
+            if expr_type is None:
+                return None
+            attributes.append(Attribute(quote_name(expr.name), *expr_type))
+        elif isinstance(expr, Star) and not expr.df_alias and not expr.expressions:
+            attributes.extend(
+                Attribute(a.name, a.datatype, a.nullable) for a in child_attributes
+            )
+        elif isinstance(expr, Star) and not expr.df_alias:
+            for column in expr.expressions:
+                resolved = _resolve_column(column, columns, expr_to_alias)
+                if resolved is None:
+                    return None
+                attributes.append(
+                    Attribute(resolved.name, resolved.datatype, resolved.nullable)
+                )
+        elif isinstance(expr, (Attribute, UnresolvedAttribute)):
+            resolved = _resolve_column(expr, columns, expr_to_alias)
+            if resolved is None:
+                return None
+            attributes.append(
+                Attribute(resolved.name, resolved.datatype, resolved.nullable)
+            )
+        else:
+            return None
+    return attributes
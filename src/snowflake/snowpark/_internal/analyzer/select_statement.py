@@ -16,6 +16,7 @@ from typing import (
     Optional,
     Sequence,
     Set,
+    Tuple,
     Union,
 )
 
@@ -54,7 +55,10 @@ from snowflake.snowpark._internal.analyzer.expression import (
     UnresolvedAttribute,
     derive_dependent_columns,
 )
-from snowflake.snowpark._internal.analyzer.schema_utils import analyze_attributes
+from snowflake.snowpark._internal.analyzer.schema_utils import (
+    analyze_attributes,
+    infer_select_attributes,
+)
 from snowflake.snowpark._internal.analyzer.snowflake_plan import Query, SnowflakePlan
 from snowflake.snowpark._internal.analyzer.snowflake_plan_node import LogicalPlan
 from snowflake.snowpark._internal.analyzer.unary_expression import (
@@ -119,24 +123,56 @@ class ColumnState:
         self.col_name = col_name
         self.change_state = change_state
         self.expression = expression
-        self.dependent_columns = dependent_columns
-        self.depend_on_same_level = depend_on_same_level
-        self.referenced_by_same_level_columns = referenced_by_same_level_columns
+        self._dependent_columns = dependent_columns
+        self._depend_on_same_level = depend_on_same_level
+        self._referenced_by_same_level_columns = referenced_by_same_level_columns
         self.state_dict = state_dict
 
+    # The dependency of a column may be derived lazily, see ColumnStateDict.add_lazy_dependency.
+    @property
+    def dependent_columns(self) -> Optional[AbstractSet[str]]:
+        self.state_dict.derive_lazy_dependency(self.col_name)
+        return self._dependent_columns
+
+    @dependent_columns.setter
+    def dependent_columns(self, value: Optional[AbstractSet[str]]) -> None:
+        self._dependent_columns = value
+
+    @property
+    def depend_on_same_level(self) -> bool:
+        self.state_dict.derive_lazy_dependency(self.col_name)
+        return self._depend_on_same_level
+
+    @depend_on_same_level.setter
+    def depend_on_same_level(self, value: bool) -> None:
+        self._depend_on_same_level = value
+
+    @property
+    def referenced_by_same_level_columns(self) -> Optional[AbstractSet[str]]:
+        # any column of the same level may reference this one
+        self.state_dict.derive_all_lazy_dependencies()
+        return self._referenced_by_same_level_columns
+
+    @referenced_by_same_level_columns.setter
+    def referenced_by_same_level_columns(
+        self, value: Optional[AbstractSet[str]]
+    ) -> None:
+        self._referenced_by_same_level_columns = value
+
     def add_referenced_by_same_level_column(self, col_name: str) -> None:
         """Add a column to the set if the column is referenced by other columns of the same level."""
-        if self.referenced_by_same_level_columns in (
+        if self._referenced_by_same_level_columns in (
             COLUMN_DEPENDENCY_ALL,
             COLUMN_DEPENDENCY_EMPTY,
         ):
-            self.referenced_by_same_level_columns = set(COLUMN_DEPENDENCY_EMPTY)
-        assert isinstance(self.referenced_by_same_level_columns, set)
-        self.referenced_by_same_level_columns.add(col_name)
+            self._referenced_by_same_level_columns = set(COLUMN_DEPENDENCY_EMPTY)
+        assert isinstance(self._referenced_by_same_level_columns, set)
+        self._referenced_by_same_level_columns.add(col_name)
 
     @property
     def is_referenced_by_same_level_column(self) -> bool:
         """Whether this column is referenced by any columns of the same-level query."""
+        self.state_dict.derive_all_lazy_dependencies()
         return (
             len(self.state_dict.columns_referencing_all_columns) > 1
             or (
@@ -148,11 +184,23 @@ class ColumnState:
 
 
 class ColumnStateDict(UserDict):
-    """Store the column states of all columns."""
+    """Store the column states of all columns.
+
+    A copy shares the column states with the original until either of them is modified, and the
+    attributes of its projection are copied when the projection is first read, so copying it
+    doesn't depend on the number of columns.
+    """
 
     def __init__(self) -> None:
         super().__init__(dict())
-        self.projection: List[Attribute] = []
+        self._projection: List[Attribute] = []
+        # the attributes to copy to self._projection when it's first read
+        self._projection_to_copy: Optional[List[Attribute]] = None
+        # whether self.data and the column sets are shared with a copy
+        self._shared = False
+        # column name -> (expression, column states of the subquery) of the columns whose
+        # dependency is derived when it's first inspected
+        self._lazy_dependencies: Dict[str, Tuple[Expression, "ColumnStateDict"]] = {}
         # The following are useful aggregate information of all columns. Used to quickly rule if a query can be flattened.
         self.has_changed_columns: bool = False
         self.has_new_columns: bool = False
@@ -160,11 +208,74 @@ class ColumnStateDict(UserDict):
         self.active_columns: Set[str] = set()
         self.columns_referencing_all_columns: Set[str] = set()
 
+    def __copy__(self) -> "ColumnStateDict":
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        if self._projection_to_copy is None:
+            new._projection_to_copy = self._projection
+        self._shared = new._shared = True
+        return new
+
+    @property
+    def projection(self) -> List[Attribute]:
+        if self._projection_to_copy is not None:
+            self._projection = [copy(attr) for attr in self._projection_to_copy]
+            self._projection_to_copy = None
+        return self._projection
+
+    @projection.setter
+    def projection(self, value: List[Attribute]) -> None:
+        self._projection = value
+        self._projection_to_copy = None
+
     @property
     def has_dropped_columns(self) -> bool:
         return bool(self.dropped_columns)
 
+    def add_lazy_dependency(
+        self,
+        col_name: str,
+        expression: Expression,
+        subquery_column_states: "ColumnStateDict",
+    ) -> None:
+        """Defers deriving the dependency of a column until it's inspected."""
+        self._lazy_dependencies[col_name] = (expression, subquery_column_states)
+
+    def derive_lazy_dependency(self, col_name: str) -> None:
+        if not self._lazy_dependencies:
+            return
+        lazy_dependency = self._lazy_dependencies.pop(col_name, None)
+        if lazy_dependency is None:
+            return
+        expression, subquery_column_states = lazy_dependency
+        try:
+            populate_column_dependency(
+                expression, col_name, self, subquery_column_states
+            )
+        except DeriveColumnDependencyError:
+            # depend_on_same_level has been set, which doesn't allow flattening the column
+            pass
+
+    def derive_all_lazy_dependencies(self) -> None:
+        while self._lazy_dependencies:
+            self.derive_lazy_dependency(next(iter(self._lazy_dependencies)))
+
+    def _unshare(self) -> None:
+        if self._shared:
+            # the lazy dependencies are shared with the copies, and update the column sets
+            self.derive_all_lazy_dependencies()
+            self.data = dict(self.data)
+            self.dropped_columns = (
+                set(self.dropped_columns) if self.dropped_columns is not None else None
+            )
+            self.active_columns = set(self.active_columns)
+            self.columns_referencing_all_columns = set(
+                self.columns_referencing_all_columns
+            )
+            self._shared = False
+
     def __setitem__(self, col_name: str, col_state: ColumnState) -> None:
+        self._unshare()
         super().__setitem__(col_name, col_state)
         if col_state.change_state == ColumnChangeState.DROPPED:
             if self.dropped_columns is None:
@@ -177,6 +288,10 @@ class ColumnStateDict(UserDict):
             elif col_state.change_state == ColumnChangeState.NEW:
                 self.has_new_columns = True
 
+    def __delitem__(self, col_name: str) -> None:
+        self._unshare()
+        super().__delitem__(col_name)
+
 
 class Selectable(LogicalPlan, ABC):
     """The parent abstract class of a DataFrame's logical plan. It can be converted to and from a SnowflakePlan."""
@@ -200,6 +315,7 @@ class Selectable(LogicalPlan, ABC):
             str, Dict[str, str]
         ] = defaultdict(dict)
         self._api_calls = api_calls.copy() if api_calls is not None else None
+        self._encoded_id: Optional[str] = None
 
     def __eq__(self, other: "Selectable") -> bool:
         if self._id is not None and other._id is not None:
@@ -224,8 +340,25 @@ class Selectable(LogicalPlan, ABC):
 
     @property
     def _id(self) -> Optional[str]:
-        """Returns the id of this Selectable logical plan."""
-        return encode_id(self.sql_query, self.query_params)
+        """Returns the id of this Selectable logical plan.
+
+        When CTE optimization is enabled, the id is derived from the placeholder query,
+        which holds the children by their ids, so it is computed from this node's own
+        query text instead of the full sql query of the subtree. The id is computed the
+        first time it's read and cached in ``_encoded_id``, separately from the cached sql
+        and placeholder queries, so it isn't recomputed if the CTE optimization is enabled
+        or disabled afterwards.
+        """
+        if self._encoded_id is None:
+            placeholder_query = (
+                self.placeholder_query
+                if self.analyzer.session._cte_optimization_enabled
+                else None
+            )
+            self._encoded_id = encode_id(
+                placeholder_query or self.sql_query, self.query_params
+            )
+        return self._encoded_id
 
     @property
     @abstractmethod
@@ -302,6 +435,15 @@ class Selectable(LogicalPlan, ABC):
             else []
         )
 
+    def get_attributes_without_describe(self) -> Optional[List[Attribute]]:
+        """Returns the attributes of this Selectable if they are known without describing a query."""
+        if (
+            self._snowflake_plan is not None
+            and "attributes" in self._snowflake_plan.__dict__
+        ):
+            return self._snowflake_plan.attributes
+        return None
+
     @property
     def column_states(self) -> ColumnStateDict:
         """A dictionary that contains the column states of a query.
@@ -529,6 +671,26 @@ class SelectStatement(Selectable):
 
         return new
 
+    def get_attributes_without_describe(self) -> Optional[List[Attribute]]:
+        attributes = super().get_attributes_without_describe()
+        return attributes if attributes is not None else self.infer_attributes()
+
+    def infer_attributes(self) -> Optional[List[Attribute]]:
+        """Derives the attributes of this query from the attributes of ``from_``, so the query
+        doesn't need to be described. Returns None if the attributes of ``from_`` aren't known
+        yet or the projection contains expressions whose types can't be derived locally.
+        """
+        from_attributes = self.from_.get_attributes_without_describe()
+        if from_attributes is None:
+            return None
+        return infer_select_attributes(
+            self.projection,
+            self.where,
+            self.order_by,
+            from_attributes,
+            self.from_.expr_to_alias,
+        )
+
     @property
     def column_states(self) -> ColumnStateDict:
         if self._column_states is None:
@@ -544,8 +706,8 @@ class SelectStatement(Selectable):
         """A dictionary that contains the column states of a query.
         Refer to class ColumnStateDict.
         """
+        # the copy shares the column states and copies the attributes of the projection lazily
         self._column_states = copy(value)
-        self._column_states.projection = [copy(attr) for attr in value.projection]
 
     @property
     def has_clause_using_columns(self) -> bool:
@@ -640,6 +802,13 @@ class SelectStatement(Selectable):
         self._placeholder_query = f"{analyzer_utils.SELECT}{self.projection_in_str}{analyzer_utils.FROM}{from_clause}{where_clause}{order_by_clause}{limit_clause}{offset_clause}"
         return self._placeholder_query
 
+    @property
+    def _id(self) -> Optional[str]:
+        if not self.has_clause and not self.projection:
+            # this statement has the same sql query as from_, so they share the id
+            return self.from_._id
+        return super()._id
+
     @property
     def query_params(self) -> Optional[Sequence[Any]]:
         return self.from_.query_params
@@ -780,9 +949,15 @@ class SelectStatement(Selectable):
             )
         new.flatten_disabled = disable_next_level_flatten
         assert new.projection is not None
-        new._column_states = derive_column_states_from_subquery(
-            new.projection, new.from_
-        )
+        if not can_be_flattened and new.from_ is self and new_column_states is not None:
+            # the column states of the projection have been derived from self above
+            new._column_states = new_column_states
+        else:
+            # the dependencies of the columns are only inspected if another projection is
+            # flattened into this one, and only for the columns it uses
+            new._column_states = derive_column_states_from_subquery(
+                new.projection, new.from_, lazy_dependencies=True
+            )
         # If new._column_states is None, when property `column_states` is called later,
         # a query will be described and an error like "invalid identifier" will be thrown.
 
@@ -1219,8 +1394,12 @@ def populate_column_dependency(
 
 
 def derive_column_states_from_subquery(
-    cols: Iterable[Expression], from_: Selectable
+    cols: Iterable[Expression], from_: Selectable, lazy_dependencies: bool = False
 ) -> Optional[ColumnStateDict]:
+    """Derives the column states of a projection of ``from_``. Returns None if a column name
+    can't be parsed or a column references a column that doesn't exist. If ``lazy_dependencies``
+    is True, the dependencies of the columns are derived when they're inspected, and a reference
+    to a column that doesn't exist only prevents the column from being flattened."""
     analyzer = from_.analyzer
     column_states = ColumnStateDict()
     for c in cols:
@@ -1293,6 +1472,9 @@ def derive_column_states_from_subquery(
                 c,
                 state_dict=column_states,
             )
+        if lazy_dependencies:
+            column_states.add_lazy_dependency(quoted_c_name, c, from_.column_states)
+            continue
         try:
             populate_column_dependency(
                 c, quoted_c_name, column_states, from_.column_states
@@ -3,6 +3,7 @@
 # Copyright (c) 2012-2024 Snowflake Computing Inc. All rights reserved.
 #
 import copy
+import io
 import re
 import sys
 import uuid
@@ -17,6 +18,7 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Set,
     Tuple,
     Union,
 )
@@ -27,6 +29,7 @@ from snowflake.snowpark._internal.analyzer.table_function import (
 )
 
 if TYPE_CHECKING:
+    from snowflake.snowpark._internal.analyzer.cte_utils import TreeNode
     from snowflake.snowpark._internal.analyzer.select_statement import (
         Selectable,
     )  # pragma: no cover
@@ -70,6 +73,7 @@ from snowflake.snowpark._internal.analyzer.analyzer_utils import (
     sort_statement,
     table_function_statement,
     unpivot_statement,
+    unquote_if_quoted,
     update_statement,
 )
 from snowflake.snowpark._internal.analyzer.binary_plan_node import (
@@ -77,6 +81,7 @@ from snowflake.snowpark._internal.analyzer.binary_plan_node import (
     SetOperation,
 )
 from snowflake.snowpark._internal.analyzer.cte_utils import (
+    choose_duplicate_subtrees_for_cte,
     create_cte_query,
     encode_id,
     find_duplicate_subtrees,
@@ -88,6 +93,7 @@ from snowflake.snowpark._internal.analyzer.snowflake_plan_node import (
     SaveMode,
 )
 from snowflake.snowpark._internal.error_message import SnowparkClientExceptionMessages
+from snowflake.snowpark._internal.type_utils import convert_sp_to_arrow_type
 from snowflake.snowpark._internal.utils import (
     INFER_SCHEMA_FORMAT_TYPES,
     TempObjectType,
@@ -230,8 +236,15 @@ class SnowflakePlan(LogicalPlan):
         # In the placeholder query, subquery (child) is held by the ID of query plan
         # It is used for optimization, by replacing a subquery with a CTE
         self.placeholder_query = placeholder_query
-        # encode an id for CTE optimization
-        self._id = encode_id(queries[-1].sql, queries[-1].params)
+
+    @cached_property
+    def _id(self) -> Optional[str]:
+        """An id for CTE optimization. When the placeholder query exists, it holds the
+        children by their ids, so the id is encoded from it instead of the full sql
+        query of the subtree."""
+        return encode_id(
+            self.placeholder_query or self.queries[-1].sql, self.queries[-1].params
+        )
 
     def __eq__(self, other: "SnowflakePlan") -> bool:
         if self._id is not None and other._id is not None:
@@ -258,22 +271,31 @@ class SnowflakePlan(LogicalPlan):
         else:
             return []
 
-    def replace_repeated_subquery_with_cte(self) -> "SnowflakePlan":
+    def find_duplicate_subtrees_for_cte(
+        self,
+    ) -> Tuple[Set["TreeNode"], Set["TreeNode"]]:
+        """
+        Returns the duplicate subtrees of this plan that are converted to CTEs, and the ones
+        that are inlined, as decided by the CTE cost model of the session.
+        """
         # parameter protection
         if not self.session._cte_optimization_enabled:
-            return self
+            return set(), set()
 
         # if source_plan or placeholder_query is none, it must be a leaf node,
         # no optimization is needed
         if self.source_plan is None or self.placeholder_query is None:
-            return self
+            return set(), set()
 
         # only select statement can be converted to CTEs
         if not is_sql_select_statement(self.queries[-1].sql):
-            return self
+            return set(), set()
+
+        return choose_duplicate_subtrees_for_cte(self, self.session._cte_cost_model)
 
-        # if there is no duplicate node, no optimization will be performed
-        duplicate_plan_set = find_duplicate_subtrees(self)
+    def replace_repeated_subquery_with_cte(self) -> "SnowflakePlan":
+        # if there is no duplicate node to convert, no optimization will be performed
+        duplicate_plan_set, _ = self.find_duplicate_subtrees_for_cte()
         if not duplicate_plan_set:
             return self
 
@@ -316,6 +338,15 @@ class SnowflakePlan(LogicalPlan):
 
     @cached_property
     def attributes(self) -> List[Attribute]:
+        from snowflake.snowpark._internal.analyzer.select_statement import (
+            SelectStatement,
+        )
+
+        if isinstance(self.source_plan, SelectStatement):
+            # skip the describe query if the schema can be derived from the child's schema
+            output = self.source_plan.infer_attributes()
+            if output is not None:
+                return output
         output = analyze_attributes(self.schema_query, self.session)
         # No simplifier case relies on this schema_query change to update SHOW TABLES to a nested sql friendly query.
         if not self.schema_query or not self.session.sql_simplifier_enabled:
@@ -565,12 +596,28 @@ class SnowflakePlanBuilder:
         insert_stmt = batch_insert_into_statement(
             temp_table_name, [attr.name for attr in attributes]
         )
+        threshold = self.session._local_data_upload_threshold
+        if (
+            threshold is not None
+            and len(attributes) * len(data) >= threshold
+            and all(
+                convert_sp_to_arrow_type(attr.datatype) is not None
+                for attr in attributes
+            )
+        ):
+            # upload the rows as a Parquet file when the query runs, which is much
+            # faster than binding them in an INSERT statement when there are many rows
+            insert_query = StagedInsertQuery(
+                insert_stmt, data, temp_table_name, attributes
+            )
+        else:
+            insert_query = BatchInsertQuery(insert_stmt, data)
         select_stmt = project_statement([], temp_table_name)
         drop_table_stmt = drop_table_if_exists_statement(temp_table_name)
         schema_query = schema_query or schema_value_statement(attributes)
         queries = [
             Query(create_table_stmt, is_ddl_on_temp_object=True),
-            BatchInsertQuery(insert_stmt, data),
+            insert_query,
             Query(select_stmt),
         ]
         return SnowflakePlan(
@@ -1384,3 +1431,75 @@ class BatchInsertQuery(Query):
     ) -> None:
         super().__init__(sql)
         self.rows = rows
+
+
+class StagedInsertQuery(BatchInsertQuery):
+    """Inserts ``rows`` into ``table_name`` by uploading them to a stage in a Parquet file,
+    whose column names are the names of ``attributes``, and copying the file into the
+    table. ``sql`` inserts the rows with bound parameters, which is done instead if the
+    rows can't be encoded or uploaded."""
+
+    def __init__(
+        self,
+        sql: str,
+        rows: List[Row],
+        table_name: str,
+        attributes: List[Attribute],
+    ) -> None:
+        super().__init__(sql, rows)
+        self.table_name = table_name
+        self.attributes = attributes
+
+    def copy_statement(self, stage_location: str) -> str:
+        """Returns the statement that copies the files uploaded to ``stage_location`` into
+        the table."""
+        return copy_into_table(
+            self.table_name,
+            f"{stage_location}/",
+            "PARQUET",
+            {},
+            {"MATCH_BY_COLUMN_NAME": "CASE_SENSITIVE", "PURGE": True},
+            None,
+        )
+
+
+def rows_to_parquet(rows: List[Row], attributes: List[Attribute]) -> Optional[bytes]:
+    """Returns ``rows`` in a compressed Parquet file whose column names are the names of
+    ``attributes``, or None if their values can't be converted to Parquet."""
+    if any(convert_sp_to_arrow_type(attr.datatype) is None for attr in attributes):
+        return None
+    import pyarrow
+
+    try:
+        return columns_to_parquet(
+            [[row[i] for row in rows] for i in range(len(attributes))], attributes
+        )
+    except (pyarrow.ArrowException, TypeError, ValueError):
+        return None
+
+
+def columns_to_parquet(
+    columns: List[Sequence[Any]], attributes: List[Attribute]
+) -> bytes:
+    """Returns the values in ``columns`` in a compressed Parquet file whose column names are
+    the names of ``attributes``. Raises an error if the values can't be converted to the
+    Arrow types of ``attributes``."""
+    import pyarrow.parquet
+
+    arrow_types = [convert_sp_to_arrow_type(attr.datatype) for attr in attributes]
+    for attr, arrow_type in zip(attributes, arrow_types):
+        if arrow_type is None:
+            raise TypeError(
+                f"Values of {attr.datatype} can't be written to a Parquet file."
+            )
+    table = pyarrow.Table.from_arrays(
+        [
+            pyarrow.array(column, type=arrow_type)
+            for column, arrow_type in zip(columns, arrow_types)
+        ],
+        # the names are matched case-sensitively with the columns of the table
+        names=[unquote_if_quoted(attr.name) for attr in attributes],
+    )
+    buffer = io.BytesIO()
+    pyarrow.parquet.write_table(table, buffer, compression="snappy")
+    return buffer.getvalue()
@@ -423,6 +423,13 @@ class SnowparkClientExceptionMessages:
             error_code="1410",
         )
 
+    @staticmethod
+    def SERVER_FAILED_FETCH_ARROW(message: str) -> SnowparkFetchDataException:
+        return SnowparkFetchDataException(
+            f"Failed to fetch a pyarrow Table. The error is: {message}",
+            error_code="1411",
+        )
+
     # General Error codes 15XX
 
     @staticmethod
@@ -0,0 +1,260 @@
+#
+# Copyright (c) 2012-2024 Snowflake Computing Inc. All rights reserved.
+#
+
+import re
+import sys
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, List, NamedTuple, Optional, Tuple
+
+from snowflake.connector.options import installed_pandas, pandas, pyarrow
+from snowflake.snowpark._internal.analyzer.snowflake_plan import BatchInsertQuery, Query
+
+# the default time to live of a cached result, in seconds
+RESULT_CACHE_DEFAULT_TTL = 300.0
+# the default total size of the cached results, in bytes
+RESULT_CACHE_DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# statements that don't change any table
+_READ_ONLY_COMMANDS = (
+    "select",
+    "with",
+    "(",
+    "show",
+    "describe",
+    "desc",
+    "list",
+    "ls",
+    "explain",
+    "get",
+)
+_OBJECT_NAME = r'(?:"(?:[^"]|"")+"|[\w$]+)(?:\s*\.\s*(?:"(?:[^"]|"")+"|[\w$]+))*'
+# statements that write to a table, and the name of the table is captured
+_TABLE_WRITE_PATTERN = re.compile(
+    r"\s*(?:"
+    r"insert\s+(?:overwrite\s+)?into"
+    r"|update"
+    r"|delete\s+from"
+    r"|merge\s+into"
+    r"|copy\s+into"
+    r"|truncate(?:\s+table)?(?:\s+if\s+exists)?"
+    r"|(?:create|drop|alter|undrop)\s+(?:or\s+replace\s+)?"
+    r"(?:(?:local|global|scoped|temp|temporary|volatile|transient|dynamic|hybrid)\s+)*"
+    r"table"
+    r"(?:\s+if\s+(?:not\s+)?exists)?"
+    r")\s+(" + _OBJECT_NAME + ")",
+    re.IGNORECASE,
+)
+# statements that change two tables, which are treated as unknown writes
+_TABLE_SWAP_OR_RENAME_PATTERN = re.compile(
+    r"\s*alter\s+table(?:\s+if\s+exists)?\s+"
+    + _OBJECT_NAME
+    + r"\s+(?:swap\s+with|rename\s+to)\s",
+    re.IGNORECASE,
+)
+_SELECT_PATTERN = re.compile(r"\s*(?:select|with|\()", re.IGNORECASE)
+
+
+class ResultCacheInfo(NamedTuple):
+    """Statistics of the result cache of a session."""
+
+    hits: int
+    misses: int
+    max_size: int
+    current_size: int
+    num_entries: int
+
+
+class _ResultCacheEntry(NamedTuple):
+    result: Any
+    query_id: str
+    sql_texts: Tuple[str, ...]
+    size: int
+    expires_at: float
+
+
+class ResultCache:
+    """A thread-safe LRU cache of the results of the queries run by a session, bounded by the
+    estimated size of the results in bytes. A result expires ``ttl`` seconds after it's cached.
+
+    Keys are built by the caller and are expected to contain everything the result depends on
+    besides the query text, e.g. the current database, schema and role, and the format of the
+    result. A result is invalidated when this session writes to a table whose name appears in
+    its query, see :meth:`invalidate`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = RESULT_CACHE_DEFAULT_TTL,
+        max_size: int = RESULT_CACHE_DEFAULT_MAX_SIZE,
+    ) -> None:
+        self.enabled = False
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._current_size = 0
+        self._cache: "OrderedDict[Hashable, _ResultCacheEntry]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, str, str]]:
+        """Returns a copy of the cached result, the id and the sql text of the query that
+        produced it, or None if there is no unexpired result for ``key``."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+        return _copy_result(entry.result), entry.query_id, entry.sql_texts[-1]
+
+    def put(
+        self, key: Hashable, result: Any, query_id: str, sql_texts: List[str]
+    ) -> None:
+        """Caches ``result``, which is returned by ``sql_texts``, and the last of them has
+        the id ``query_id``. The result isn't cached if it's larger than the cache."""
+        size = _estimate_size(result)
+        if size > self.max_size:
+            return
+        with self._lock:
+            self._pop(key)
+            self._cache[key] = _ResultCacheEntry(
+                _copy_result(result),
+                query_id,
+                tuple(sql_texts),
+                size,
+                time.monotonic() + self.ttl,
+            )
+            self._current_size += size
+            while self._current_size > self.max_size:
+                self._pop(next(iter(self._cache)))
+
+    def invalidate(self, query: str) -> None:
+        """Removes the cached results that may be changed by running ``query``.
+
+        Read-only statements don't remove any result. If ``query`` writes to a table, the
+        results of the queries that contain the name of the table are removed. Otherwise,
+        e.g. for multiple statements, ``ALTER SESSION``, ``PUT`` or swapping or renaming
+        a table, all results are removed.
+        """
+        if is_read_only_query(query):
+            return
+        table_name = get_written_table_name(query)
+        if table_name is None:
+            self.clear()
+        else:
+            self.invalidate_table(table_name)
+
+    def invalidate_table(self, table_name: str) -> None:
+        """Removes the cached results of the queries that contain ``table_name``, the name
+        of a table without the database and schema."""
+        pattern = _table_name_pattern(table_name)
+        with self._lock:
+            for key in [
+                k
+                for k, v in self._cache.items()
+                if any(pattern.search(sql) for sql in v.sql_texts)
+            ]:
+                self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._current_size = 0
+
+    def info(self) -> ResultCacheInfo:
+        with self._lock:
+            return ResultCacheInfo(
+                self.hits,
+                self.misses,
+                self.max_size,
+                self._current_size,
+                len(self._cache),
+            )
+
+    def _pop(self, key: Hashable) -> None:
+        # must be called with self._lock held
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._current_size -= entry.size
+
+
+def is_read_only_query(sql: str) -> bool:
+    sql = sql.strip()
+    return sql.lower().startswith(_READ_ONLY_COMMANDS) and ";" not in sql.rstrip(";")
+
+
+def is_select_query(sql: str) -> bool:
+    return _SELECT_PATTERN.match(sql) is not None and is_read_only_query(sql)
+
+
+def get_written_table_name(sql: str) -> Optional[str]:
+    """Returns the name of the table that ``sql`` writes to, without the database and schema,
+    or None if it's unknown, e.g. ``sql`` has multiple statements."""
+    if ";" in sql.strip().rstrip(";") or _TABLE_SWAP_OR_RENAME_PATTERN.match(sql):
+        return None
+    match = _TABLE_WRITE_PATTERN.match(sql)
+    if match is None:
+        return None
+    name = match.group(1)
+    if name.startswith(("'", "@")):
+        return None
+    # the last part of a qualified name, which may contain dots if it's quoted
+    return re.findall(r'"(?:[^"]|"")+"|[\w$]+', name)[-1]
+
+
+def _table_name_pattern(table_name: str) -> "re.Pattern":
+    unquoted = table_name[1:-1].replace('""', '"')
+    if table_name.startswith('"') and (
+        unquoted.upper() != unquoted or not re.fullmatch(r"[\w$]+", unquoted)
+    ):
+        # only matched when it's quoted the same way
+        return re.compile(re.escape(table_name))
+    # an unquoted name and a quoted upper case name can be referred to in both ways,
+    # in any case
+    name = unquoted if table_name.startswith('"') else table_name
+    return re.compile(rf"(?<![\w$]){re.escape(name)}(?![\w$])", re.IGNORECASE)
+
+
+def _estimate_size(result: Any) -> int:
+    if installed_pandas and isinstance(result, pandas.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    if installed_pandas and isinstance(result, pyarrow.Table):
+        return result.nbytes
+    if isinstance(result, list):
+        return sys.getsizeof(result) + sum(_estimate_row_size(row) for row in result)
+    return sys.getsizeof(result)
+
+
+def _estimate_row_size(row: Any) -> int:
+    if isinstance(row, tuple):
+        return sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+    return sys.getsizeof(row)
+
+
+def _copy_result(result: Any) -> Any:
+    # pandas DataFrames and lists can be modified by the caller, Arrow tables and rows can't
+    if installed_pandas and isinstance(result, pandas.DataFrame):
+        return result.copy()
+    if isinstance(result, list):
+        return list(result)
+    return result
+
+
+def is_cacheable_plan_queries(queries: List[Query]) -> bool:
+    """Returns whether the result of a plan made of ``queries`` can be cached, which is when
+    its last query is a SELECT statement and the other queries only read data or create and
+    fill the temp objects used by the last query."""
+    *pre_queries, last_query = queries
+    return is_select_query(last_query.sql) and all(
+        isinstance(q, BatchInsertQuery)
+        or q.is_ddl_on_temp_object
+        or is_read_only_query(q.sql)
+        for q in pre_queries
+    )
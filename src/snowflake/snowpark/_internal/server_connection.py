@@ -6,21 +6,32 @@
 import functools
 import importlib
 import inspect
+import io
+import itertools
 import os
 import sys
+import threading
 import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from logging import getLogger
 from typing import (
     IO,
     TYPE_CHECKING,
     Any,
+    Callable,
+    Deque,
     Dict,
+    Iterable,
     Iterator,
     List,
     Optional,
     Sequence,
     Set,
     Tuple,
+    TypeVar,
     Union,
 )
 
@@ -29,25 +40,35 @@ from snowflake.connector.constants import ENV_VAR_PARTNER, FIELD_ID_TO_NAME
 from snowflake.connector.cursor import ResultMetadata, SnowflakeCursor
 from snowflake.connector.errors import NotSupportedError, ProgrammingError
 from snowflake.connector.network import ReauthenticationRequest
-from snowflake.connector.options import pandas
+from snowflake.connector.options import pandas, pyarrow
 from snowflake.snowpark._internal.analyzer.analyzer_utils import (
     quote_name_without_upper_casing,
 )
 from snowflake.snowpark._internal.analyzer.datatype_mapper import str_to_sql
 from snowflake.snowpark._internal.analyzer.expression import Attribute
 from snowflake.snowpark._internal.analyzer.schema_utils import (
+    DescribeQueryCache,
     convert_result_meta_to_attribute,
     get_new_description,
+    is_describe_cache_invalidating_query,
     run_new_describe,
 )
 from snowflake.snowpark._internal.analyzer.snowflake_plan import (
     BatchInsertQuery,
+    Query,
     SnowflakePlan,
+    StagedInsertQuery,
+    rows_to_parquet,
 )
 from snowflake.snowpark._internal.error_message import SnowparkClientExceptionMessages
+from snowflake.snowpark._internal.result_cache import (
+    ResultCache,
+    is_cacheable_plan_queries,
+)
 from snowflake.snowpark._internal.telemetry import TelemetryClient
 from snowflake.snowpark._internal.utils import (
     escape_quotes,
+    generate_random_alphanumeric,
     get_application_name,
     get_version,
     is_in_stored_procedure,
@@ -62,11 +83,15 @@ from snowflake.snowpark.query_history import QueryHistory, QueryRecord
 from snowflake.snowpark.row import Row
 
 if TYPE_CHECKING:
+    from snowflake.connector.result_batch import ResultBatch
+
     try:
         from snowflake.connector.cursor import ResultMetadataV2
     except ImportError:
         ResultMetadataV2 = ResultMetadata
 
+    import snowflake.snowpark.session
+
 logger = getLogger(__name__)
 
 # parameters needed for usage tracking
@@ -74,6 +99,16 @@ PARAM_APPLICATION = "application"
 PARAM_INTERNAL_APPLICATION_NAME = "internal_application_name"
 PARAM_INTERNAL_APPLICATION_VERSION = "internal_application_version"
 
+# The number of deferred post actions (drops of generated temp objects) that triggers
+# submitting them to Snowflake in pipelined execution mode.
+POST_ACTIONS_FLUSH_THRESHOLD = 20
+
+# The maximum total uncompressed size, in bytes, of the result batches that are downloaded
+# but not consumed yet when the result of a query is fetched in parallel.
+RESULT_FETCH_MEMORY_BUDGET = 512 * 1024 * 1024
+
+_T = TypeVar("_T")
+
 
 def _build_target_path(stage_location: str, dest_prefix: str = "") -> str:
     qualified_stage_name = unwrap_stage_location_single_quote(stage_location)
@@ -157,9 +192,36 @@ class ServerConnection:
         self._conn = conn if conn else connect(**self._lower_case_parameters)
         if "password" in self._lower_case_parameters:
             self._lower_case_parameters["password"] = None
-        self._cursor = self._conn.cursor()
+        self._default_cursor = self._conn.cursor()
+        # cursors that are not used by any thread, see _pooled_cursor()
+        self._idle_cursors: List[SnowflakeCursor] = []
+        self._cursor_pool_lock = threading.Lock()
+        self._thread_local = threading.local()
         self._telemetry_client = TelemetryClient(self._conn)
         self._query_listener: Set[QueryHistory] = set()
+        self._describe_cache = DescribeQueryCache()
+        self._result_cache = ResultCache()
+        self._pipelined_execution_enabled = False
+        # the result of a query is fetched in parallel when it's greater than 1
+        self._max_result_fetch_workers = 1
+        self._result_fetch_memory_budget = RESULT_FETCH_MEMORY_BUDGET
+        # sql of deferred post actions -> post action, in the order they were deferred
+        self._pending_post_actions: Dict[str, Query] = {}
+        # sql of submitted post actions -> id of the async query running them
+        self._inflight_post_actions: Dict[str, str] = {}
+        # sql of the drop query of a generated temp object -> weak references to its owners
+        self._temp_object_owners: Dict[str, List[weakref.ref]] = {}
+        # drop queries of the generated temp objects whose owners were garbage collected
+        self._unreferenced_temp_objects: Deque[Query] = deque()
+        self._post_actions_lock = threading.RLock()
+        # serializes the runs of the deferred post actions, which are run without holding
+        # self._post_actions_lock
+        self._post_actions_flush_lock = threading.Lock()
+        # sql of the post actions that are being run or submitted
+        self._flushing_post_actions: Set[str] = set()
+        # held while a flush started by the garbage collection of temp object owners is
+        # scheduled, so only one is scheduled at a time
+        self._post_actions_flush_scheduled = threading.Lock()
         # The session in this case refers to a Snowflake session, not a
         # Snowpark session
         self._telemetry_client.send_session_created_telemetry(not bool(conn))
@@ -170,6 +232,32 @@ class ServerConnection:
             "_skip_upload_on_content_match" in signature.parameters
         )
 
+    @property
+    def _cursor(self) -> SnowflakeCursor:
+        """The cursor used by the current thread. It's the default cursor of this connection,
+        unless the thread is running in :meth:`_pooled_cursor`."""
+        cursor = getattr(self._thread_local, "cursor", None)
+        return cursor if cursor is not None else self._default_cursor
+
+    @contextmanager
+    def _pooled_cursor(self) -> Iterator[SnowflakeCursor]:
+        """Runs the queries of the current thread with a cursor of a pool of cursors, so
+        concurrent threads don't share the default cursor and its results. All the cursors
+        belong to the same Snowflake session, so they see the same temp objects and session
+        parameters."""
+        with self._cursor_pool_lock:
+            cursor = self._idle_cursors.pop() if self._idle_cursors else None
+        if cursor is None:
+            cursor = self._conn.cursor()
+        previous_cursor = getattr(self._thread_local, "cursor", None)
+        self._thread_local.cursor = cursor
+        try:
+            yield cursor
+        finally:
+            self._thread_local.cursor = previous_cursor
+            with self._cursor_pool_lock:
+                self._idle_cursors.append(cursor)
+
     def _add_application_parameters(self) -> None:
         if PARAM_APPLICATION not in self._lower_case_parameters:
             # Mirrored from snowflake-connector-python/src/snowflake/connector/connection.py#L295
@@ -230,7 +318,20 @@ class ServerConnection:
 
     @SnowflakePlan.Decorator.wrap_exception
     def get_result_attributes(self, query: str) -> List[Attribute]:
-        return convert_result_meta_to_attribute(run_new_describe(self._cursor, query))
+        if not self._describe_cache.enabled:
+            return convert_result_meta_to_attribute(
+                run_new_describe(self._cursor, query)
+            )
+        # The same query text may resolve to different objects or be denied access
+        # in another database, schema or role, so they are part of the key.
+        key = (query.strip(), self._conn.database, self._conn.schema, self._conn.role)
+        attributes = self._describe_cache.get(key)
+        if attributes is None:
+            attributes = convert_result_meta_to_attribute(
+                run_new_describe(self._cursor, query)
+            )
+            self._describe_cache.put(key, attributes)
+        return attributes
 
     @_Decorator.log_msg_and_perf_telemetry("Uploading file to stage")
     def upload_file(
@@ -344,10 +445,72 @@ class ServerConnection:
             else:
                 raise ex
 
+    def upload_streams(
+        self,
+        streams: Iterable[Tuple[IO[bytes], str]],
+        stage_location: str,
+        parallel: int = 4,
+        compress_data: bool = True,
+        statement_params: Optional[Dict[str, str]] = None,
+        on_uploaded: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Uploads the streams in ``streams``, pairs of a stream and its file name, to
+        ``stage_location`` with a pool of ``parallel`` threads, and returns the number of
+        uploaded streams. ``streams`` is consumed by the current thread while the streams
+        it has produced are uploaded, and it's not consumed further while ``parallel``
+        streams are waiting or being uploaded, so at most ``parallel + 1`` streams are kept
+        in memory. ``on_uploaded`` is called on the current thread with the index of every
+        uploaded stream, in order."""
+
+        def upload(input_stream: IO[bytes], dest_filename: str) -> None:
+            # the threads don't share the default cursor
+            with self._pooled_cursor():
+                self.upload_stream(
+                    input_stream,
+                    stage_location,
+                    dest_filename,
+                    compress_data=compress_data,
+                    overwrite=True,
+                    statement_params=statement_params,
+                )
+
+        num_streams = num_uploaded = 0
+        in_flight = deque()
+
+        def wait_for_upload() -> None:
+            nonlocal num_uploaded
+            in_flight.popleft().result()
+            if on_uploaded is not None:
+                on_uploaded(num_uploaded)
+            num_uploaded += 1
+
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            try:
+                for input_stream, dest_filename in streams:
+                    while len(in_flight) >= parallel:
+                        wait_for_upload()
+                    in_flight.append(
+                        executor.submit(upload, input_stream, dest_filename)
+                    )
+                    num_streams += 1
+                while in_flight:
+                    wait_for_upload()
+            finally:
+                # don't upload the remaining streams if uploading a stream failed
+                for future in in_flight:
+                    future.cancel()
+        return num_streams
+
     def notify_query_listeners(self, query_record: QueryRecord) -> None:
         for listener in self._query_listener:
             listener._add_query(query_record)
 
+    def notify_query_listeners_of_cached_result(
+        self, query_record: QueryRecord
+    ) -> None:
+        for listener in self._query_listener:
+            listener._add_cached_query(query_record)
+
     def execute_and_notify_query_listener(
         self, query: str, **kwargs: Any
     ) -> SnowflakeCursor:
@@ -372,6 +535,8 @@ class ServerConnection:
         results_cursor = self.execute_and_notify_query_listener(
             query, _statement_params=statement_params
         )
+        if self._result_cache.enabled:
+            self._result_cache.invalidate(query)
         return results_cursor.sfqid
 
     @_Decorator.wrap_exception
@@ -390,6 +555,7 @@ class ServerConnection:
         case_sensitive: bool = True,
         params: Optional[Sequence[Any]] = None,
         num_statements: Optional[int] = None,
+        to_arrow: bool = False,
         **kwargs,
     ) -> Union[Dict[str, Any], AsyncJob]:
         try:
@@ -399,6 +565,8 @@ class ServerConnection:
                     kwargs["_statement_params"] = {}
                 kwargs["_statement_params"]["SNOWPARK_SKIP_TXN_COMMIT_IN_DDL"] = True
             if block:
+                if num_statements is not None:
+                    kwargs["num_statements"] = num_statements
                 results_cursor = self.execute_and_notify_query_listener(
                     query, params=params, **kwargs
                 )
@@ -416,6 +584,19 @@ class ServerConnection:
                 logger.error(f"Failed to execute query{query_id_log} {query}\n{ex}")
             raise ex
 
+        # Generated temp objects have random names and can't change the schema of
+        # any described query, so only DDL issued on other objects clears the cache.
+        if (
+            self._describe_cache.enabled
+            and not is_ddl_on_temp_object
+            and is_describe_cache_invalidating_query(query)
+        ):
+            self._describe_cache.clear()
+        # Writes to generated temp objects can't change the result of a cached query, which
+        # doesn't know their random names.
+        if self._result_cache.enabled and not is_ddl_on_temp_object:
+            self._result_cache.invalidate(query)
+
         # fetch_pandas_all/batches() only works for SELECT statements
         # We call fetchall() if fetch_pandas_all/batches() fails,
         # because when the query plan has multiple queries, it will
@@ -423,7 +604,10 @@ class ServerConnection:
         # calls to_pandas() to execute the query.
         if block:
             return self._to_data_or_iter(
-                results_cursor=results_cursor, to_pandas=to_pandas, to_iter=to_iter
+                results_cursor=results_cursor,
+                to_pandas=to_pandas,
+                to_iter=to_iter,
+                to_arrow=to_arrow,
             )
         else:
             return AsyncJob(
@@ -443,30 +627,57 @@ class ServerConnection:
         results_cursor: SnowflakeCursor,
         to_pandas: bool = False,
         to_iter: bool = False,
+        to_arrow: bool = False,
     ) -> Dict[str, Any]:
         qid = results_cursor.sfqid
         if (
-            to_iter and not to_pandas
+            to_iter and not to_pandas and not to_arrow
         ):  # Fix for SNOW-869536, to_pandas doesn't have this issue, SnowflakeCursor.fetch_pandas_batches already handles the isolation.
+            # The rows are read from the result batches of the query, which are fetched up front,
+            # so the cursor can run other queries while the rows are iterated without a result scan.
+            result_batches = results_cursor.get_result_batches()
+            if result_batches is not None:
+                return {
+                    "data": _iter_result_batches(
+                        result_batches, results_cursor.connection
+                    ),
+                    "sfqid": qid,
+                }
             new_cursor = results_cursor.connection.cursor()
             new_cursor.execute(f"SELECT * FROM TABLE(RESULT_SCAN('{qid}'))")
             results_cursor = new_cursor
 
+        # the whole result is fetched, so its batches can be downloaded in parallel
+        result_batches = None
+        if not to_iter and self._max_result_fetch_workers > 1:
+            result_batches = results_cursor.get_result_batches()
+            if result_batches is not None and len(result_batches) <= 1:
+                result_batches = None
+
         if to_pandas:
             try:
-                data_or_iter = (
-                    map(
-                        functools.partial(
-                            _fix_pandas_df_fixed_type, results_cursor=results_cursor
-                        ),
-                        results_cursor.fetch_pandas_batches(split_blocks=True),
+                # the columns to narrow are decided once from the result metadata,
+                # and narrowed in each Arrow table before it's converted to pandas
+                arrow_to_pandas = functools.partial(
+                    _arrow_table_to_pandas,
+                    fixed_column_scales=_get_fixed_column_scales(
+                        results_cursor.description
+                    ),
+                )
+                if to_iter:
+                    data_or_iter = map(
+                        arrow_to_pandas, results_cursor.fetch_arrow_batches()
                     )
-                    if to_iter
-                    else _fix_pandas_df_fixed_type(
-                        results_cursor.fetch_pandas_all(split_blocks=True),
-                        results_cursor,
+                elif result_batches:
+                    data_or_iter = arrow_to_pandas(
+                        self._fetch_arrow_in_parallel(
+                            result_batches, results_cursor.connection
+                        )
+                    )
+                else:
+                    data_or_iter = arrow_to_pandas(
+                        results_cursor.fetch_arrow_all(force_return_table=True)
                     )
-                )
             except NotSupportedError:
                 data_or_iter = (
                     iter(results_cursor) if to_iter else results_cursor.fetchall()
@@ -477,6 +688,31 @@ class ServerConnection:
                 raise SnowparkClientExceptionMessages.SERVER_FAILED_FETCH_PANDAS(
                     str(ex)
                 )
+        elif to_arrow:
+            # the Arrow tables decoded by the connector are returned as they are
+            try:
+                if to_iter:
+                    data_or_iter = results_cursor.fetch_arrow_batches()
+                elif result_batches:
+                    data_or_iter = self._fetch_arrow_in_parallel(
+                        result_batches, results_cursor.connection
+                    )
+                else:
+                    data_or_iter = results_cursor.fetch_arrow_all(
+                        force_return_table=True
+                    )
+            except NotSupportedError:
+                data_or_iter = (
+                    iter(results_cursor) if to_iter else results_cursor.fetchall()
+                )
+            except KeyboardInterrupt:
+                raise
+            except BaseException as ex:
+                raise SnowparkClientExceptionMessages.SERVER_FAILED_FETCH_ARROW(str(ex))
+        elif result_batches:
+            data_or_iter = self._fetch_rows_in_parallel(
+                result_batches, results_cursor.connection
+            )
         else:
             data_or_iter = (
                 iter(results_cursor) if to_iter else results_cursor.fetchall()
@@ -484,6 +720,39 @@ class ServerConnection:
 
         return {"data": data_or_iter, "sfqid": qid}
 
+    def _fetch_rows_in_parallel(
+        self, result_batches: List["ResultBatch"], connection: SnowflakeConnection
+    ) -> List[tuple]:
+        return list(
+            itertools.chain.from_iterable(
+                _fetch_result_batches(
+                    result_batches,
+                    lambda batch: list(_iter_result_batches([batch], connection)),
+                    self._max_result_fetch_workers,
+                    self._result_fetch_memory_budget,
+                )
+            )
+        )
+
+    def _fetch_arrow_in_parallel(
+        self, result_batches: List["ResultBatch"], connection: SnowflakeConnection
+    ) -> "pyarrow.Table":
+        # same as SnowflakeCursor.fetch_arrow_all(force_return_table=True), but the result
+        # batches are downloaded and decoded in parallel
+        tables = [
+            table
+            for table in _fetch_result_batches(
+                result_batches,
+                lambda batch: batch.to_arrow(connection=connection),
+                self._max_result_fetch_workers,
+                self._result_fetch_memory_budget,
+            )
+            if table.num_rows > 0
+        ]
+        if tables:
+            return pyarrow.concat_tables(tables)
+        return result_batches[0].to_arrow(connection=connection)
+
     def execute(
         self,
         plan: SnowflakePlan,
@@ -493,9 +762,15 @@ class ServerConnection:
         data_type: _AsyncResultType = _AsyncResultType.ROW,
         log_on_exception: bool = False,
         case_sensitive: bool = True,
+        to_arrow: bool = False,
         **kwargs,
     ) -> Union[
-        List[Row], "pandas.DataFrame", Iterator[Row], Iterator["pandas.DataFrame"]
+        List[Row],
+        "pandas.DataFrame",
+        Iterator[Row],
+        Iterator["pandas.DataFrame"],
+        "pyarrow.Table",
+        Iterator["pyarrow.Table"],
     ]:
         if (
             is_in_stored_procedure()
@@ -507,6 +782,31 @@ class ServerConnection:
             raise NotImplementedError(
                 "Async query is not supported in stored procedure yet"
             )
+        result_cache_key = None
+        if (
+            self._result_cache.enabled
+            and block
+            and not to_iter
+            and is_cacheable_plan_queries(plan.queries)
+        ):
+            # The same query text may return different results in another database,
+            # schema or role, so they are part of the key.
+            result_cache_key = (
+                tuple((query.sql, repr(query.params)) for query in plan.queries),
+                to_pandas,
+                to_arrow,
+                case_sensitive,
+                self._conn.database,
+                self._conn.schema,
+                self._conn.role,
+            )
+            cached = self._result_cache.get(result_cache_key)
+            if cached is not None:
+                result, query_id, sql_text = cached
+                self.notify_query_listeners_of_cached_result(
+                    QueryRecord(query_id, sql_text)
+                )
+                return result
         result_set, result_meta = self.get_result_set(
             plan,
             to_pandas,
@@ -516,20 +816,29 @@ class ServerConnection:
             data_type=data_type,
             log_on_exception=log_on_exception,
             case_sensitive=case_sensitive,
+            to_arrow=to_arrow,
         )
         if not block:
             return result_set
-        elif to_pandas:
-            return result_set["data"]
+        elif to_pandas or to_arrow:
+            result = result_set["data"]
         else:
             if to_iter:
                 return result_set_to_iter(
                     result_set["data"], result_meta, case_sensitive=case_sensitive
                 )
             else:
-                return result_set_to_rows(
+                result = result_set_to_rows(
                     result_set["data"], result_meta, case_sensitive=case_sensitive
                 )
+        if result_cache_key is not None:
+            self._result_cache.put(
+                result_cache_key,
+                result,
+                result_set["sfqid"],
+                [query.sql for query in plan.queries],
+            )
+        return result
 
     @SnowflakePlan.Decorator.wrap_exception
     def get_result_set(
@@ -541,6 +850,7 @@ class ServerConnection:
         data_type: _AsyncResultType = _AsyncResultType.ROW,
         log_on_exception: bool = False,
         case_sensitive: bool = True,
+        to_arrow: bool = False,
         **kwargs,
     ) -> Tuple[
         Dict[
@@ -550,6 +860,8 @@ class ServerConnection:
                 "pandas.DataFrame",
                 SnowflakeCursor,
                 Iterator["pandas.DataFrame"],
+                "pyarrow.Table",
+                Iterator["pyarrow.Table"],
                 str,
             ],
         ],
@@ -592,6 +904,7 @@ class ServerConnection:
                     case_sensitive=case_sensitive,
                     num_statements=len(plan.queries),
                     params=params,
+                    to_arrow=to_arrow,
                     **kwargs,
                 )
 
@@ -601,18 +914,26 @@ class ServerConnection:
                 if action_id < plan.session._last_canceled_id:
                     raise SnowparkClientExceptionMessages.SERVER_QUERY_IS_CANCELLED()
             else:
-                for i, query in enumerate(plan.queries):
-                    if isinstance(query, BatchInsertQuery):
+                queries = [(query, None) for query in plan.queries]
+                if self._pipelined_execution_enabled and block:
+                    # a previous run of this plan may have deferred dropping the temp
+                    # objects that are about to be created again
+                    self._cancel_deferred_post_actions(plan.post_actions)
+                    queries = self._pipeline_pre_queries(plan.queries)
+                for i, (query, num_statements) in enumerate(queries):
+                    if isinstance(query, StagedInsertQuery):
+                        self.run_staged_insert(query, plan.session, **kwargs)
+                    elif isinstance(query, BatchInsertQuery):
                         self.run_batch_insert(query.sql, query.rows, **kwargs)
                     else:
-                        is_last = i == len(plan.queries) - 1 and not block
+                        is_last = i == len(queries) - 1 and not block
                         final_query = query.sql
                         for holder, id_ in placeholders.items():
                             final_query = final_query.replace(holder, id_)
                         result = self.run_query(
                             final_query,
                             to_pandas,
-                            to_iter and (i == len(plan.queries) - 1),
+                            to_iter and (i == len(queries) - 1),
                             is_ddl_on_temp_object=query.is_ddl_on_temp_object,
                             block=not is_last,
                             data_type=data_type,
@@ -620,6 +941,8 @@ class ServerConnection:
                             log_on_exception=log_on_exception,
                             case_sensitive=case_sensitive,
                             params=query.params,
+                            num_statements=num_statements,
+                            to_arrow=to_arrow,
                             **kwargs,
                         )
                         placeholders[query.query_id_place_holder] = (
@@ -631,7 +954,15 @@ class ServerConnection:
         finally:
             # delete created tmp object
             if block:
-                for action in plan.post_actions:
+                post_actions, deferred_post_actions = plan.post_actions, []
+                if self._pipelined_execution_enabled:
+                    deferred_post_actions = [
+                        a for a in post_actions if a.is_ddl_on_temp_object
+                    ]
+                    post_actions = [
+                        a for a in post_actions if not a.is_ddl_on_temp_object
+                    ]
+                for action in post_actions:
                     self.run_query(
                         action.sql,
                         is_ddl_on_temp_object=action.is_ddl_on_temp_object,
@@ -640,12 +971,218 @@ class ServerConnection:
                         case_sensitive=case_sensitive,
                         **kwargs,
                     )
+                # this also drops the generated temp objects that are no longer referenced,
+                # once there are enough of them
+                if deferred_post_actions or self._unreferenced_temp_objects:
+                    self._defer_post_actions(deferred_post_actions)
 
         if result is None:
             raise SnowparkClientExceptionMessages.SQL_LAST_QUERY_RETURN_RESULTSET()
 
         return result, result_meta
 
+    @staticmethod
+    def _pipeline_pre_queries(
+        queries: List[Query],
+    ) -> List[Tuple[Query, Optional[int]]]:
+        """Merges consecutive pre-queries of a plan into multi-statement queries, so each
+        group is run in a single round trip. Returns the queries to run with their number
+        of statements, which is None for queries that are run as they are.
+
+        A pre-query is only merged if it doesn't reference the query id of another query
+        and no other query references its query id, because the query ids of the statements
+        in a multi-statement query aren't available.
+        """
+        placeholders = [q.query_id_place_holder for q in queries]
+        pipelined_queries: List[Tuple[Query, Optional[int]]] = []
+        group: List[Query] = []
+
+        def add_group() -> None:
+            if len(group) > 1:
+                # a statement can end with a line comment, so each one is on its own line
+                merged_query = Query(
+                    ";\n".join(q.sql for q in group),
+                    is_ddl_on_temp_object=all(q.is_ddl_on_temp_object for q in group),
+                )
+                pipelined_queries.append((merged_query, len(group)))
+            else:
+                pipelined_queries.extend((q, None) for q in group)
+            group.clear()
+
+        for query in queries[:-1]:
+            if (
+                not isinstance(query, BatchInsertQuery)
+                and not query.params
+                and not any(p in query.sql for p in placeholders)
+                and not any(query.query_id_place_holder in q.sql for q in queries)
+            ):
+                group.append(query)
+            else:
+                add_group()
+                pipelined_queries.append((query, None))
+        add_group()
+        pipelined_queries.append((queries[-1], None))
+        return pipelined_queries
+
+    def _defer_post_actions(self, post_actions: List[Query]) -> None:
+        with self._post_actions_lock:
+            for action in post_actions:
+                self._pending_post_actions[action.sql] = action
+            self._collect_unreferenced_temp_objects()
+            flush = len(self._pending_post_actions) >= POST_ACTIONS_FLUSH_THRESHOLD
+        if flush:
+            self.flush_post_actions(block=False)
+
+    def drop_temp_object_when_unreferenced(
+        self, drop_query: Query, owners: List[Any]
+    ) -> None:
+        """Defers ``drop_query``, which drops a generated temp object, until all of ``owners``,
+        and of the owners added later for the same query, are garbage collected. The query is
+        then run in a batch with the other deferred post actions."""
+        with self._post_actions_lock:
+            refs = self._temp_object_owners.setdefault(drop_query.sql, [])
+            for owner in owners:
+                refs.append(weakref.ref(owner))
+                finalizer = weakref.finalize(
+                    owner, self._on_temp_object_owner_collected, drop_query, refs
+                )
+                finalizer.atexit = False
+
+    def _on_temp_object_owner_collected(
+        self, drop_query: Query, refs: List[weakref.ref]
+    ) -> None:
+        # This is called during garbage collection, which can happen in any thread and while
+        # the lock is held, so it only appends to a thread-safe queue that's drained later.
+        if all(ref() is None for ref in list(refs)):
+            self._unreferenced_temp_objects.append(drop_query)
+            if (
+                len(self._unreferenced_temp_objects) >= POST_ACTIONS_FLUSH_THRESHOLD
+                # only one flush is scheduled however many owners are collected
+                and self._post_actions_flush_scheduled.acquire(blocking=False)
+            ):
+                threading.Thread(target=self._run_scheduled_flush, daemon=True).start()
+
+    def _run_scheduled_flush(self) -> None:
+        # the objects collected from now on are dropped by this flush or schedule another one
+        self._post_actions_flush_scheduled.release()
+        self.flush_post_actions(block=False)
+
+    def _collect_unreferenced_temp_objects(self) -> None:
+        # must be called with self._post_actions_lock held
+        while self._unreferenced_temp_objects:
+            drop_query = self._unreferenced_temp_objects.popleft()
+            # the last owners may be collected at the same time and add the query twice
+            if self._temp_object_owners.pop(drop_query.sql, None) is not None:
+                self._pending_post_actions[drop_query.sql] = drop_query
+
+    def _cancel_deferred_post_actions(self, post_actions: List[Query]) -> None:
+        """Removes the given post actions from the deferred ones, and waits for them if they
+        have already been submitted, so they don't drop the temp objects created by a new
+        run of the same plan."""
+        query_ids = set()
+        with self._post_actions_lock:
+            for action in post_actions:
+                self._pending_post_actions.pop(action.sql, None)
+            flushing = any(a.sql in self._flushing_post_actions for a in post_actions)
+        if flushing:
+            # wait until the flush running the actions has submitted them
+            with self._post_actions_flush_lock:
+                pass
+        with self._post_actions_lock:
+            for action in post_actions:
+                if action.sql in self._inflight_post_actions:
+                    query_ids.add(self._inflight_post_actions[action.sql])
+        for query_id in query_ids:
+            try:
+                self._conn.cursor().get_results_from_sfqid(query_id)
+            except Exception as ex:
+                logger.debug(f"Failed to run deferred post actions {query_id}: {ex}")
+            with self._post_actions_lock:
+                self._inflight_post_actions = {
+                    k: v
+                    for k, v in self._inflight_post_actions.items()
+                    if v != query_id
+                }
+
+    def flush_post_actions(self, block: bool = True) -> None:
+        """Runs the deferred post actions and the drops of the generated temp objects that
+        are no longer referenced in a single multi-statement query. If ``block`` is ``False``,
+        the query is submitted asynchronously and not waited for. The actions of the queries
+        submitted earlier are forgotten once they have finished."""
+        with self._post_actions_flush_lock:
+            # only take the actions under the lock, so deferring and canceling actions
+            # doesn't wait for the query
+            with self._post_actions_lock:
+                self._collect_unreferenced_temp_objects()
+                actions = list(self._pending_post_actions.values())
+                self._pending_post_actions.clear()
+                self._flushing_post_actions = {action.sql for action in actions}
+            if not actions:
+                return
+            self._prune_inflight_post_actions()
+            query = ";\n".join(action.sql for action in actions)
+            statement_params = {"SNOWPARK_SKIP_TXN_COMMIT_IN_DDL": True}
+            query_id = None
+            try:
+                # this may run in a background thread, so don't use the shared cursor
+                cursor = self._conn.cursor()
+                if block:
+                    cursor.execute(
+                        query,
+                        num_statements=len(actions),
+                        _statement_params=statement_params,
+                    )
+                    self.notify_query_listeners(QueryRecord(cursor.sfqid, query))
+                else:
+                    # the actions are forgotten when a later flush finds that the query
+                    # has finished, or when a canceled action has waited for it
+                    query_id = cursor.execute_async(
+                        query,
+                        num_statements=len(actions),
+                        _statement_params=statement_params,
+                    )["queryId"]
+                    self.notify_query_listeners(QueryRecord(query_id, query))
+            except Exception as ex:
+                # the temp objects are dropped at the end of the session anyway
+                logger.warning(f"Failed to run deferred post actions {query}: {ex}")
+            finally:
+                with self._post_actions_lock:
+                    if query_id is not None:
+                        for action in actions:
+                            self._inflight_post_actions[action.sql] = query_id
+                    self._flushing_post_actions = set()
+
+    def _prune_inflight_post_actions(self) -> None:
+        """Forgets the submitted post actions whose queries have finished, and logs the
+        queries that failed."""
+        with self._post_actions_lock:
+            query_ids = set(self._inflight_post_actions.values())
+        finished_query_ids = set()
+        for query_id in query_ids:
+            try:
+                status = self._conn.get_query_status(query_id)
+            except Exception as ex:
+                # keep the actions, so a plan that recreates an object still waits for them
+                logger.debug(
+                    f"Failed to get the status of deferred post actions {query_id}: {ex}"
+                )
+                continue
+            if self._conn.is_still_running(status):
+                continue
+            if self._conn.is_an_error(status):
+                # the temp objects are dropped at the end of the session anyway
+                logger.warning(
+                    f"Failed to run deferred post actions {query_id}: {status}"
+                )
+            finished_query_ids.add(query_id)
+        if finished_query_ids:
+            with self._post_actions_lock:
+                self._inflight_post_actions = {
+                    k: v
+                    for k, v in self._inflight_post_actions.items()
+                    if v not in finished_query_ids
+                }
+
     def get_result_and_metadata(
         self, plan: SnowflakePlan, **kwargs
     ) -> Tuple[List[Row], List[Attribute]]:
@@ -684,6 +1221,43 @@ class ServerConnection:
             self.execute_and_notify_query_listener("alter session unset query_tag")
         logger.debug("Execute batch insertion query %s", query)
 
+    def run_staged_insert(
+        self,
+        query: StagedInsertQuery,
+        session: "snowflake.snowpark.session.Session",
+        **kwargs,
+    ) -> None:
+        statement_params = kwargs.get("_statement_params")
+        stage_location = None
+        try:
+            data = rows_to_parquet(query.rows, query.attributes)
+            if data is not None:
+                # every run uploads its own file, which is purged by COPY INTO
+                stage_location = (
+                    f"{session.get_session_stage(statement_params)}"
+                    f"/{generate_random_alphanumeric()}"
+                )
+                # the Parquet file is already compressed
+                self.upload_stream(
+                    io.BytesIO(data),
+                    stage_location,
+                    "data.parquet",
+                    compress_data=False,
+                    overwrite=True,
+                    statement_params=statement_params,
+                )
+        except Exception as ex:
+            logger.debug(
+                "Failed to upload the rows to a stage, inserting them with bound "
+                "parameters instead: %s",
+                ex,
+            )
+            stage_location = None
+        if stage_location is None:
+            self.run_batch_insert(query.sql, query.rows, **kwargs)
+        else:
+            self.run_query(query.copy_statement(stage_location), **kwargs)
+
     def _get_client_side_session_parameter(self, name: str, default_value: Any) -> Any:
         """It doesn't go to Snowflake to retrieve the session parameter.
         Use this only when you know the Snowflake session parameter is sent to the client when a session/connection is created.
@@ -695,52 +1269,88 @@ class ServerConnection:
         )
 
 
-def _fix_pandas_df_fixed_type(
-    pd_df: "pandas.DataFrame", results_cursor: SnowflakeCursor
+def _iter_result_batches(
+    result_batches: List["ResultBatch"], connection: SnowflakeConnection
+) -> Iterator[tuple]:
+    """Iterates the rows in the result batches of a query. The batches are downloaded one at
+    a time, independently of the cursor that ran the query."""
+    for result_batch in result_batches:
+        for row in result_batch.create_iter(connection=connection):
+            if isinstance(row, Exception):
+                raise row
+            yield row
+
+
+def _fetch_result_batches(
+    result_batches: List["ResultBatch"],
+    fetch: Callable[["ResultBatch"], _T],
+    max_workers: int,
+    memory_budget: int,
+) -> Iterator[_T]:
+    """Fetches the result batches of a query with a pool of ``max_workers`` threads and yields
+    what ``fetch`` returns for each of them, in the order of the batches. A batch is not
+    submitted until the batches that are fetched but not yielded yet fit in ``memory_budget``
+    bytes with it, unless no other batch is in flight."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+        in_flight_size = 0
+        try:
+            for result_batch in result_batches:
+                size = result_batch.uncompressed_size or 0
+                while in_flight and (
+                    in_flight_size + size > memory_budget
+                    or len(in_flight) >= 2 * max_workers
+                ):
+                    future, future_size = in_flight.popleft()
+                    in_flight_size -= future_size
+                    yield future.result()
+                in_flight.append((executor.submit(fetch, result_batch), size))
+                in_flight_size += size
+            while in_flight:
+                future, _ = in_flight.popleft()
+                yield future.result()
+        finally:
+            # don't download the remaining batches if fetching a batch failed
+            for future, _ in in_flight:
+                future.cancel()
+
+
+def _get_fixed_column_scales(
+    result_meta: List[ResultMetadata],
+) -> Dict[int, int]:
+    """Returns the scales of the FIXED columns of a query result, keyed by column index."""
+    return {
+        i: column_metadata.scale
+        for i, column_metadata in enumerate(result_meta)
+        if FIELD_ID_TO_NAME.get(column_metadata.type_code) == "FIXED"
+        and column_metadata.precision is not None
+    }
+
+
+def _arrow_table_to_pandas(
+    table: "pyarrow.Table", fixed_column_scales: Dict[int, int]
 ) -> "pandas.DataFrame":
     """The compiler does not make any guarantees about the return types - only that they will be large enough for the result.
     As a result, the ResultMetadata may contain precision=38, scale=0 for result of a column which may only contain single
-    digit numbers. Then the returned pandas DataFrame has dtype "object" with a str value for that column instead of int64.
+    digit numbers. Then the column is a decimal column in Arrow, which has dtype "object" in pandas instead of int64.
 
-    Based on the Result Metadata characteristics, this functions tries to make a best effort conversion to int64 without losing
-    precision.
-
-    We need to get rid of this workaround because this causes a performance hit.
+    Based on the Result Metadata characteristics, this function narrows the decimal columns of FIXED type in the Arrow table
+    before converting it to a pandas DataFrame, so the whole column is not copied again after the conversion.
     """
-    for column_metadata, pandas_dtype, pandas_col_name in zip(
-        results_cursor.description, pd_df.dtypes, pd_df.columns
-    ):
-        if (
-            FIELD_ID_TO_NAME.get(column_metadata.type_code) == "FIXED"
-            and column_metadata.precision is not None
-        ):
-            if column_metadata.scale == 0 and not str(pandas_dtype).startswith("int"):
-                # When scale = 0 and precision values are between 10-20, the integers fit into int64.
-                # If we rely only on pandas.to_numeric, it loses precision value on large integers, therefore
-                # we try to strictly use astype("int64") in this scenario. If the values are too large to
-                # fit in int64, an OverflowError is thrown and we rely on to_numeric to choose and appropriate
-                # floating datatype to represent the number.
-                if (
-                    column_metadata.precision > 10
-                    and not pd_df[pandas_col_name].hasnans
-                ):
-                    try:
-                        pd_df[pandas_col_name] = pd_df[pandas_col_name].astype("int64")
-                    except OverflowError:
-                        pd_df[pandas_col_name] = pandas.to_numeric(
-                            pd_df[pandas_col_name], downcast="integer"
-                        )
-                else:
-                    pd_df[pandas_col_name] = pandas.to_numeric(
-                        pd_df[pandas_col_name], downcast="integer"
-                    )
-            elif column_metadata.scale > 0 and not str(pandas_dtype).startswith(
-                "float"
-            ):
-                # For decimal columns, we want to cast it into float64 because pandas doesn't
-                # recognize decimal type.
-                pandas.to_numeric(pd_df[pandas_col_name], downcast="float")
-                if pd_df[pandas_col_name].dtype == "O":
-                    pd_df[pandas_col_name] = pd_df[pandas_col_name].astype("float64")
-
-    return pd_df
+    for i, scale in fixed_column_scales.items():
+        column = table.column(i)
+        if not pyarrow.types.is_decimal(column.type):
+            continue
+        if scale == 0 and column.null_count == 0:
+            # Cast strictly to int64 so large integers don't lose precision. If the values are too large to
+            # fit in int64, the cast fails and we fall back to float64.
+            try:
+                column = column.cast(pyarrow.int64())
+            except pyarrow.ArrowInvalid:
+                column = column.cast(pyarrow.float64())
+        else:
+            # For decimal columns, we want to cast it into float64 because pandas doesn't
+            # recognize decimal type.
+            column = column.cast(pyarrow.float64())
+        table = table.set_column(i, table.field(i).name, column)
+    return table.to_pandas(split_blocks=True)
@@ -33,7 +33,7 @@ from typing import (  # noqa: F401
 import snowflake.snowpark.types  # type: ignore
 from snowflake.connector.constants import FIELD_ID_TO_NAME
 from snowflake.connector.cursor import ResultMetadata
-from snowflake.connector.options import installed_pandas, pandas
+from snowflake.connector.options import installed_pandas, pandas, pyarrow
 from snowflake.snowpark.types import (
     LTZ,
     NTZ,
@@ -249,6 +249,26 @@ def convert_sp_to_sf_type(datatype: DataType) -> str:
     raise TypeError(f"Unsupported data type: {datatype.__class__.__name__}")
 
 
+def convert_sp_to_arrow_type(datatype: DataType) -> Optional["pyarrow.DataType"]:
+    """Returns the Arrow type of the Python values of ``datatype`` that can be written to a
+    Parquet file and loaded into a column of ``datatype``, or None if there isn't one."""
+    if not installed_pandas:
+        return None
+    if isinstance(datatype, DecimalType):
+        return pyarrow.decimal128(datatype.precision, datatype.scale)
+    if isinstance(datatype, (ByteType, ShortType, IntegerType, LongType)):
+        return pyarrow.int64()
+    if isinstance(datatype, (FloatType, DoubleType)):
+        return pyarrow.float64()
+    if isinstance(datatype, (StringType, NullType)):
+        return pyarrow.string()
+    if isinstance(datatype, BooleanType):
+        return pyarrow.bool_()
+    if isinstance(datatype, BinaryType):
+        return pyarrow.binary()
+    return None
+
+
 # Mapping Python types to DataType
 NoneType = type(None)
 PYTHON_TO_SNOW_TYPE_MAPPINGS = {
@@ -411,6 +431,31 @@ def infer_schema(
     return StructType(fields)
 
 
+def infer_schema_from_rows(
+    rows: Iterable[Any], names: Optional[List] = None
+) -> StructType:
+    """Infers the schema of ``rows``, which is the same as merging the schemas inferred from
+    every row with :func:`merge_type`.
+
+    The schema of a list or tuple of scalar values only depends on the Python types of its
+    values, so it's only inferred and merged for the first row of every combination of types.
+    The other rows are only checked against the combinations seen before, which is much
+    cheaper when there are many rows.
+    """
+    schema = None
+    seen_row_types = set()
+    for row in rows:
+        if type(row) in (list, tuple):
+            row_types = tuple(map(type, row))
+            if row_types in seen_row_types:
+                continue
+            if all(t in PYTHON_TO_SNOW_TYPE_MAPPINGS for t in row_types):
+                seen_row_types.add(row_types)
+        row_schema = infer_schema(row, names)
+        schema = row_schema if schema is None else merge_type(schema, row_schema)
+    return schema
+
+
 def merge_type(a: DataType, b: DataType, name: Optional[str] = None) -> DataType:
     # null type
     if isinstance(a, NullType):
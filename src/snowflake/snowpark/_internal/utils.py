@@ -10,6 +10,7 @@ import decimal
 import functools
 import hashlib
 import io
+import json
 import logging
 import os
 import platform
@@ -41,7 +42,7 @@ from typing import (
 import snowflake.snowpark
 from snowflake.connector.cursor import ResultMetadata, SnowflakeCursor
 from snowflake.connector.description import OPERATING_SYSTEM, PLATFORM
-from snowflake.connector.options import pandas
+from snowflake.connector.options import pandas, pyarrow
 from snowflake.connector.version import VERSION as connector_version
 from snowflake.snowpark._internal.error_message import SnowparkClientExceptionMessages
 from snowflake.snowpark.row import Row
@@ -93,6 +94,7 @@ SNOWFLAKE_STAGE_NAME_PATTERN = f"(%?{SNOWFLAKE_ID_PATTERN})"
 
 # Prefix for allowed temp object names in stored proc
 TEMP_OBJECT_NAME_PREFIX = "SNOWPARK_TEMP_"
+PERSISTED_CACHE_TABLE_NAME_PREFIX = "SNOWPARK_CACHE_RESULT_"
 ALPHANUMERIC = string.digits + string.ascii_lowercase
 
 # select and CTE (https://docs.snowflake.com/en/sql-reference/constructs/with.html) are select statements in Snowflake.
@@ -562,6 +564,70 @@ def generate_random_alphanumeric(length: int = 10) -> str:
     return "".join(choice(ALPHANUMERIC) for _ in range(length))
 
 
+# names generated randomly for a single query: the prefixes of the columns that are
+# aliased by joins and lateral joins, and the names of CTEs and temporary columns
+_QUERY_GENERATED_NAME_PATTERN = re.compile(
+    r'(?<=")[alr]_[0-9a-z]{4}_'
+    rf"|{TEMP_OBJECT_NAME_PREFIX}(?:CTE|COLUMN)_[0-9A-Z]{{10}}"
+)
+# names of the temporary objects that only exist in the session that created them
+_SESSION_TEMP_OBJECT_NAME_PATTERN = re.compile(
+    rf"{TEMP_OBJECT_NAME_PREFIX}(?:"
+    + "|".join(
+        t.value
+        for t in TempObjectType
+        if t not in (TempObjectType.CTE, TempObjectType.COLUMN)
+    )
+    + r")_[0-9A-Z]{10}",
+    re.IGNORECASE,
+)
+
+
+def persisted_cache_table_name_prefix(
+    queries: List[Tuple[str, Any]], role: str
+) -> Optional[str]:
+    """Returns the prefix of the names of the tables that persist the result of ``queries``,
+    a list of sql texts and their parameters, when it's cached by ``role``. The result of the
+    same queries may differ by role, e.g. with row access policies, so it's hashed too.
+
+    The names generated randomly for the queries are replaced by their order of appearance,
+    so the same queries built in other sessions have the same prefix. Returns None if the
+    queries use temporary objects, which the queries of other sessions can't use."""
+    fingerprints = []
+    for sql, params in queries:
+        if _SESSION_TEMP_OBJECT_NAME_PATTERN.search(sql):
+            return None
+        generated_names = {}
+        fingerprints.append(
+            (
+                _QUERY_GENERATED_NAME_PATTERN.sub(
+                    lambda m: generated_names.setdefault(
+                        m.group(), f"<generated name {len(generated_names)}>"
+                    ),
+                    sql,
+                ),
+                params,
+            )
+        )
+    digest = hashlib.sha256(repr((fingerprints, role)).encode("utf-8")).hexdigest()
+    return f"{PERSISTED_CACHE_TABLE_NAME_PREFIX}{digest[:32].upper()}_"
+
+
+def get_scanned_tables_from_explain(explain_json: str) -> Optional[List[str]]:
+    """Returns the fully qualified names of the tables scanned by a query, from the output of
+    ``EXPLAIN USING JSON``. Returns None if the query scans anything but tables, e.g. files in
+    a stage, so its result can't be known to be unchanged from the versions of the tables."""
+    tables = set()
+    for step in json.loads(explain_json).get("Operations", []):
+        for operation in step:
+            name = operation.get("operation", "")
+            if name == "TableScan":
+                tables.update(operation.get("objects", []))
+            elif name.endswith("Scan"):
+                return None
+    return sorted(tables)
+
+
 def column_to_bool(col_):
     """A replacement to bool(col_) to check if ``col_`` is None or Empty.
 
@@ -579,18 +645,12 @@ def result_set_to_rows(
     result_meta: Optional[Union[List[ResultMetadata], List["ResultMetadataV2"]]] = None,
     case_sensitive: bool = True,
 ) -> List[Row]:
-    col_names = [col.name for col in result_meta] if result_meta else None
+    row_type = _get_row_type(result_meta, case_sensitive)
     rows = []
-    row_struct = Row
-    if col_names:
-        row_struct = (
-            Row._builder.build(*col_names).set_case_sensitive(case_sensitive).to_row()
-        )
     for data in result_set:
         if data is None:
             raise ValueError("Result returned from Python connector is None")
-        row = row_struct(*data)
-        rows.append(row)
+        rows.append(tuple.__new__(row_type, data))
     return rows
 
 
@@ -599,17 +659,26 @@ def result_set_to_iter(
     result_meta: Optional[List[ResultMetadata]] = None,
     case_sensitive: bool = True,
 ) -> Iterator[Row]:
-    col_names = [col.name for col in result_meta] if result_meta else None
-    row_struct = Row
-    if col_names:
-        row_struct = (
-            Row._builder.build(*col_names).set_case_sensitive(case_sensitive).to_row()
-        )
+    row_type = _get_row_type(result_meta, case_sensitive)
     for data in result_set:
         if data is None:
             raise ValueError("Result returned from Python connector is None")
-        row = row_struct(*data)
-        yield row
+        yield tuple.__new__(row_type, data)
+
+
+def _get_row_type(
+    result_meta: Optional[Union[List[ResultMetadata], List["ResultMetadataV2"]]],
+    case_sensitive: bool,
+) -> Type[Row]:
+    # the rows of a result share the metadata of their fields through their type
+    col_names = [col.name for col in result_meta] if result_meta else None
+    if col_names:
+        return (
+            Row._builder.build(*col_names)
+            .set_case_sensitive(case_sensitive)
+            .to_row_type()
+        )
+    return Row
 
 
 class PythonObjJSONEncoder(JSONEncoder):
@@ -757,6 +826,16 @@ def check_is_pandas_dataframe_in_to_pandas(result: Any) -> None:
         )
 
 
+def check_is_pyarrow_table_in_to_arrow(result: Any) -> None:
+    if not isinstance(result, pyarrow.Table):
+        raise SnowparkClientExceptionMessages.SERVER_FAILED_FETCH_ARROW(
+            "to_arrow() did not return a pyarrow Table. "
+            "If you use session.sql(...).to_arrow(), the input query can only be a "
+            "SELECT statement. Or you can use session.sql(...).collect() to get a "
+            "list of Row objects for a non-SELECT statement."
+        )
+
+
 def get_copy_into_table_options(
     options: Dict[str, Any]
 ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
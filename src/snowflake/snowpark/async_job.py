@@ -13,6 +13,7 @@ from snowflake.snowpark._internal.analyzer.analyzer_utils import result_scan_sta
 from snowflake.snowpark._internal.analyzer.snowflake_plan import Query
 from snowflake.snowpark._internal.utils import (
     check_is_pandas_dataframe_in_to_pandas,
+    check_is_pyarrow_table_in_to_arrow,
     is_in_stored_procedure,
     result_set_to_iter,
     result_set_to_rows,
@@ -22,6 +23,8 @@ from snowflake.snowpark.functions import col
 from snowflake.snowpark.row import Row
 
 if TYPE_CHECKING:
+    import pyarrow
+
     import snowflake.snowpark.dataframe
     import snowflake.snowpark.session
 
@@ -33,6 +36,8 @@ class _AsyncResultType(Enum):
     ITERATOR = "row_iterator"
     PANDAS = "pandas"
     PANDAS_BATCH = "pandas_batches"
+    ARROW = "arrow"
+    ARROW_BATCH = "arrow_batches"
     COUNT = "count"
     NO_RESULT = "no_result"
     UPDATE = "update"
@@ -291,13 +296,23 @@ class AsyncJob:
     def result(
         self,
         result_type: Optional[
-            Literal["row", "row_iterator", "pandas", "pandas_batches", "no_result"]
+            Literal[
+                "row",
+                "row_iterator",
+                "pandas",
+                "pandas_batches",
+                "arrow",
+                "arrow_batches",
+                "no_result",
+            ]
         ] = None,
     ) -> Union[
         List[Row],
         Iterator[Row],
         "pandas.DataFrame",
         Iterator["pandas.DataFrame"],
+        "pyarrow.Table",
+        Iterator["pyarrow.Table"],
         int,
         "snowflake.snowpark.MergeResult",
         "snowflake.snowpark.UpdateResult",
@@ -323,6 +338,10 @@ class AsyncJob:
                   :meth:`DataFrame.to_pandas`.
                 - "pandas_batches": returns an iterator of ``pandas.DataFrame`` s, which is the same
                   as the return type of :meth:`DataFrame.to_pandas_batches`.
+                - "arrow": returns a ``pyarrow.Table``, which is the same as the return type of
+                  :meth:`DataFrame.to_arrow`.
+                - "arrow_batches": returns an iterator of ``pyarrow.Table`` s, which is the same
+                  as the return type of :meth:`DataFrame.to_arrow_batches`.
                 - "no_result": returns ``None``. You can use this option when you intend to execute
                   the query but don't care about query results (the client will not fetch results
                   either).
@@ -350,6 +369,8 @@ class AsyncJob:
             if async_result_type in (
                 _AsyncResultType.PANDAS,
                 _AsyncResultType.PANDAS_BATCH,
+                _AsyncResultType.ARROW,
+                _AsyncResultType.ARROW_BATCH,
             ):
                 self._cursor.execute(
                     f"select * from table(result_scan('{self._cursor.sfqid}'))"
@@ -366,6 +387,15 @@ class AsyncJob:
             result = self._session._conn._to_data_or_iter(
                 self._cursor, to_pandas=True, to_iter=True
             )["data"]
+        elif async_result_type == _AsyncResultType.ARROW:
+            result = self._session._conn._to_data_or_iter(
+                self._cursor, to_arrow=True, to_iter=False
+            )["data"]
+            check_is_pyarrow_table_in_to_arrow(result)
+        elif async_result_type == _AsyncResultType.ARROW_BATCH:
+            result = self._session._conn._to_data_or_iter(
+                self._cursor, to_arrow=True, to_iter=True
+            )["data"]
         else:
             result_data = self._cursor.fetchall()
             self._result_meta = self._cursor.description
@@ -4,6 +4,7 @@
 #
 
 import copy
+import hashlib
 import itertools
 import re
 import sys
@@ -38,6 +39,8 @@ from snowflake.snowpark._internal.analyzer.binary_plan_node import (
     UsingJoin,
     create_join_type,
 )
+from snowflake.snowpark._internal.analyzer.cte_utils import get_tree_node_query
+from snowflake.snowpark._internal.analyzer.datatype_mapper import str_to_sql
 from snowflake.snowpark._internal.analyzer.expression import (
     Attribute,
     Expression,
@@ -104,6 +107,7 @@ from snowflake.snowpark._internal.utils import (
     SKIP_LEVELS_TWO,
     TempObjectType,
     check_is_pandas_dataframe_in_to_pandas,
+    check_is_pyarrow_table_in_to_arrow,
     column_to_bool,
     create_or_update_statement_params_with_query_tag,
     deprecated,
@@ -111,11 +115,13 @@ from snowflake.snowpark._internal.utils import (
     experimental,
     generate_random_alphanumeric,
     get_copy_into_table_options,
+    get_scanned_tables_from_explain,
     is_snowflake_quoted_id_case_insensitive,
     is_snowflake_unquoted_suffix_case_insensitive,
     is_sql_select_statement,
     parse_positional_args_to_list,
     parse_table_name,
+    persisted_cache_table_name_prefix,
     prepare_pivot_arguments,
     private_preview,
     quote_name,
@@ -163,6 +169,7 @@ else:
     from collections.abc import Iterable
 
 if TYPE_CHECKING:
+    import pyarrow  # pragma: no cover
     from table import Table  # pragma: no cover
 
 _logger = getLogger(__name__)
@@ -892,6 +899,150 @@ class DataFrame:
             **kwargs,
         )
 
+    @overload
+    def to_arrow(
+        self,
+        *,
+        statement_params: Optional[Dict[str, str]] = None,
+        block: bool = True,
+        **kwargs: Dict[str, Any],
+    ) -> "pyarrow.Table":
+        ...  # pragma: no cover
+
+    @overload
+    def to_arrow(
+        self,
+        *,
+        statement_params: Optional[Dict[str, str]] = None,
+        block: bool = False,
+        **kwargs: Dict[str, Any],
+    ) -> AsyncJob:
+        ...  # pragma: no cover
+
+    @df_collect_api_telemetry
+    def to_arrow(
+        self,
+        *,
+        statement_params: Optional[Dict[str, str]] = None,
+        block: bool = True,
+        **kwargs: Dict[str, Any],
+    ) -> Union["pyarrow.Table", AsyncJob]:
+        """
+        Executes the query representing this DataFrame and returns the result as a
+        `pyarrow Table <https://arrow.apache.org/docs/python/generated/pyarrow.Table.html>`_.
+
+        The result is made of the Arrow data fetched from Snowflake, so unlike :meth:`to_pandas`,
+        it is not copied into Python objects or a pandas DataFrame. When the data is too large to
+        fit into memory, you can use :meth:`to_arrow_batches`.
+
+        Example::
+
+            >>> df = session.create_dataframe([[1, "a"], [2, "b"]], schema=["a", "b"])
+            >>> df.to_arrow().to_pydict()
+            {'A': [1, 2], 'B': ['a', 'b']}
+
+        Args:
+            statement_params: Dictionary of statement level parameters to be set while executing this action.
+            block: A bool value indicating whether this function will wait until the result is available.
+                When it is ``False``, this function executes the underlying queries of the dataframe
+                asynchronously and returns an :class:`AsyncJob`.
+
+        Note:
+            1. This method is only available if pyarrow is installed and available.
+
+            2. If you use :func:`Session.sql` with this method, the input query of
+            :func:`Session.sql` can only be a SELECT statement.
+        """
+        with open_telemetry_context_manager(self.to_arrow, self):
+            result = self._session._conn.execute(
+                self._plan,
+                to_arrow=True,
+                block=block,
+                data_type=_AsyncResultType.ARROW,
+                _statement_params=create_or_update_statement_params_with_query_tag(
+                    statement_params or self._statement_params,
+                    self._session.query_tag,
+                    SKIP_LEVELS_TWO,
+                ),
+                **kwargs,
+            )
+
+        # if the returned result is not a pyarrow table, raise Exception
+        # this might happen when calling this method with non-select commands
+        if block:
+            check_is_pyarrow_table_in_to_arrow(result)
+
+        return result
+
+    @overload
+    def to_arrow_batches(
+        self,
+        *,
+        statement_params: Optional[Dict[str, str]] = None,
+        block: bool = True,
+        **kwargs: Dict[str, Any],
+    ) -> Iterator["pyarrow.Table"]:
+        ...  # pragma: no cover
+
+    @overload
+    def to_arrow_batches(
+        self,
+        *,
+        statement_params: Optional[Dict[str, str]] = None,
+        block: bool = False,
+        **kwargs: Dict[str, Any],
+    ) -> AsyncJob:
+        ...  # pragma: no cover
+
+    @df_collect_api_telemetry
+    def to_arrow_batches(
+        self,
+        *,
+        statement_params: Optional[Dict[str, str]] = None,
+        block: bool = True,
+        **kwargs: Dict[str, Any],
+    ) -> Union[Iterator["pyarrow.Table"], AsyncJob]:
+        """
+        Executes the query representing this DataFrame and returns an iterator of
+        pyarrow tables (containing a subset of rows) that you can use to
+        retrieve the results.
+
+        Unlike :meth:`to_arrow`, this method does not load all data into memory
+        at once.
+
+        Example::
+
+            >>> df = session.create_dataframe([[1, 2], [3, 4]], schema=["a", "b"])
+            >>> for table in df.to_arrow_batches():
+            ...     print(table.to_pydict())
+            {'A': [1, 3], 'B': [2, 4]}
+
+        Args:
+            statement_params: Dictionary of statement level parameters to be set while executing this action.
+            block: A bool value indicating whether this function will wait until the result is available.
+                When it is ``False``, this function executes the underlying queries of the dataframe
+                asynchronously and returns an :class:`AsyncJob`.
+
+        Note:
+            1. This method is only available if pyarrow is installed and available.
+
+            2. If you use :func:`Session.sql` with this method, the input query of
+            :func:`Session.sql` can only be a SELECT statement.
+        """
+        return self._session._conn.execute(
+            self._plan,
+            to_arrow=True,
+            to_iter=True,
+            block=block,
+            data_type=_AsyncResultType.ARROW_BATCH,
+            _statement_params=create_or_update_statement_params_with_query_tag(
+                statement_params or self._statement_params,
+                self._session.query_tag,
+                SKIP_LEVELS_TWO,
+            ),
+            **kwargs,
+        )
+
     @df_api_usage
     def to_df(self, *names: Union[str, Iterable[str]]) -> "DataFrame":
         """
@@ -1607,7 +1758,7 @@ class DataFrame:
         rownum = row_number().over(
             snowflake.snowpark.Window.partition_by(*filter_cols).order_by(*filter_cols)
         )
-        rownum_name = generate_random_alphanumeric()
+        rownum_name = random_name_for_temp_object(TempObjectType.COLUMN)
         df = (
             self.select(*output_cols, rownum.as_(rownum_name))
             .where(col(rownum_name) == 1)
@@ -3775,7 +3926,10 @@ class DataFrame:
 
     @df_collect_api_telemetry
     def cache_result(
-        self, *, statement_params: Optional[Dict[str, str]] = None
+        self,
+        *,
+        statement_params: Optional[Dict[str, str]] = None,
+        persist: bool = False,
     ) -> "Table":
         """Caches the content of this DataFrame to create a new cached Table DataFrame.
 
@@ -3829,13 +3983,39 @@ class DataFrame:
 
         Args:
             statement_params: Dictionary of statement level parameters to be set while executing this action.
+            persist: If ``True``, the result is cached in a transient table in the current database and schema,
+                whose name is derived from the queries of this DataFrame, the current role and the versions of
+                the tables it reads. If such a table was created earlier, in this or another session, it's reused
+                without running the queries again. Otherwise, it's created. The transient table isn't dropped at
+                the end of the session, and neither are the tables that cached the result for older versions of the
+                tables, because other sessions may still use them. Drop the tables whose names start with
+                ``SNOWPARK_CACHE_RESULT_`` when they're not needed anymore.
+                Only the tables read by the DataFrame are tracked, so a DataFrame with a non-deterministic
+                result, e.g. one using :func:`functions.current_date`, keeps returning the result that was cached
+                first. If the DataFrame reads anything but tables, e.g. files in a stage, or is run with multiple
+                queries, or uses temporary objects, e.g. a temporary table or function, its result is cached in a
+                new temporary table as when ``persist`` is ``False``.
 
         Returns:
-             A :class:`Table` object that holds the cached result in a temporary table.
-             All operations on this new DataFrame have no effect on the original.
+             A :class:`Table` object that holds the cached result in a temporary table, or a transient table
+             if ``persist`` is ``True``. All operations on this new DataFrame have no effect on the original.
         """
         from snowflake.snowpark.mock._connection import MockServerConnection
 
+        statement_params = create_or_update_statement_params_with_query_tag(
+            statement_params or self._statement_params,
+            self._session.query_tag,
+            SKIP_LEVELS_TWO,
+        )
+        if persist and not isinstance(self._session._conn, MockServerConnection):
+            persisted_table_name = self._get_or_create_persisted_cache_table(
+                statement_params
+            )
+            if persisted_table_name is not None:
+                cached_df = self._session.table(persisted_table_name)
+                cached_df.is_cached = True
+                return cached_df
+
         temp_table_name = self._session.get_fully_qualified_name_if_possible(
             f'"{random_name_for_temp_object(TempObjectType.TABLE)}"'
         )
@@ -3850,17 +4030,79 @@ class DataFrame:
                 is_generated=True,
             )
             self._session._conn.execute(
-                create_temp_table,
-                _statement_params=create_or_update_statement_params_with_query_tag(
-                    statement_params or self._statement_params,
-                    self._session.query_tag,
-                    SKIP_LEVELS_TWO,
-                ),
+                create_temp_table, _statement_params=statement_params
             )
         cached_df = self._session.table(temp_table_name)
         cached_df.is_cached = True
+        if self._session.auto_clean_up_temp_table_enabled and not isinstance(
+            self._session._conn, MockServerConnection
+        ):
+            self._session._clean_up_temp_table_when_unreferenced(cached_df)
         return cached_df
 
+    def _get_or_create_persisted_cache_table(
+        self, statement_params: Optional[Dict[str, str]]
+    ) -> Optional[str]:
+        """Returns the name of the transient table that persists the result of this DataFrame for
+        the current versions of the tables it reads, and creates it if it doesn't exist. Returns
+        None if the tables it reads can't be known."""
+        if len(self._plan.queries) > 1 or self._plan.post_actions:
+            return None
+        query = self._plan.queries[0]
+        name_prefix = persisted_cache_table_name_prefix(
+            [(query.sql, query.params)], self._session.get_current_role()
+        )
+        if name_prefix is None:
+            return None
+        conn = self._session._conn
+        explain_rows = conn.run_query(
+            f"explain using json {query.sql}",
+            params=query.params,
+            _statement_params=statement_params,
+        )["data"]
+        tables = get_scanned_tables_from_explain(explain_rows[0][0])
+        if tables is None:
+            return None
+        versions = (
+            conn.run_query(
+                "select "
+                + ", ".join(
+                    f"system$last_change_commit_time({str_to_sql(table)})"
+                    for table in tables
+                ),
+                _statement_params=statement_params,
+            )["data"][0]
+            if tables
+            else ()
+        )
+        version_hash = hashlib.sha256(
+            repr(list(zip(tables, versions))).encode("utf-8")
+        ).hexdigest()
+        table_name = f"{name_prefix}{version_hash[:16].upper()}"
+
+        database = self._session.get_current_database()
+        schema = self._session.get_current_schema()
+        in_schema = f" in schema {database}.{schema}" if database and schema else ""
+        qualified_table_name = self._session.get_fully_qualified_name_if_possible(
+            table_name
+        )
+        # the tables that cache the result for older versions of the tables aren't dropped,
+        # because other sessions may still read them
+        if not any(
+            row[1] == table_name
+            for row in conn.run_query(
+                f"show tables like {str_to_sql(table_name)}{in_schema}",
+                _statement_params=statement_params,
+            )["data"]
+        ):
+            self.write.save_as_table(
+                qualified_table_name,
+                mode="ignore",
+                table_type="transient",
+                statement_params=statement_params,
+            )
+        return qualified_table_name
+
     @df_collect_api_telemetry
     def random_split(
         self,
@@ -3960,6 +4202,18 @@ class DataFrame:
         msg = f"""---------DATAFRAME EXECUTION PLAN----------
 Query List:
 {output_queries}"""
+        # show the repeated subqueries that the CTE cost model didn't convert to CTEs
+        _, inlined_plan_set = self._plan.find_duplicate_subtrees_for_cte()
+        if inlined_plan_set:
+            inlined_queries = "\n---\n".join(
+                f"{i+1}.\n{query.strip()}"
+                for i, query in enumerate(
+                    sorted(get_tree_node_query(node) for node in inlined_plan_set)
+                )
+            )
+            msg = (
+                f"{msg}\nRepeated Subqueries Not Converted to CTEs:\n{inlined_queries}"
+            )
         # if query list contains more then one queries, skip execution plan
         if len(plan.queries) == 1:
             exec_plan = self._session._explain_query(plan.queries[0].sql)
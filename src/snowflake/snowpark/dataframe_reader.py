@@ -14,6 +14,7 @@ from snowflake.snowpark._internal.analyzer.analyzer_utils import (
     quote_name_without_upper_casing,
 )
 from snowflake.snowpark._internal.analyzer.expression import Attribute
+from snowflake.snowpark._internal.analyzer.snowflake_plan import Query
 from snowflake.snowpark._internal.analyzer.unary_expression import Alias
 from snowflake.snowpark._internal.error_message import SnowparkClientExceptionMessages
 from snowflake.snowpark._internal.telemetry import set_api_call_source
@@ -642,9 +643,22 @@ class DataFrameReader:
         finally:
             # Clean up the file format we created
             if drop_tmp_file_format_if_exists_query is not None:
-                self._session._conn.run_query(
-                    drop_tmp_file_format_if_exists_query, is_ddl_on_temp_object=True
-                )
+                if self._session.pipelined_execution_enabled:
+                    # the file format has a random name, so its drop can be batched with
+                    # other deferred drops instead of costing a round trip now
+                    self._session._conn._defer_post_actions(
+                        [
+                            Query(
+                                drop_tmp_file_format_if_exists_query,
+                                is_ddl_on_temp_object=True,
+                            )
+                        ]
+                    )
+                else:
+                    self._session._conn.run_query(
+                        drop_tmp_file_format_if_exists_query,
+                        is_ddl_on_temp_object=True,
+                    )
 
         return new_schema, schema_to_cast, read_file_transformations, None
 
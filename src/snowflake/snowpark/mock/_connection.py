@@ -21,7 +21,7 @@ import snowflake.snowpark.mock._constants
 from snowflake.connector.cursor import ResultMetadata, SnowflakeCursor
 from snowflake.connector.errors import NotSupportedError, ProgrammingError
 from snowflake.connector.network import ReauthenticationRequest
-from snowflake.connector.options import pandas
+from snowflake.connector.options import pandas, pyarrow
 from snowflake.snowpark._internal.analyzer.analyzer_utils import (
     escape_quotes,
     quote_name,
@@ -536,9 +536,15 @@ class MockServerConnection:
         block: bool = True,
         data_type: _AsyncResultType = _AsyncResultType.ROW,
         case_sensitive: bool = True,
+        to_arrow: bool = False,
         **kwargs,
     ) -> Union[
-        List[Row], "pandas.DataFrame", Iterator[Row], Iterator["pandas.DataFrame"]
+        List[Row],
+        "pandas.DataFrame",
+        Iterator[Row],
+        Iterator["pandas.DataFrame"],
+        "pyarrow.Table",
+        Iterator["pyarrow.Table"],
     ]:
         if not block:
             self.log_not_supported_error(
@@ -587,31 +593,33 @@ class MockServerConnection:
                 sf_types = [res.sf_types_by_col_index[key] for key in keys]
             else:
                 sf_types = [res.sf_types[col] for col in res.columns]
+            row_type = (
+                Row._builder.build(*columns)
+                .set_case_sensitive(case_sensitive)
+                .to_row_type()
+            )
             for pdr in res.itertuples(index=False, name=None):
-                row_struct = (
-                    Row._builder.build(*columns)
-                    .set_case_sensitive(case_sensitive)
-                    .to_row()
-                )
-                row = row_struct(
-                    *[
+                row = tuple.__new__(
+                    row_type,
+                    [
                         Decimal(str(v))
                         if isinstance(sf_types[i].datatype, DecimalType)
                         and v is not None
                         else v
                         for i, v in enumerate(pdr)
-                    ]
+                    ],
                 )
-                row._fields = columns
                 rows.append(row)
         elif isinstance(res, list):
             rows = [r for r in res]
 
-        if to_pandas:
+        if to_pandas or to_arrow:
             pandas_df = pandas.DataFrame()
             for col_name in res.columns:
                 pandas_df[unquote_if_quoted(col_name)] = res[col_name].tolist()
             rows = _fix_pandas_df_fixed_type(res)
+            if to_arrow:
+                rows = pyarrow.Table.from_pandas(rows, preserve_index=False)
 
             # the following implementation is just to make DataFrame.to_pandas_batches API workable
             # in snowflake, large data result are split into multiple data chunks
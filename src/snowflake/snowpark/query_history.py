@@ -24,6 +24,7 @@ class QueryHistory:
     def __init__(self, session: "snowflake.snowpark.session.Session") -> None:
         self.session = session
         self._queries: List[QueryRecord] = []
+        self._cached_queries: List[QueryRecord] = []
 
     def __enter__(self):
         return self
@@ -34,6 +35,16 @@ class QueryHistory:
     def _add_query(self, query_record: QueryRecord):
         self._queries.append(query_record)
 
+    def _add_cached_query(self, query_record: QueryRecord):
+        self._cached_queries.append(query_record)
+
     @property
     def queries(self) -> List[QueryRecord]:
         return self._queries
+
+    @property
+    def cached_queries(self) -> List[QueryRecord]:
+        """The queries whose results were returned from the result cache of the session instead
+        of being pushed down to the Snowflake database, with the ids of the queries that
+        originally returned the results. See :attr:`Session.result_cache_enabled`."""
+        return self._cached_queries
@@ -4,7 +4,7 @@
 #
 
 import sys
-from typing import Any, Dict, Union
+from typing import Any, Dict, Type, Union
 
 # Python 3.8 needs to use typing.Iterable because collections.abc.Iterable is not subscriptable
 # Python 3.9 can use both
@@ -111,8 +111,44 @@ class Row(tuple):
             row.__dict__["_case_sensitive"] = self._case_sensitive
             return row
 
+        def to_row_type(self) -> Type["Row"]:
+            """Returns a subclass of :class:`Row` whose instances have the values of this builder
+            as fields. The fields and the metadata derived from them are stored once in the
+            subclass, so its instances are plain tuples without a ``__dict__``, unless a
+            ``__dict__`` is needed later, e.g. :meth:`Row.as_dict` is called. Create the
+            instances with ``tuple.__new__(row_type, values)``."""
+            fields = list(self.to_row())
+            has_duplicates = len(set(fields)) != len(fields)
+            return type(
+                Row.__name__,
+                (Row,),
+                {
+                    "_fields": fields,
+                    "_has_duplicates": has_duplicates,
+                    "_case_sensitive": self._case_sensitive,
+                    "_field_indexes": None
+                    if has_duplicates
+                    else {field: i for i, field in enumerate(fields)},
+                },
+            )
+
     _builder = _RowBuilder()
 
+    # The default values of the attributes of a row. A row only stores the attributes that
+    # don't have the default value in its __dict__.
+    _named_values = None
+    # _fields is for internal use only. Users shouldn't set this attribute.
+    # It contains a list of str representing column names. It also allows duplicates.
+    # snowflake DB can return duplicate column names, for instance, "select a, a from a_table."
+    # When return a DataFrame from a sql, duplicate column names can happen.
+    # But using duplicate column names is obviously a bad practice even though we allow it.
+    # It's value is assigned in __setattr__ if internal code assign value explicitly.
+    _fields = None
+    _has_duplicates = None
+    _case_sensitive = True
+    # field -> index, only set by the row types created by _RowBuilder.to_row_type()
+    _field_indexes = None
+
     def __new__(cls, *values: Any, **named_values: Any):
         if values and named_values:
             raise ValueError("Either values or named_values is required but not both.")
@@ -124,17 +160,6 @@ class Row(tuple):
             row.__dict__["_fields"] = tuple(named_values.keys())
         else:
             row = tuple.__new__(cls, values)
-            row.__dict__["_named_values"] = None
-            row.__dict__["_fields"] = None
-
-        # _fields is for internal use only. Users shouldn't set this attribute.
-        # It contains a list of str representing column names. It also allows duplicates.
-        # snowflake DB can return duplicate column names, for instance, "select a, a from a_table."
-        # When return a DataFrame from a sql, duplicate column names can happen.
-        # But using duplicate column names is obviously a bad practice even though we allow it.
-        # It's value is assigned in __setattr__ if internal code assign value explicitly.
-        row.__dict__["_has_duplicates"] = None
-        row.__dict__["_case_sensitive"] = True
         return row
 
     def __getitem__(self, item: Union[int, str, slice]):
@@ -145,6 +170,8 @@ class Row(tuple):
         else:  # str
             if not self._case_sensitive:
                 item = canonicalize_field(item)
+            if self._field_indexes is not None:
+                return super().__getitem__(self._field_indexes[item])
             self._populate_named_values_from_fields()
             # get from _named_values first
             if self._named_values:
@@ -167,6 +194,10 @@ class Row(tuple):
     def __getattr__(self, item):
         if not self._case_sensitive:
             item = canonicalize_field(item)
+        if self._field_indexes is not None:
+            if item in self._field_indexes:
+                return self[self._field_indexes[item]]
+            raise AttributeError(f"Row object has no attribute {item}")
         self._populate_named_values_from_fields()
         if self._named_values and item in self._named_values:
             return self._named_values[item]
@@ -186,8 +217,14 @@ class Row(tuple):
             if not self._case_sensitive:
                 value = [canonicalize_field(val) for val in value]
             self.__dict__["_fields"] = value
+            if self._field_indexes is not None or self._has_duplicates is not None:
+                # the metadata derived from the previous fields doesn't apply anymore
+                self.__dict__["_has_duplicates"] = None
+                self.__dict__["_field_indexes"] = None
 
     def __contains__(self, item):
+        if self._field_indexes is not None:
+            return item in self._field_indexes
         self._populate_named_values_from_fields()
         if self._named_values:
             return item in self._named_values
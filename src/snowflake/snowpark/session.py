@@ -5,8 +5,8 @@
 
 import atexit
 import datetime
-import decimal
 import inspect
+import io
 import json
 import logging
 import os
@@ -15,11 +15,25 @@ import sys
 import tempfile
 import warnings
 from array import array
-from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 from threading import RLock
 from types import ModuleType
-from typing import Any, Dict, List, Literal, Optional, Sequence, Set, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NoReturn,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import cloudpickle
 import pkg_resources
@@ -28,16 +42,35 @@ from snowflake.connector import ProgrammingError, SnowflakeConnection
 from snowflake.connector.options import installed_pandas, pandas
 from snowflake.connector.pandas_tools import write_pandas
 from snowflake.snowpark._internal.analyzer import analyzer_utils
-from snowflake.snowpark._internal.analyzer.analyzer import Analyzer
-from snowflake.snowpark._internal.analyzer.analyzer_utils import result_scan_statement
+from snowflake.snowpark._internal.analyzer.analyzer import (
+    LOCAL_DATA_UPLOAD_THRESHOLD,
+    Analyzer,
+)
+from snowflake.snowpark._internal.analyzer.analyzer_utils import (
+    convert_value_to_sql_option,
+    copy_into_table,
+    create_file_format_statement,
+    create_table_statement,
+    drop_file_format_if_exists_statement,
+    drop_table_if_exists_statement,
+    infer_schema_statement,
+    quote_name_without_upper_casing,
+    result_scan_statement,
+)
+from snowflake.snowpark._internal.analyzer.cte_utils import CTECostModel
 from snowflake.snowpark._internal.analyzer.datatype_mapper import str_to_sql
 from snowflake.snowpark._internal.analyzer.expression import Attribute
+from snowflake.snowpark._internal.analyzer.schema_utils import DescribeCacheInfo
 from snowflake.snowpark._internal.analyzer.select_statement import (
     SelectSQL,
     SelectStatement,
     SelectTableFunction,
 )
-from snowflake.snowpark._internal.analyzer.snowflake_plan import SnowflakePlanBuilder
+from snowflake.snowpark._internal.analyzer.snowflake_plan import (
+    Query,
+    SnowflakePlanBuilder,
+    columns_to_parquet,
+)
 from snowflake.snowpark._internal.analyzer.snowflake_plan_node import (
     Range,
     SnowflakeValues,
@@ -63,14 +96,14 @@ from snowflake.snowpark._internal.packaging_utils import (
     pip_install_packages_to_target_folder,
     zip_directory_contents,
 )
+from snowflake.snowpark._internal.result_cache import ResultCacheInfo
 from snowflake.snowpark._internal.server_connection import ServerConnection
 from snowflake.snowpark._internal.telemetry import set_api_call_source
 from snowflake.snowpark._internal.type_utils import (
     ColumnOrName,
     convert_sp_to_sf_type,
-    infer_schema,
+    infer_schema_from_rows,
     infer_type,
-    merge_type,
 )
 from snowflake.snowpark._internal.udf_utils import generate_call_python_sp_sql
 from snowflake.snowpark._internal.utils import (
@@ -84,6 +117,7 @@ from snowflake.snowpark._internal.utils import (
     escape_quotes,
     experimental,
     experimental_parameter,
+    generate_random_alphanumeric,
     get_connector_version,
     get_os_name,
     get_python_version,
@@ -94,6 +128,7 @@ from snowflake.snowpark._internal.utils import (
     normalize_local_file,
     normalize_remote_file_or_dir,
     parse_positional_args_to_list,
+    parse_table_name,
     quote_name,
     random_name_for_temp_object,
     strip_double_quotes_in_like_statement_in_table_name,
@@ -148,6 +183,7 @@ from snowflake.snowpark.table_function import (
 )
 from snowflake.snowpark.types import (
     ArrayType,
+    DataType,
     DateType,
     DecimalType,
     GeographyType,
@@ -186,6 +222,15 @@ _PYTHON_SNOWPARK_USE_LOGICAL_TYPE_FOR_CREATE_DATAFRAME_STRING = (
     "PYTHON_SNOWPARK_USE_LOGICAL_TYPE_FOR_CREATE_DATAFRAME"
 )
 WRITE_PANDAS_CHUNK_SIZE: int = 100000 if is_in_stored_procedure() else None
+# The approximate in-memory size, in bytes, of the chunks of a pandas DataFrame uploaded by
+# the pipelined write_pandas when no chunk size is given
+WRITE_PANDAS_CHUNK_BYTES = 64 * 1024 * 1024
+# The default number of rows in each file uploaded by Session.write_iter
+WRITE_ITER_BATCH_SIZE = 100000
+# The default maximum number of actions run at the same time by Session.run_concurrently
+_DEFAULT_MAX_CONCURRENT_ACTIONS = 8
+
+_T = TypeVar("_T")
 
 
 def _get_active_session() -> "Session":
@@ -240,6 +285,86 @@ def _remove_session(session: "Session") -> None:
             pass
 
 
+# The data types of the values of local data that are converted to strings before they are
+# sent to Snowflake
+_LOCAL_DATA_STRING_TYPES = (
+    VariantType,
+    ArrayType,
+    MapType,
+    TimeType,
+    DateType,
+    TimestampType,
+    GeographyType,
+    GeometryType,
+    VectorType,
+)
+
+
+def _get_local_value_converter(data_type: DataType) -> Optional[Callable[[Any], Any]]:
+    """Returns the function that converts a non-null value of a column of ``data_type`` in the
+    local data of :meth:`Session.create_dataframe` to the value sent to Snowflake, or None if
+    the values are sent as they are."""
+
+    def raise_cast_error(value: Any) -> NoReturn:
+        raise TypeError(f"Cannot cast {type(value)}({value}) to {str(data_type)}.")
+
+    if isinstance(data_type, TimestampType):
+        return lambda v: str(v) if isinstance(v, datetime.datetime) else v
+    if isinstance(data_type, TimeType):
+        return lambda v: str(v) if isinstance(v, datetime.time) else v
+    if isinstance(data_type, DateType):
+        return lambda v: str(v) if isinstance(v, datetime.date) else v
+    if isinstance(data_type, (_AtomicType, GeographyType, GeometryType)):
+        return None
+    # reuse the encoder instead of creating one for every value in json.dumps
+    encode = PythonObjJSONEncoder().encode
+    if isinstance(data_type, ArrayType):
+        return (
+            lambda v: encode(v)
+            if isinstance(v, (list, tuple, array))
+            else raise_cast_error(v)
+        )
+    if isinstance(data_type, MapType):
+        return lambda v: encode(v) if isinstance(v, dict) else raise_cast_error(v)
+    if isinstance(data_type, (VariantType, VectorType)):
+        return encode
+    return raise_cast_error
+
+
+def _convert_local_row_to_list(
+    row: Union[Iterable[Any], Any], names: List[str]
+) -> List:
+    """Returns the values of a row of the local data of :meth:`Session.create_dataframe` in the
+    order of the quoted column names ``names``."""
+    row_dict = None
+    if row is None:
+        row = [None]
+    elif isinstance(row, (tuple, list)):
+        if not row:
+            row = [None]
+        elif getattr(row, "_fields", None):  # Row or namedtuple
+            row_dict = row.as_dict() if isinstance(row, Row) else row._asdict()
+    elif isinstance(row, dict):
+        row_dict = row.copy()
+    else:
+        row = [row]
+
+    if row_dict:
+        # fill None if the key doesn't exist
+        row_dict = {quote_name(k): v for k, v in row_dict.items()}
+        return [row_dict.get(name) for name in names]
+    else:
+        # check the length of every row, which should be same across data
+        if len(row) != len(names):
+            raise ValueError(
+                f"{len(names)} fields are required by schema "
+                f"but {len(row)} values are provided. This might be because "
+                f"data consists of rows with different lengths, or mixed rows "
+                f"with column names or without column names"
+            )
+        return list(row)
+
+
 class Session:
     """
     Establishes a connection with a Snowflake database and provides methods for creating DataFrames
@@ -439,6 +564,9 @@ class Session:
 """
         self._session_stage = random_name_for_temp_object(TempObjectType.STAGE)
         self._stage_created = False
+        self._auto_clean_up_temp_table_enabled = False
+        self._local_data_upload_threshold: Optional[int] = LOCAL_DATA_UPLOAD_THRESHOLD
+        self._pipelined_write_pandas_enabled = False
 
         if isinstance(conn, MockServerConnection):
             self._udf_registration = MockUDFRegistration(self)
@@ -473,6 +601,8 @@ class Session:
             )
         )
         self._cte_optimization_enabled: bool = False
+        # internal, like the CTE optimization that uses it
+        self._cte_cost_model: CTECostModel = CTECostModel()
         self._use_logical_type_for_create_df: bool = (
             self._conn._get_client_side_session_parameter(
                 _PYTHON_SNOWPARK_USE_LOGICAL_TYPE_FOR_CREATE_DATAFRAME_STRING, True
@@ -516,6 +646,8 @@ class Session:
                 )
             else:
                 _logger.info("Closing session: %s", self._session_id)
+                if not isinstance(self._conn, MockServerConnection):
+                    self._conn.flush_post_actions()
                 self.cancel_all()
         except Exception as ex:
             raise SnowparkClientExceptionMessages.SERVER_FAILED_CLOSE_SESSION(str(ex))
@@ -577,6 +709,139 @@ class Session:
         """
         return self._custom_package_usage_config
 
+    @property
+    def describe_cache_enabled(self) -> bool:
+        """Set to ``True`` to cache the column metadata of the queries described by this session (defaults to ``False``).
+
+        Describing a query is needed to know the schema of a :class:`DataFrame` and costs a round trip to Snowflake.
+        When enabled, the result of describing a query is reused by other DataFrames that have the same schema query,
+        as long as the current database, schema and role are unchanged. The cache is size-bounded and cleared when
+        this session runs a DDL statement, e.g. ``ALTER TABLE`` or ``DROP TABLE``. DDL statements run by other
+        sessions are not tracked, so disable and re-enable the cache after changing a table elsewhere.
+        """
+        return self._conn._describe_cache.enabled
+
+    @property
+    def result_cache_enabled(self) -> bool:
+        """Set to ``True`` to cache the results of the queries run by actions of this session that
+        fetch the whole result, e.g. :meth:`DataFrame.collect` and :meth:`DataFrame.to_pandas`
+        (defaults to ``False``).
+
+        When enabled, the result of running a :class:`DataFrame` is reused by the later actions
+        that run the same queries with the same parameters and return the result in the same
+        format, as long as the current database, schema and role are unchanged. A result is
+        dropped when it's older than :attr:`result_cache_ttl` or when it's the least recently used
+        one and the results exceed :attr:`result_cache_max_size`. It's also dropped when this
+        session writes to a table whose name appears in its queries, e.g. by
+        :meth:`DataFrameWriter.save_as_table`, :meth:`Table.update`, :meth:`Table.delete`,
+        :meth:`Table.merge` or :meth:`DataFrame.copy_into_table`, and all results are dropped when
+        this session runs a statement that may change data but whose target isn't known, e.g.
+        ``ALTER SESSION`` or calling a stored procedure. Writes made by other sessions or through
+        views are not tracked, and queries with non-deterministic functions, e.g.
+        :func:`functions.random`, return the same result while it's cached. The results returned
+        from the cache are listed in :attr:`QueryHistory.cached_queries`.
+        """
+        return self._conn._result_cache.enabled
+
+    @property
+    def result_cache_ttl(self) -> float:
+        """The number of seconds a result is kept in the result cache of this session (defaults
+        to ``300``). See :attr:`result_cache_enabled`."""
+        return self._conn._result_cache.ttl
+
+    @property
+    def result_cache_max_size(self) -> int:
+        """The maximum total size, in bytes, of the results in the result cache of this session
+        (defaults to 256 MB). The size of a result is estimated from its size in memory. See
+        :attr:`result_cache_enabled`."""
+        return self._conn._result_cache.max_size
+
+    @property
+    def result_cache_info(self) -> ResultCacheInfo:
+        """Returns the hits, misses, maximum size, current size and number of results of the
+        result cache of this session. See :attr:`result_cache_enabled`."""
+        return self._conn._result_cache.info()
+
+    @property
+    def pipelined_execution_enabled(self) -> bool:
+        """Set to ``True`` to reduce the number of blocking round trips needed to run a
+        :class:`DataFrame` that is made of multiple queries (defaults to ``False``).
+
+        When enabled, consecutive queries that run before the main query of an action, e.g.
+        creating a temporary file format, are sent to Snowflake as a single multi-statement
+        query, and the temporary objects generated for an action are not dropped right after
+        the action. Instead, they are dropped in batches, asynchronously, and the remaining
+        ones are dropped when this session is closed.
+        """
+        if isinstance(self._conn, MockServerConnection):
+            return False
+        return self._conn._pipelined_execution_enabled
+
+    @property
+    def max_result_fetch_workers(self) -> int:
+        """The maximum number of threads used to download the result of a query of this session
+        (defaults to ``1``).
+
+        When it's greater than ``1``, the result chunks of the queries run by actions that fetch
+        the whole result, e.g. :meth:`DataFrame.collect` and :meth:`DataFrame.to_pandas`, are
+        downloaded and decoded in parallel, and then put together in order. The size of the
+        chunks that are downloaded but not put together yet is bounded, so the extra memory
+        needed is bounded too. It doesn't affect :meth:`DataFrame.to_local_iterator` and
+        :meth:`DataFrame.to_pandas_batches`, which download the result chunks one by one.
+        """
+        if isinstance(self._conn, MockServerConnection):
+            return 1
+        return self._conn._max_result_fetch_workers
+
+    @property
+    def auto_clean_up_temp_table_enabled(self) -> bool:
+        """Set to ``True`` to drop the temporary tables created by :meth:`DataFrame.cache_result`
+        once they are no longer referenced (defaults to ``False``).
+
+        A temporary table is no longer referenced when the :class:`Table` returned by
+        :meth:`DataFrame.cache_result`, its copies and all the DataFrames derived from it have
+        been garbage collected. The unreferenced temporary tables are dropped in batches, in
+        the background or when this session is closed. Don't enable it if you access these
+        temporary tables by their names, e.g. in :meth:`sql`.
+        """
+        return self._auto_clean_up_temp_table_enabled
+
+    @property
+    def pipelined_write_pandas_enabled(self) -> bool:
+        """Set to ``True`` to upload the pandas DataFrames written by :meth:`write_pandas`
+        and :meth:`create_dataframe` with a pipelined writer (defaults to ``False``).
+
+        The writer splits a pandas DataFrame into chunks of about 64 MB in memory, unless
+        ``chunk_size`` is given to :meth:`write_pandas`, and encodes each chunk to Parquet in
+        memory while the previous chunks are uploaded to a stage by ``parallel`` threads.
+        The chunks aren't written to local files, and at most ``parallel + 1`` encoded
+        chunks are kept in memory. Keyword arguments of :meth:`write_pandas` other than
+        ``use_logical_type`` aren't supported by the pipelined writer; when they're given,
+        the DataFrame is written by ``snowflake.connector.pandas_tools.write_pandas``.
+        """
+        if isinstance(self._conn, MockServerConnection):
+            return False
+        return self._pipelined_write_pandas_enabled
+
+    @property
+    def local_data_upload_threshold(self) -> Optional[int]:
+        """The number of values, i.e., the number of rows times the number of columns, from
+        which the local data of :meth:`create_dataframe` is uploaded to a stage as a Parquet
+        file instead of being inserted with bound parameters (defaults to ``100000``). Set it
+        to ``None`` to always insert the data with bound parameters.
+
+        The data is uploaded when the ``DataFrame`` runs, and only if ``pyarrow`` is
+        installed and the values of every column can be converted to Parquet. Otherwise, or
+        if the upload fails, it's inserted with bound parameters.
+        """
+        return self._local_data_upload_threshold
+
+    @property
+    def describe_cache_info(self) -> DescribeCacheInfo:
+        """Returns the hits, misses, maximum size and current size of the describe cache of this session.
+        See :attr:`describe_cache_enabled`."""
+        return self._conn._describe_cache.info()
+
     @sql_simplifier_enabled.setter
     def sql_simplifier_enabled(self, value: bool) -> None:
         self._conn._telemetry_client.send_sql_simplifier_telemetry(
@@ -595,6 +860,76 @@ class Session:
     def custom_package_usage_config(self, config: Dict) -> None:
         self._custom_package_usage_config = {k.lower(): v for k, v in config.items()}
 
+    @describe_cache_enabled.setter
+    def describe_cache_enabled(self, value: bool) -> None:
+        self._conn._describe_cache.clear()
+        self._conn._describe_cache.enabled = value
+
+    @result_cache_enabled.setter
+    def result_cache_enabled(self, value: bool) -> None:
+        self._conn._result_cache.clear()
+        self._conn._result_cache.enabled = value
+
+    @result_cache_ttl.setter
+    def result_cache_ttl(self, value: float) -> None:
+        if value <= 0:
+            raise ValueError(f"result_cache_ttl must be positive, but got {value}")
+        self._conn._result_cache.ttl = value
+
+    @result_cache_max_size.setter
+    def result_cache_max_size(self, value: int) -> None:
+        if value <= 0:
+            raise ValueError(f"result_cache_max_size must be positive, but got {value}")
+        self._conn._result_cache.clear()
+        self._conn._result_cache.max_size = value
+
+    @auto_clean_up_temp_table_enabled.setter
+    def auto_clean_up_temp_table_enabled(self, value: bool) -> None:
+        self._auto_clean_up_temp_table_enabled = value
+
+    @pipelined_write_pandas_enabled.setter
+    def pipelined_write_pandas_enabled(self, value: bool) -> None:
+        self._pipelined_write_pandas_enabled = value
+
+    @local_data_upload_threshold.setter
+    def local_data_upload_threshold(self, value: Optional[int]) -> None:
+        if value is not None and value < 1:
+            raise ValueError(
+                f"local_data_upload_threshold must be a positive integer or None, but got {value}"
+            )
+        self._local_data_upload_threshold = value
+
+    @pipelined_execution_enabled.setter
+    def pipelined_execution_enabled(self, value: bool) -> None:
+        self._conn._pipelined_execution_enabled = value
+        if not value:
+            self._conn.flush_post_actions()
+
+    @max_result_fetch_workers.setter
+    def max_result_fetch_workers(self, value: int) -> None:
+        if value < 1:
+            raise ValueError(
+                f"max_result_fetch_workers must be a positive integer, but got {value}"
+            )
+        self._conn._max_result_fetch_workers = value
+
+    def _clean_up_temp_table_when_unreferenced(self, table: Table) -> None:
+        """Drops the generated temporary table of ``table`` once neither ``table`` nor the
+        DataFrames derived from it are referenced."""
+        # derived DataFrames reference the plan of the table if the SQL simplifier is disabled,
+        # and the selectable it queries from otherwise
+        owners = [table._plan]
+        if table._select_statement:
+            owners.append(table._select_statement.from_)
+        table._auto_clean_up = True
+        self._conn.drop_temp_object_when_unreferenced(
+            Query(
+                drop_table_if_exists_statement(table.table_name),
+                is_ddl_on_temp_object=True,
+            ),
+            owners,
+        )
+
     def cancel_all(self) -> None:
         """
         Cancel all action methods that are running currently.
@@ -604,6 +939,51 @@ class Session:
         self._last_canceled_id = self._last_action_id
         self._conn.run_query(f"select system$cancel_all_queries({self._session_id})")
 
+    def run_concurrently(
+        self,
+        actions: Iterable[Callable[[], _T]],
+        max_workers: Optional[int] = None,
+    ) -> List[_T]:
+        """
+        Runs independent actions, e.g. :meth:`DataFrame.collect` or :meth:`DataFrame.count`
+        of different DataFrames, concurrently in this session and returns their results in
+        the order of ``actions``.
+
+        Each action is run in a thread of a thread pool with its own cursor, and all the
+        cursors share this session, so the actions can use the same temporary objects and
+        session parameters. Actions that need to run in a particular order, e.g. one of them
+        writes to a table that another one reads, must not be run concurrently.
+
+        Example::
+
+            >>> from snowflake.snowpark.functions import col
+            >>> df = session.create_dataframe([[1, 2], [3, 4]], schema=["a", "b"])
+            >>> session.run_concurrently([df.count, df.filter(col("a") > 1).collect])
+            [2, [Row(A=3, B=4)]]
+
+        Args:
+            actions: The callables to run. They take no arguments, so use :func:`functools.partial`
+                or a lambda to pass arguments, e.g. ``lambda: df.collect(statement_params=params)``.
+            max_workers: The maximum number of actions run at the same time. By default,
+                at most 8 actions are run at the same time.
+
+        Returns:
+            A list that contains the result of each action. If an action raises an exception,
+            the exception is raised after all the actions have completed.
+        """
+        actions = list(actions)
+        if isinstance(self._conn, MockServerConnection):
+            return [action() for action in actions]
+
+        def run(action: Callable[[], _T]) -> _T:
+            with self._conn._pooled_cursor():
+                return action()
+
+        max_workers = max_workers or _DEFAULT_MAX_CONCURRENT_ACTIONS
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run, action) for action in actions]
+        return [future.result() for future in futures]
+
     def get_imports(self) -> List[str]:
         """
         Returns a list of imports added for user defined functions (UDFs).
@@ -2194,6 +2574,25 @@ class Session:
                     + (schema + "." if schema else "")
                     + (table_name)
                 )
+            if self.pipelined_write_pandas_enabled and set(kwargs) <= {
+                "use_logical_type"
+            }:
+                success, ci_output = self._write_pandas_pipelined(
+                    df,
+                    table_name,
+                    database=database,
+                    schema=schema,
+                    chunk_size=chunk_size,
+                    compression=compression,
+                    on_error=on_error,
+                    parallel=parallel,
+                    quote_identifiers=quote_identifiers,
+                    auto_create_table=auto_create_table,
+                    overwrite=overwrite,
+                    table_type=table_type,
+                    use_logical_type=kwargs.get("use_logical_type"),
+                )
+                return self._write_pandas_result(success, location, ci_output)
             signature = inspect.signature(write_pandas)
             if not ("use_logical_type" in signature.parameters):
                 # do not pass use_logical_type if write_pandas does not support it
@@ -2223,6 +2622,14 @@ class Session:
                 table_type=table_type,
                 **kwargs,
             )
+            if success and self._conn._result_cache.enabled:
+                # the queries of the connector don't invalidate the cached results of the
+                # table like the queries run by the session
+                self._conn._result_cache.invalidate_table(
+                    quote_name_without_upper_casing(table_name)
+                    if quote_identifiers
+                    else table_name
+                )
         except ProgrammingError as pe:
             if pe.msg.endswith("does not exist"):
                 raise SnowparkClientExceptionMessages.DF_PANDAS_TABLE_DOES_NOT_EXIST_EXCEPTION(
@@ -2231,6 +2638,11 @@ class Session:
             else:
                 raise pe
 
+        return self._write_pandas_result(success, location, ci_output)
+
+    def _write_pandas_result(
+        self, success: bool, location: str, ci_output: List[Any]
+    ) -> Table:
         if success:
             t = self.table(location)
             set_api_call_source(t, "Session.write_pandas")
@@ -2240,6 +2652,384 @@ class Session:
                 str(ci_output)
             )
 
+    def _write_pandas_pipelined(
+        self,
+        df: "pandas.DataFrame",
+        table_name: str,
+        *,
+        database: Optional[str],
+        schema: Optional[str],
+        chunk_size: Optional[int],
+        compression: str,
+        on_error: str,
+        parallel: int,
+        quote_identifiers: bool,
+        auto_create_table: bool,
+        overwrite: bool,
+        table_type: str,
+        use_logical_type: Optional[bool],
+    ) -> Tuple[bool, List[Any]]:
+        """Writes ``df`` like ``snowflake.connector.pandas_tools.write_pandas``, but the
+        Parquet chunks are encoded in memory and uploaded to the session stage while the next
+        chunk is encoded. Returns whether all chunks were loaded and the result of COPY INTO.
+        """
+
+        def build_location(name: str) -> str:
+            return ".".join(
+                quote_name_without_upper_casing(part) if quote_identifiers else part
+                for part in (database, schema, name)
+                if part
+            )
+
+        if not chunk_size:
+            # choose the number of rows from the width of the rows, so wide DataFrames are
+            # split into more chunks
+            sample = df.head(1000)
+            row_size = sample.memory_usage(index=False, deep=True).sum() / max(
+                len(sample), 1
+            )
+            chunk_size = max(1, int(WRITE_PANDAS_CHUNK_BYTES // max(row_size, 1)))
+
+        def iter_chunks() -> Iterator[Tuple[io.BytesIO, str]]:
+            # an empty DataFrame is still uploaded, so its schema can be inferred
+            for i, start in enumerate(range(0, max(len(df), 1), chunk_size)):
+                stream = io.BytesIO()
+                df.iloc[start : start + chunk_size].to_parquet(
+                    stream, compression=compression
+                )
+                stream.seek(0)
+                yield stream, f"file{i}.parquet"
+
+        stage_location = f"{self.get_session_stage()}/{generate_random_alphanumeric()}"
+        self._conn.upload_streams(
+            iter_chunks(), stage_location, parallel=parallel, compress_data=False
+        )
+
+        if quote_identifiers:
+            column_names = [quote_name_without_upper_casing(str(c)) for c in df.columns]
+        else:
+            column_names = [str(c) for c in df.columns]
+        # Parquet is read as a single column $1, so the columns are selected explicitly
+        parquet_columns = [f"$1:{name}" for name in column_names]
+        file_compression = "auto" if compression == "gzip" else compression
+        infer_schema = auto_create_table or overwrite
+        if infer_schema:
+            file_format_name = random_name_for_temp_object(TempObjectType.FILE_FORMAT)
+            self._run_query(
+                create_file_format_statement(
+                    file_format_name,
+                    "PARQUET",
+                    {
+                        "COMPRESSION": file_compression,
+                        "USE_LOGICAL_TYPE": use_logical_type,
+                    },
+                    temp=True,
+                    if_not_exist=True,
+                    use_scoped_temp_objects=self._use_scoped_temp_objects,
+                    is_generated=True,
+                ),
+                is_ddl_on_temp_object=True,
+            )
+            try:
+                # the columns can be returned in any order
+                column_types = {
+                    row[0]: row[1]
+                    for row in self._run_query(
+                        infer_schema_statement(f"{stage_location}/", file_format_name)
+                    )
+                }
+            finally:
+                self._run_query(
+                    drop_file_format_if_exists_statement(file_format_name),
+                    is_ddl_on_temp_object=True,
+                )
+            column_types = [column_types[str(c)] for c in df.columns]
+            parquet_columns = [
+                f"{column}::{column_type}"
+                for column, column_type in zip(parquet_columns, column_types)
+            ]
+
+        location = build_location(table_name)
+        # when the table is overwritten, the data is loaded into a new table, which then
+        # replaces the table
+        target_location = (
+            build_location(random_name_for_temp_object(TempObjectType.TABLE))
+            if overwrite and auto_create_table
+            else location
+        )
+        if auto_create_table or overwrite:
+            self._run_query(
+                f"CREATE {table_type.upper()} TABLE IF NOT EXISTS {target_location} "
+                f"({', '.join(f'{c} {t}' for c, t in zip(column_names, column_types))})"
+            )
+        try:
+            if overwrite and not auto_create_table:
+                self._run_query(f"TRUNCATE TABLE {target_location}")
+            file_format_options = (
+                f"TYPE=PARQUET COMPRESSION={file_compression}"
+                + (" BINARY_AS_TEXT=FALSE" if infer_schema else "")
+                + (
+                    f" USE_LOGICAL_TYPE={str(use_logical_type).upper()}"
+                    if use_logical_type is not None
+                    else ""
+                )
+            )
+            copy_results = self._run_query(
+                f"COPY INTO {target_location} ({','.join(column_names)}) "
+                f"FROM (SELECT {','.join(parquet_columns)} FROM '{stage_location}/') "
+                f"FILE_FORMAT=({file_format_options}) "
+                f"PURGE=TRUE ON_ERROR={convert_value_to_sql_option(on_error)}"
+            )
+            if overwrite and auto_create_table:
+                self._run_query(drop_table_if_exists_statement(location))
+                self._run_query(f"ALTER TABLE {target_location} RENAME TO {location}")
+        except ProgrammingError:
+            if target_location != location:
+                self._run_query(drop_table_if_exists_statement(target_location))
+            raise
+        return all(row[1] == "LOADED" for row in copy_results), copy_results
+
+    def write_iter(
+        self,
+        data: Iterable[Union[Iterable[Any], Any, "pandas.DataFrame"]],
+        table_name: Union[str, Iterable[str]],
+        schema: StructType,
+        *,
+        mode: Literal["append", "overwrite"] = "append",
+        table_type: Literal["", "temp", "temporary", "transient"] = "",
+        batch_size: int = WRITE_ITER_BATCH_SIZE,
+        parallel: int = 4,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        statement_params: Optional[Dict[str, str]] = None,
+    ) -> Table:
+        """Writes the rows produced by an iterable, for example a generator, to a table in
+        Snowflake and returns a :class:`Table` object referring to the table.
+
+        ``data`` is consumed in batches of ``batch_size`` rows, which are encoded as Parquet
+        files and uploaded to the session stage while the next batch is read, and all files
+        are loaded into the table with a single ``COPY INTO`` statement once ``data`` is
+        exhausted. ``data`` isn't read further while ``parallel`` files are waiting or being
+        uploaded, so only a few batches are kept in memory however many rows it produces.
+
+        Args:
+            data: The rows to write. Every element of ``data`` is either a row, which can be
+                a :class:`list`, :class:`tuple`, :class:`dict`, :class:`Row` or a single value
+                like in :meth:`create_dataframe`, or a pandas DataFrame whose columns
+                are matched with the fields of ``schema`` by position.
+            table_name: A string or list of strings representing the table name.
+            schema: A :class:`~snowflake.snowpark.types.StructType` containing names and
+                data types of the columns of the table.
+            mode: ``"append"`` to create the table if it doesn't exist and append the rows
+                to it, or ``"overwrite"`` to replace the table. When the table is
+                overwritten, the rows are loaded into a new table first, which then
+                replaces the table, so the table is kept if writing the rows fails.
+                The table is dropped before the new table is renamed to its name, so
+                it doesn't exist for a moment and its privileges aren't kept.
+            table_type: The table type of the table if it is created. The supported values
+                are: ``temp``, ``temporary`` and ``transient``. An empty string means the
+                table is permanent.
+            batch_size: The number of rows in each uploaded file. Every pandas DataFrame in
+                ``data`` is uploaded in files of its own.
+            parallel: The number of threads that upload the files.
+            progress_callback: A function that is called with the total number of uploaded
+                rows every time a file is uploaded.
+            statement_params: Dictionary of statement level parameters to be set while
+                executing this action.
+
+        Example::
+
+            >>> from snowflake.snowpark.types import IntegerType, StringType, StructField
+            >>> schema = StructType([StructField("a", IntegerType()), StructField("b", StringType())])
+            >>> rows = ([i, str(i)] for i in range(3))
+            >>> t = session.write_iter(rows, "my_table", schema, mode="overwrite", table_type="temp")
+            >>> t.sort("a").collect()
+            [Row(A=0, B='0'), Row(A=1, B='1'), Row(A=2, B='2')]
+        """
+        if isinstance(self._conn, MockServerConnection):
+            self._conn.log_not_supported_error(
+                external_feature_name="Session.write_iter",
+                raise_error=NotImplementedError,
+            )
+        if mode not in ("append", "overwrite"):
+            raise ValueError(
+                f"Unsupported mode {mode!r}. Expected modes: 'append', 'overwrite'"
+            )
+        if table_type and table_type.lower() not in SUPPORTED_TABLE_TYPES:
+            raise ValueError(
+                f"Unsupported table type. Expected table types: {SUPPORTED_TABLE_TYPES}"
+            )
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
+        full_table_name = (
+            table_name if isinstance(table_name, str) else ".".join(table_name)
+        )
+        validate_object_name(full_table_name)
+        if len(schema.fields) == 0:
+            raise ValueError("The provided schema cannot be empty")
+
+        quoted_names = [quote_name(field.name) for field in schema.fields]
+        # the values are converted like the local data of create_dataframe
+        attrs = [
+            Attribute(
+                quoted_name,
+                StringType()
+                if isinstance(field.datatype, _LOCAL_DATA_STRING_TYPES)
+                else field.datatype,
+                field.nullable,
+            )
+            for field, quoted_name in zip(schema.fields, quoted_names)
+        ]
+        converters = [
+            _get_local_value_converter(field.datatype) for field in schema.fields
+        ]
+
+        def iter_batches() -> Iterator[List[List[Any]]]:
+            batch = []
+            for item in data:
+                if installed_pandas and isinstance(item, pandas.DataFrame):
+                    if len(item.columns) != len(quoted_names):
+                        raise ValueError(
+                            f"{len(quoted_names)} fields are required by schema "
+                            f"but the pandas DataFrame has {len(item.columns)} columns"
+                        )
+                    if batch:
+                        yield batch
+                        batch = []
+                    for start in range(0, len(item), batch_size):
+                        chunk = item.iloc[start : start + batch_size].astype(object)
+                        yield chunk.where(chunk.notna(), None).values.tolist()
+                else:
+                    batch.append(_convert_local_row_to_list(item, quoted_names))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+            if batch:
+                yield batch
+
+        num_rows = []
+
+        def iter_files() -> Iterator[Tuple[io.BytesIO, str]]:
+            for i, rows in enumerate(iter_batches()):
+                columns = [
+                    column
+                    if converter is None
+                    else [
+                        None if value is None else converter(value) for value in column
+                    ]
+                    for column, converter in zip(zip(*rows), converters)
+                ]
+                num_rows.append(len(rows))
+                yield io.BytesIO(columns_to_parquet(columns, attrs)), f"data{i}.parquet"
+
+        uploaded_rows = 0
+
+        def on_uploaded(index: int) -> None:
+            nonlocal uploaded_rows
+            uploaded_rows += num_rows[index]
+            progress_callback(uploaded_rows)
+
+        # when the table is overwritten, the rows are loaded into a new table, which then
+        # replaces the table
+        target_table_name = (
+            ".".join(
+                parse_table_name(full_table_name)[:-1]
+                + [random_name_for_temp_object(TempObjectType.TABLE)]
+            )
+            if mode == "overwrite"
+            else full_table_name
+        )
+        table_dropped = False
+        stage_location = f"{self.get_session_stage()}/{generate_random_alphanumeric()}"
+        try:
+            num_files = self._conn.upload_streams(
+                iter_files(),
+                stage_location,
+                parallel=parallel,
+                compress_data=False,
+                statement_params=statement_params,
+                on_uploaded=on_uploaded if progress_callback else None,
+            )
+            self._run_query(
+                create_table_statement(
+                    target_table_name,
+                    analyzer_utils.attribute_to_schema_string(schema._to_attributes()),
+                    error=False,
+                    table_type=table_type,
+                    use_scoped_temp_objects=self._use_scoped_temp_objects,
+                ),
+                statement_params=statement_params,
+            )
+            if num_files:
+                # Parquet is read as a single column $1, so the columns are converted
+                # back to the data types of the schema explicitly
+                transformations = []
+                for field, quoted_name in zip(schema.fields, quoted_names):
+                    value = f"$1:{quoted_name}"
+                    if isinstance(field.datatype, VariantType):
+                        transformations.append(f"TO_VARIANT(PARSE_JSON({value}))")
+                    elif isinstance(field.datatype, ArrayType):
+                        transformations.append(f"TO_ARRAY(PARSE_JSON({value}))")
+                    elif isinstance(field.datatype, MapType):
+                        transformations.append(f"TO_OBJECT(PARSE_JSON({value}))")
+                    elif isinstance(field.datatype, VectorType):
+                        transformations.append(
+                            f"PARSE_JSON({value})::{convert_sp_to_sf_type(field.datatype)}"
+                        )
+                    elif isinstance(field.datatype, GeographyType):
+                        transformations.append(f"TO_GEOGRAPHY({value}::STRING)")
+                    elif isinstance(field.datatype, GeometryType):
+                        transformations.append(f"TO_GEOMETRY({value}::STRING)")
+                    else:
+                        transformations.append(
+                            f"{value}::{convert_sp_to_sf_type(field.datatype)}"
+                        )
+                self._run_query(
+                    copy_into_table(
+                        target_table_name,
+                        f"'{stage_location}/'",
+                        "PARQUET",
+                        {"BINARY_AS_TEXT": False},
+                        {"PURGE": True},
+                        None,
+                        column_names=quoted_names,
+                        transformations=transformations,
+                    ),
+                    statement_params=statement_params,
+                )
+            if target_table_name != full_table_name:
+                self._run_query(
+                    drop_table_if_exists_statement(full_table_name),
+                    statement_params=statement_params,
+                )
+                table_dropped = True
+                self._run_query(
+                    f"ALTER TABLE {target_table_name} RENAME TO {full_table_name}",
+                    statement_params=statement_params,
+                )
+        except BaseException:
+            # the files are only purged by a successful COPY INTO, and the new table
+            # holds the only copy of the rows once the table is dropped
+            cleanup_queries = [f"REMOVE {stage_location}/"]
+            if target_table_name != full_table_name and not table_dropped:
+                cleanup_queries.append(
+                    drop_table_if_exists_statement(target_table_name)
+                )
+            for query in cleanup_queries:
+                try:
+                    self._run_query(
+                        query,
+                        log_on_exception=False,
+                        statement_params=statement_params,
+                    )
+                except Exception as ex:
+                    # raise the error of writing the rows instead
+                    _logger.debug("Failed to clean up after write_iter: %s", ex)
+            raise
+
+        t = self.table(table_name)
+        set_api_call_source(t, "Session.write_iter")
+        return t
+
     def create_dataframe(
         self,
         data: Union[List, Tuple, "pandas.DataFrame"],
@@ -2372,120 +3162,41 @@ class Session:
                 raise ValueError("Cannot infer schema from empty data")
             if isinstance(schema, Iterable):
                 names = list(schema)
-            new_schema = reduce(
-                merge_type,
-                (infer_schema(row, names) for row in data),
-            )
+            new_schema = infer_schema_from_rows(data, names)
         if len(new_schema.fields) == 0:
             raise ValueError(
                 "The provided schema or inferred schema cannot be None or empty"
             )
 
-        def convert_row_to_list(
-            row: Union[Iterable[Any], Any], names: List[str]
-        ) -> List:
-            row_dict = None
-            if row is None:
-                row = [None]
-            elif isinstance(row, (tuple, list)):
-                if not row:
-                    row = [None]
-                elif getattr(row, "_fields", None):  # Row or namedtuple
-                    row_dict = row.as_dict() if isinstance(row, Row) else row._asdict()
-            elif isinstance(row, dict):
-                row_dict = row.copy()
-            else:
-                row = [row]
-
-            if row_dict:
-                # fill None if the key doesn't exist
-                row_dict = {quote_name(k): v for k, v in row_dict.items()}
-                return [row_dict.get(name) for name in names]
-            else:
-                # check the length of every row, which should be same across data
-                if len(row) != len(names):
-                    raise ValueError(
-                        f"{len(names)} fields are required by schema "
-                        f"but {len(row)} values are provided. This might be because "
-                        f"data consists of rows with different lengths, or mixed rows "
-                        f"with column names or without column names"
-                    )
-                return list(row)
-
         # always overwrite the column names if they are provided via schema
         if not names:
             names = [f.name for f in new_schema.fields]
         quoted_names = [quote_name(name) for name in names]
-        rows = [convert_row_to_list(row, quoted_names) for row in data]
+        rows = [_convert_local_row_to_list(row, quoted_names) for row in data]
 
         # get attributes and data types
         attrs, data_types = [], []
         for field, quoted_name in zip(new_schema.fields, quoted_names):
             sf_type = (
                 StringType()
-                if isinstance(
-                    field.datatype,
-                    (
-                        VariantType,
-                        ArrayType,
-                        MapType,
-                        TimeType,
-                        DateType,
-                        TimestampType,
-                        GeographyType,
-                        GeometryType,
-                        VectorType,
-                    ),
-                )
+                if isinstance(field.datatype, _LOCAL_DATA_STRING_TYPES)
                 else field.datatype
             )
             attrs.append(Attribute(quoted_name, sf_type, field.nullable))
             data_types.append(field.datatype)
 
-        # convert all variant/time/geospatial/array/map data to string
-        converted = []
-        for row in rows:
-            converted_row = []
-            for value, data_type in zip(row, data_types):
-                if value is None:
-                    converted_row.append(None)
-                elif isinstance(value, decimal.Decimal) and isinstance(
-                    data_type, DecimalType
-                ):
-                    converted_row.append(value)
-                elif isinstance(value, datetime.datetime) and isinstance(
-                    data_type, TimestampType
-                ):
-                    converted_row.append(str(value))
-                elif isinstance(value, datetime.time) and isinstance(
-                    data_type, TimeType
-                ):
-                    converted_row.append(str(value))
-                elif isinstance(value, datetime.date) and isinstance(
-                    data_type, DateType
-                ):
-                    converted_row.append(str(value))
-                elif isinstance(data_type, _AtomicType):  # consider inheritance
-                    converted_row.append(value)
-                elif isinstance(value, (list, tuple, array)) and isinstance(
-                    data_type, ArrayType
-                ):
-                    converted_row.append(json.dumps(value, cls=PythonObjJSONEncoder))
-                elif isinstance(value, dict) and isinstance(data_type, MapType):
-                    converted_row.append(json.dumps(value, cls=PythonObjJSONEncoder))
-                elif isinstance(data_type, VariantType):
-                    converted_row.append(json.dumps(value, cls=PythonObjJSONEncoder))
-                elif isinstance(data_type, GeographyType):
-                    converted_row.append(value)
-                elif isinstance(data_type, GeometryType):
-                    converted_row.append(value)
-                elif isinstance(data_type, VectorType):
-                    converted_row.append(json.dumps(value, cls=PythonObjJSONEncoder))
-                else:
-                    raise TypeError(
-                        f"Cannot cast {type(value)}({value}) to {str(data_type)}."
-                    )
-            converted.append(Row(*converted_row))
+        # convert all variant/time/geospatial/array/map data to string, one column at a
+        # time with a converter chosen by the data type of the column
+        columns = [
+            column
+            if converter is None
+            else [None if value is None else converter(value) for value in column]
+            for column, converter in zip(
+                zip(*rows),
+                [_get_local_value_converter(data_type) for data_type in data_types],
+            )
+        ]
+        converted = [Row(*values) for values in zip(*columns)]
 
         # construct a project statement to convert string value back to variant
         project_columns = []
@@ -276,6 +276,7 @@ class Table(DataFrame):
         )
         self.is_cached: bool = self.is_cached  #: Whether the table is cached.
         self.table_name: str = table_name  #: The table name
+        self._auto_clean_up: bool = False
 
         if self._session.sql_simplifier_enabled:
             self._select_statement = session._analyzer.create_select_statement(
@@ -290,7 +291,11 @@ class Table(DataFrame):
         set_api_call_source(self, "Table.__init__")
 
     def __copy__(self) -> "Table":
-        return Table(self.table_name, self._session)
+        table = Table(self.table_name, self._session)
+        if self._auto_clean_up:
+            # the temp table of a cached result is kept as long as any copy is referenced
+            self._session._clean_up_temp_table_when_unreferenced(table)
+        return table
 
     def __enter__(self):
         return self
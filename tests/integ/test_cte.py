@@ -90,18 +90,18 @@ def test_unary(session, action):
 
 
 @pytest.mark.parametrize(
-    "action",
+    "action, only_table_scan_duplicated",
     [
-        lambda x, y: x.union_all(y),
-        lambda x, y: x.select("a").union(y.select("a")),
-        lambda x, y: x.except_(y),
-        lambda x, y: x.select("a").intersect(y.select("a")),
-        lambda x, y: x.join(y.select("a", "b"), rsuffix="_y"),
-        lambda x, y: x.select("a").join(y, how="outer", rsuffix="_y"),
-        lambda x, y: x.join(y.select("a"), how="left", rsuffix="_y"),
+        (lambda x, y: x.union_all(y), False),
+        (lambda x, y: x.select("a").union(y.select("a")), False),
+        (lambda x, y: x.except_(y), False),
+        (lambda x, y: x.select("a").intersect(y.select("a")), False),
+        (lambda x, y: x.join(y.select("a", "b"), rsuffix="_y"), True),
+        (lambda x, y: x.select("a").join(y, how="outer", rsuffix="_y"), True),
+        (lambda x, y: x.join(y.select("a"), how="left", rsuffix="_y"), True),
     ],
 )
-def test_binary(session, action):
+def test_binary(session, action, only_table_scan_duplicated):
     df = session.create_dataframe([[1, 2], [3, 4]], schema=["a", "b"])
     check_result(session, action(df, df), expect_cte_optimized=True)
 
@@ -115,7 +115,16 @@ def test_binary(session, action):
         df2 = session.create_dataframe([[1, 2], [3, 4]], schema=["a", "b"])
     finally:
         analyzer.ARRAY_BIND_THRESHOLD = original_threshold
-    check_result(session, action(df2, df2), expect_cte_optimized=True)
+    # the data of df2 is read from a temporary table. After the sql simplifier flattens the
+    # projections of joins, the scan of that table is the only duplicate subtree, and it is
+    # inlined instead of converted to a CTE
+    check_result(
+        session,
+        action(df2, df2),
+        expect_cte_optimized=not (
+            session.sql_simplifier_enabled and only_table_scan_duplicated
+        ),
+    )
 
 
 @pytest.mark.parametrize(
@@ -433,3 +442,14 @@ def test_window_function(session):
     df_result = df.union_all(df).select("*")
     check_result(session, df_result, expect_cte_optimized=True)
     assert count_number_of_ctes(df_result.queries["queries"][-1]) == 1
+
+
+def test_table_scan_not_converted_to_cte(session):
+    temp_table_name = random_name_for_temp_object(TempObjectType.TABLE)
+    session.create_dataframe([[1, 2], [3, 4]], schema=["a", "b"]).write.save_as_table(
+        temp_table_name, table_type="temp"
+    )
+    df = session.table(temp_table_name)
+    df_result = df.union_all(df)
+    check_result(session, df_result, expect_cte_optimized=False)
+    assert "Repeated Subqueries Not Converted to CTEs" in df_result._explain_string()
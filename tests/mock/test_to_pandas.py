@@ -164,3 +164,15 @@ def test_df_to_pandas_df():
         }
     )
     assert_frame_equal(df.to_pandas(), pandas_df)
+
+
+@pytest.mark.localtest
+def test_df_to_arrow():
+    pa = pytest.importorskip("pyarrow")
+    df = session.create_dataframe([[1, "a"], [2, "b"]], schema=["a", "b"])
+    table = df.to_arrow()
+    assert isinstance(table, pa.Table)
+    assert table.to_pydict() == {"A": [1, 2], "B": ["a", "b"]}
+    batches = list(df.to_arrow_batches())
+    assert len(batches) == 1
+    assert batches[0].equals(table)
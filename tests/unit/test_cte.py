@@ -6,7 +6,18 @@ from unittest import mock
 
 import pytest
 
-from snowflake.snowpark._internal.analyzer.cte_utils import find_duplicate_subtrees
+from snowflake.snowpark._internal.analyzer.cte_utils import (
+    CTECostModel,
+    choose_duplicate_subtrees_for_cte,
+    create_cte_query,
+    encode_id,
+    find_duplicate_subtrees,
+    is_table_scan,
+)
+from snowflake.snowpark._internal.analyzer.select_statement import (
+    SelectableEntity,
+    SelectStatement,
+)
 from snowflake.snowpark._internal.analyzer.snowflake_plan import SnowflakePlan
 
 
@@ -47,3 +58,104 @@ def test_find_duplicate_subtrees(test_case):
     plan, expected_duplicate_subtree_ids = test_case
     duplicate_subtrees = find_duplicate_subtrees(plan)
     assert {node._id for node in duplicate_subtrees} == expected_duplicate_subtree_ids
+
+
+def test_find_duplicate_subtrees_deep_plan():
+    nodes = [mock.Mock() for _ in range(2000)]
+    for i, node in enumerate(nodes):
+        node._id = i
+        node.children_plan_nodes = nodes[i + 1 : i + 2] * (2 if i % 1000 == 0 else 1)
+    duplicate_subtrees = find_duplicate_subtrees(nodes[0])
+    assert {node._id for node in duplicate_subtrees} == {1}
+
+
+def test_create_cte_query():
+    nodes = [mock.create_autospec(SnowflakePlan) for _ in range(4)]
+    for i, node in enumerate(nodes):
+        node._id = f"id{i}"
+        node.queries = [mock.Mock(sql=f"select * from t{i}")]
+    nodes[0].children_plan_nodes = [nodes[1], nodes[2]]
+    nodes[0].placeholder_query = "select * from (id1) join (id2)"
+    nodes[1].children_plan_nodes = [nodes[3], nodes[3]]
+    nodes[1].placeholder_query = "(id3) union all (id3)"
+    nodes[2].children_plan_nodes = [nodes[3]]
+    nodes[2].placeholder_query = "select a from (id3)"
+    nodes[3].children_plan_nodes = []
+    nodes[3].placeholder_query = None
+
+    with mock.patch(
+        "snowflake.snowpark._internal.analyzer.cte_utils.random_name_for_temp_object",
+        return_value="CTE",
+    ):
+        query = create_cte_query(nodes[0], find_duplicate_subtrees(nodes[0]))
+    assert query == (
+        "WITH CTE AS (select * from t3) select * from "
+        "(( SELECT  *  FROM (CTE)) union all ( SELECT  *  FROM (CTE))) join "
+        "(select a from ( SELECT  *  FROM (CTE)))"
+    )
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (" SELECT  *  FROM (db.sch.t)", True),
+        (" SELECT  *  FROM db.sch.t", True),
+        ('select * from "my_table"', True),
+        (' SELECT "A" FROM (db.sch.t)', False),
+        (" SELECT  *  FROM (db.sch.t) WHERE (a = 1)", False),
+        (" SELECT  *  FROM ( SELECT  *  FROM (db.sch.t))", False),
+    ],
+)
+def test_is_table_scan(query, expected):
+    assert is_table_scan(query) == expected
+
+
+def test_choose_duplicate_subtrees_for_cte():
+    nodes = [mock.create_autospec(SnowflakePlan) for _ in range(4)]
+    for i, node in enumerate(nodes):
+        node._id = i
+    nodes[0].children_plan_nodes = [nodes[1], nodes[1], nodes[2], nodes[3]]
+    nodes[1].children_plan_nodes = []
+    nodes[1].queries = [mock.Mock(sql=" SELECT  *  FROM (t1)")]
+    nodes[2].children_plan_nodes = [nodes[3]]
+    nodes[2].queries = [mock.Mock(sql=" SELECT  *  FROM (t2) WHERE (a = 1)")]
+    nodes[3].children_plan_nodes = []
+    nodes[3].queries = [mock.Mock(sql=" SELECT  *  FROM (t3) WHERE (a = 1)")]
+
+    cte_plan_set, inlined_plan_set = choose_duplicate_subtrees_for_cte(
+        nodes[0], CTECostModel()
+    )
+    assert {node._id for node in cte_plan_set} == {3}
+    assert {node._id for node in inlined_plan_set} == {1}
+
+    class ConvertFrequentlyReferenced(CTECostModel):
+        def should_convert_to_cte(self, query: str, reference_count: int) -> bool:
+            return reference_count > 2
+
+    cte_plan_set, inlined_plan_set = choose_duplicate_subtrees_for_cte(
+        nodes[0], ConvertFrequentlyReferenced()
+    )
+    assert cte_plan_set == set()
+    assert {node._id for node in inlined_plan_set} == {1, 3}
+
+
+def test_selectable_id_from_placeholder_query():
+    analyzer = mock.Mock()
+    analyzer.session._cte_optimization_enabled = True
+    table = SelectableEntity("db.sch.t", analyzer=analyzer)
+    statement = SelectStatement(from_=table, limit_=10, offset=0, analyzer=analyzer)
+    assert statement.placeholder_query == f" SELECT  *  FROM ({table._id}) LIMIT 10"
+    assert statement._id == encode_id(statement.placeholder_query, None)
+    # the id is cached with the sql query of the statement
+    with mock.patch(
+        "snowflake.snowpark._internal.analyzer.select_statement.encode_id"
+    ) as mock_encode_id:
+        assert statement._id == encode_id(statement.placeholder_query, None)
+        mock_encode_id.assert_not_called()
+
+    # a statement without any clause shares the id with the one it selects from
+    assert SelectStatement(from_=statement, analyzer=analyzer)._id == statement._id
+
+    analyzer.session._cte_optimization_enabled = False
+    statement = SelectStatement(from_=table, limit_=10, offset=0, analyzer=analyzer)
+    assert statement._id == encode_id(statement.sql_query, None)
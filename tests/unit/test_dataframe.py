@@ -18,10 +18,21 @@ from snowflake.snowpark._internal.analyzer.analyzer import Analyzer
 from snowflake.snowpark._internal.analyzer.expression import Attribute
 from snowflake.snowpark._internal.analyzer.snowflake_plan import SnowflakePlanBuilder
 from snowflake.snowpark._internal.server_connection import ServerConnection
+from snowflake.snowpark._internal.utils import persisted_cache_table_name_prefix
 from snowflake.snowpark.dataframe import _get_unaliased
 from snowflake.snowpark.exceptions import SnowparkCreateDynamicTableException
+from snowflake.snowpark.functions import col, sqrt, upper
 from snowflake.snowpark.session import Session
-from snowflake.snowpark.types import IntegerType, StringType
+from snowflake.snowpark.types import (
+    BooleanType,
+    DecimalType,
+    DoubleType,
+    IntegerType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+)
 
 
 def test_get_unaliased():
@@ -303,6 +314,43 @@ def test_dataFrame_printSchema(capfd):
     )
 
 
+def test_select_statement_schema_derived_locally():
+    mock_connection = mock.create_autospec(ServerConnection)
+    mock_connection._conn = mock.MagicMock()
+    session = snowflake.snowpark.session.Session(mock_connection)
+    mock_connection.get_result_attributes.return_value = [
+        Attribute('"A"', LongType(), False),
+        Attribute('"B"', DoubleType()),
+        Attribute('"C"', StringType(16777216)),
+    ]
+    df = (
+        session.table("t")
+        .with_column("d", col("a") + 1)
+        .filter(col("b") > 0)
+        .with_column("e", sqrt(col("a")).cast(DecimalType(10, 2)))
+        .select("a", "c", "d", "e", (col("a") == col("d")).alias("f"))
+    )
+    assert df.schema == StructType(
+        [
+            StructField("A", LongType(), nullable=False),
+            StructField("C", StringType(), nullable=True),
+            StructField("D", LongType(), nullable=False),
+            StructField("E", DecimalType(10, 2), nullable=False),
+            StructField("F", BooleanType(), nullable=False),
+        ]
+    )
+    # only the table is described
+    mock_connection.get_result_attributes.assert_called_once()
+
+    # expressions whose type isn't derived locally fall back to describing the query
+    mock_connection.get_result_attributes.return_value = [
+        Attribute('"G"', StringType(16777216))
+    ]
+    df = df.select(upper(col("c")).alias("g"))
+    assert df.schema == StructType([StructField("G", StringType())])
+    assert mock_connection.get_result_attributes.call_count == 2
+
+
 def test_session():
     fake_session = mock.create_autospec(Session, _session_id=123456)
     fake_session._analyzer = mock.Mock()
@@ -310,3 +358,183 @@ def test_session():
 
     assert df.session == fake_session
     assert df.session._session_id == fake_session._session_id
+
+
+def test_resolve_dataframe_lineage_once():
+    fake_session = mock.create_autospec(snowflake.snowpark.session.Session)
+    fake_session.sql_simplifier_enabled = False
+    fake_session._cte_optimization_enabled = False
+    fake_session._conn = mock.create_autospec(ServerConnection)
+    fake_session._plan_builder = SnowflakePlanBuilder(fake_session)
+    fake_session._analyzer = Analyzer(fake_session)
+    plan = fake_session._plan_builder.query("select 1 as a", None)
+    df = DataFrame(fake_session, plan)
+    assert df._plan is plan
+
+    analyzer = fake_session._analyzer
+    with mock.patch.object(
+        analyzer, "do_resolve", wraps=analyzer.do_resolve
+    ) as mock_do_resolve:
+        for i in range(3):
+            df = df.filter(col("a") > i)
+        unioned = df.union_all(df.filter(col("a") > 5))
+    # only the new plan of each DataFrame is resolved, not the plans it is built on
+    assert mock_do_resolve.call_count == 5
+    assert unioned.queries["queries"][-1].count("select 1 as a") == 2
+
+
+@pytest.mark.parametrize("cached_before", [False, True])
+def test_cache_result_persist(cached_before):
+    mock_connection = mock.create_autospec(ServerConnection)
+    mock_connection._conn = mock.MagicMock()
+    mock_connection.get_result_attributes.return_value = [
+        Attribute('"A"', LongType(), False)
+    ]
+    mock_connection._telemetry_client = mock.MagicMock()
+    session = snowflake.snowpark.session.Session(mock_connection)
+    df = session.table("t")
+    explain = '{"Operations": [[{"operation": "Result"}, {"operation": "TableScan", "objects": ["DB.SCH.T"]}]]}'
+    name_prefix = persisted_cache_table_name_prefix(
+        [(df._plan.queries[0].sql, df._plan.queries[0].params)], "ROLE"
+    )
+    existing_tables = [f"{name_prefix}OLD"]
+
+    def run_query(query, **kwargs):
+        if query.startswith("explain"):
+            return {"data": [(explain,)]}
+        if query.startswith("select system$last_change_commit_time('DB.SCH.T')"):
+            return {"data": [("123",)]}
+        if query.startswith("show tables like"):
+            return {"data": [(None, name) for name in existing_tables]}
+        return {"data": []}
+
+    mock_connection.run_query.side_effect = run_query
+    with mock.patch.object(
+        session, "get_current_role", return_value="ROLE"
+    ), mock.patch.object(
+        session, "get_current_database", return_value="DB"
+    ), mock.patch.object(
+        session, "get_current_schema", return_value="SCH"
+    ), mock.patch(
+        "snowflake.snowpark.dataframe_writer.DataFrameWriter.save_as_table"
+    ) as mock_save_as_table:
+        table_name = df.cache_result(persist=True).table_name
+        assert table_name.startswith(f"DB.SCH.{name_prefix}")
+        if cached_before:
+            existing_tables.append(table_name.split(".")[-1])
+            mock_save_as_table.reset_mock()
+            mock_connection.run_query.reset_mock()
+            # the same result is reused and nothing is dropped
+            assert df.cache_result(persist=True).table_name == table_name
+            mock_save_as_table.assert_not_called()
+            assert not any(
+                c.args[0].startswith("drop")
+                for c in mock_connection.run_query.call_args_list
+            )
+        else:
+            mock_save_as_table.assert_called_once_with(
+                table_name,
+                mode="ignore",
+                table_type="transient",
+                statement_params=mock.ANY,
+            )
+            # the result cached for an older version of the table may still be read by
+            # other sessions, so it isn't dropped
+            assert not any(
+                c.args[0].startswith("drop")
+                for c in mock_connection.run_query.call_args_list
+            )
+            mock_connection.execute.assert_not_called()
+
+        # a query that reads files is cached in a temp table
+        explain = '{"Operations": [[{"operation": "ExternalScan"}]]}'
+        assert "SNOWPARK_TEMP_TABLE_" in df.cache_result(persist=True).table_name
+        mock_connection.execute.assert_called_once()
+
+
+def test_persisted_cache_table_name_prefix():
+    mock_connection = mock.create_autospec(ServerConnection)
+    mock_connection._conn = mock.MagicMock()
+    mock_connection._telemetry_client = mock.MagicMock()
+    session = snowflake.snowpark.session.Session(mock_connection)
+
+    def build_join():
+        mock_connection.get_result_attributes.side_effect = [
+            [Attribute('"A"', LongType(), False), Attribute('"B"', LongType(), False)],
+            [Attribute('"A"', LongType(), False), Attribute('"C"', LongType(), False)],
+        ] + [
+            [
+                Attribute('"A"', LongType(), False),
+                Attribute('"B"', LongType(), False),
+                Attribute('"C"', LongType(), False),
+            ]
+        ] * 10
+        df1, df2 = session.table("t1"), session.table("t2")
+        return df1.join(df2, df1.a == df2.a).select(df1.a, "b", "c")
+
+    queries = [
+        [(q.sql, q.params) for q in build_join()._plan.queries] for _ in range(2)
+    ]
+    # the columns of both sides are aliased with randomly generated prefixes
+    assert queries[0] != queries[1]
+    assert persisted_cache_table_name_prefix(
+        queries[0], "ROLE"
+    ) == persisted_cache_table_name_prefix(queries[1], "ROLE")
+    assert persisted_cache_table_name_prefix(
+        [('select "l_ab12_A", "l_ab12_B" from t', [])], "ROLE"
+    ) != persisted_cache_table_name_prefix(
+        [('select "l_ab12_A", "l_cd34_B" from t', [])], "ROLE"
+    )
+    # the queries of other sessions can't use the temporary objects of this session
+    assert (
+        persisted_cache_table_name_prefix(
+            [("select * from SNOWPARK_TEMP_TABLE_0123456789", [])], "ROLE"
+        )
+        is None
+    )
+
+
+def test_column_states_copy_on_write():
+    mock_connection = mock.create_autospec(ServerConnection)
+    mock_connection._conn = mock.MagicMock()
+    session = snowflake.snowpark.session.Session(mock_connection)
+    mock_connection.get_result_attributes.return_value = [
+        Attribute('"A"', LongType(), False),
+        Attribute('"B"', LongType(), False),
+    ]
+    df = session.table("t").with_column("c", col("a") + 1)
+    states = df._select_statement.column_states
+    filtered = df.filter(col("a") > 1).filter(col("b") > 1).sort(col("a"))
+    filtered_states = filtered._select_statement.column_states
+    # the column states are shared with the original ones until either is modified
+    assert filtered_states is not states
+    assert filtered_states.data is states.data
+    assert [a.name for a in filtered_states.projection] == ['"A"', '"B"', '"C"']
+    assert all(
+        a is not b and a.expr_id != b.expr_id
+        for a, b in zip(filtered_states.projection, states.projection)
+    )
+    filtered_states['"A"'] = states['"B"']
+    assert filtered_states.data is not states.data
+    assert states['"A"'].col_name == '"A"'
+
+
+def test_column_dependencies_derived_lazily():
+    mock_connection = mock.create_autospec(ServerConnection)
+    mock_connection._conn = mock.MagicMock()
+    session = snowflake.snowpark.session.Session(mock_connection)
+    mock_connection.get_result_attributes.return_value = [
+        Attribute('"A"', LongType(), False),
+        Attribute('"B"', LongType(), False),
+    ]
+    df = session.table("t").with_column("c", col("a") + 1)
+    df = df.with_column("d", col("c") + col("b")).with_column("e", col("a") + 2)
+    states = df._select_statement.column_states
+    # the dependencies of a flattened projection are derived when they are inspected
+    assert set(states._lazy_dependencies) == {'"A"', '"B"', '"C"', '"D"', '"E"'}
+    assert states['"D"'].dependent_columns == {'"B"', '"C"'}
+    assert '"D"' not in states._lazy_dependencies
+    assert not states['"E"'].depend_on_same_level
+    # all the dependencies are derived to find the columns that refer to a column
+    assert not states['"C"'].is_referenced_by_same_level_column
+    assert not states._lazy_dependencies
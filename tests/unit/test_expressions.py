@@ -5,11 +5,26 @@
 
 import datetime
 import decimal
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 import pytest
 
-from snowflake.snowpark._internal.analyzer.expression import Attribute, Literal
+from snowflake.snowpark import Column, Session
+from snowflake.snowpark._internal.analyzer.analyzer import (
+    EXPRESSION_HANDLERS,
+    Analyzer,
+    TypeDispatcher,
+)
+from snowflake.snowpark._internal.analyzer.expression import (
+    Attribute,
+    Expression,
+    Literal,
+)
 from snowflake.snowpark._internal.analyzer.snowflake_plan import Query
+from snowflake.snowpark._internal.analyzer.snowflake_plan_node import SnowflakeValues
 from snowflake.snowpark._internal.analyzer.unary_expression import (
     Alias,
     IsNaN,
@@ -21,11 +36,13 @@ from snowflake.snowpark._internal.analyzer.unary_expression import (
 from snowflake.snowpark._internal.analyzer.unary_plan_node import (
     LocalTempView,
     PersistedView,
+    Project,
 )
 from snowflake.snowpark._internal.type_utils import infer_type
 from snowflake.snowpark.exceptions import SnowparkPlanException
 from snowflake.snowpark.functions import col
-from snowflake.snowpark.types import DataType, PandasSeriesType
+from snowflake.snowpark.row import Row
+from snowflake.snowpark.types import DataType, IntegerType, PandasSeriesType
 
 
 def test_literal():
@@ -87,3 +104,125 @@ def test_query():
 
     q = Query("'select 1'", query_id_place_holder="'uuid'", is_ddl_on_temp_object=True)
     assert eval(repr(q)) == q
+
+
+def test_analyze_memoizes_context_free_expressions():
+    analyzer = Analyzer(mock.create_autospec(Session))
+    analyzer.alias_maps_to_use = {}
+    expr = (col("a") + 1).alias("b")._expression
+    sum_expr = expr.child
+    a = sum_expr.left
+    df_aliases = defaultdict(dict)
+    assert analyzer.analyze(expr, df_aliases) == '("A" + 1 :: INT) AS "B"'
+    assert sum_expr._analyzed_sql == {False: '("A" + 1 :: INT)'}
+    assert a._analyzed_sql == {False: '"A"'}
+    # aliases register generated aliases, so they are never memoized
+    assert expr._analyzed_sql is None
+    with mock.patch(
+        "snowflake.snowpark._internal.analyzer.analyzer.binary_arithmetic_expression"
+    ) as mock_binary_arithmetic_expression:
+        assert analyzer.analyze(sum_expr, df_aliases) == '("A" + 1 :: INT)'
+        assert analyzer.analyze(expr, df_aliases) == '("A" + 1 :: INT) AS "B"'
+    mock_binary_arithmetic_expression.assert_not_called()
+    assert analyzer.analyze(sum_expr, df_aliases, parse_local_name=True) == (
+        '("A" + 1 :: INT)'
+    )
+    assert set(sum_expr._analyzed_sql) == {False, True}
+
+    # the SQL of attributes depends on the alias map in use
+    attr = Attribute('"A"', IntegerType())
+    attr_sum = (Column(attr) + 1)._expression
+    assert analyzer.analyze(attr_sum, df_aliases) == '("A" + 1 :: INT)'
+    analyzer.alias_maps_to_use = {attr.expr_id: '"X"'}
+    assert analyzer.analyze(attr_sum, df_aliases) == '("X" + 1 :: INT)'
+    assert attr_sum._analyzed_sql is None
+
+    # so does the SQL of columns of aliased dataframes
+    aliased = (col("df", "a") + 1)._expression
+    df_aliases["df"]['"A"'] = '"A_1"'
+    assert analyzer.analyze(aliased, df_aliases) == '("A_1" + 1 :: INT)'
+    df_aliases["df"]['"A"'] = '"A_2"'
+    assert analyzer.analyze(aliased, df_aliases) == '("A_2" + 1 :: INT)'
+
+
+def test_type_dispatcher():
+    class Base:
+        pass
+
+    class Child(Base):
+        pass
+
+    class GrandChild(Child):
+        pass
+
+    dispatcher = TypeDispatcher()
+    dispatcher.register(Base)(lambda: "base")
+    assert dispatcher.lookup(GrandChild)() == "base"
+    assert dispatcher.lookup(object) is None
+    # registering a handler invalidates the handlers resolved before
+    dispatcher.register(Child)(lambda: "child")
+    assert dispatcher.lookup(GrandChild)() == "child"
+    assert dispatcher.lookup(Base)() == "base"
+
+
+def test_analyze_registered_expression():
+    class Tilde(Expression):
+        def __init__(self, child: Expression) -> None:
+            super().__init__(child)
+            self.child = child
+
+    class DoubleTilde(Tilde):
+        pass
+
+    analyzer = Analyzer(mock.create_autospec(Session))
+    df_aliases = defaultdict(dict)
+    # the handlers registered by this test are removed from the global table afterwards
+    with mock.patch.dict(EXPRESSION_HANDLERS._handlers), mock.patch.dict(
+        EXPRESSION_HANDLERS._resolved
+    ):
+        with pytest.raises(SnowparkPlanException):
+            analyzer.analyze(Tilde(Literal(1)), df_aliases)
+
+        @EXPRESSION_HANDLERS.register(Tilde)
+        def analyze_tilde(analyzer, expr, df_aliases, parse_local_name):
+            return "~" + analyzer.analyze(expr.child, df_aliases, parse_local_name)
+
+        assert analyzer.analyze(Tilde(Literal(1)), df_aliases) == "~1 :: INT"
+        assert analyzer.analyze(DoubleTilde(Tilde(Literal(1))), df_aliases) == (
+            "~~1 :: INT"
+        )
+    assert EXPRESSION_HANDLERS.lookup(Tilde) is None
+    assert EXPRESSION_HANDLERS.lookup(DoubleTilde) is None
+
+
+def test_resolve_plans_concurrently():
+    session = mock.create_autospec(Session)
+    session._cte_optimization_enabled = False
+    analyzer = Analyzer(session)
+    num_threads = 4
+    # all threads resolve their aliases at the same time
+    barrier = threading.Barrier(num_threads)
+    do_analyze = analyzer.do_analyze
+
+    def analyze_in_step(expr, *args, **kwargs):
+        if not isinstance(expr, Alias):
+            return do_analyze(expr, *args, **kwargs)
+        barrier.wait(timeout=10)
+        sql = do_analyze(expr, *args, **kwargs)
+        barrier.wait(timeout=10)
+        return sql
+
+    def resolve(i):
+        attr = Attribute(f'"A{i}"', IntegerType())
+        plan = analyzer.resolve(
+            Project([Alias(attr, f"B{i}")], SnowflakeValues([attr], [Row(i)]))
+        )
+        return plan, attr
+
+    with mock.patch.object(analyzer, "do_analyze", side_effect=analyze_in_step):
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            results = list(executor.map(resolve, range(num_threads)))
+    for i, (plan, attr) in enumerate(results):
+        # every plan only has the aliases it generated
+        assert plan.expr_to_alias == {attr.expr_id: f'"B{i}"'}
+        assert plan.queries[-1].sql.startswith(f' SELECT "A{i}" AS "B{i}" FROM')
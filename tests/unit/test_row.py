@@ -310,3 +310,44 @@ def test_case_sensitive():
         Employee = (
             Row._builder.build("'name'", "salary").set_case_sensitive(False).to_row()
         )
+
+
+@pytest.mark.parametrize("case_sensitive", [True, False])
+def test_row_type(case_sensitive):
+    row_type = (
+        Row._builder.build("a", "B", "c")
+        .set_case_sensitive(case_sensitive)
+        .to_row_type()
+    )
+    rows = [tuple.__new__(row_type, (i, i + 1, i + 2)) for i in range(3)]
+    row = rows[1]
+    # the field metadata is shared by the rows instead of stored in each of them
+    assert all(not r.__dict__ for r in rows)
+    assert isinstance(row, Row)
+    assert row == Row(1, 2, 3) == (1, 2, 3)
+    assert row == Row(a=1, B=2, c=3)
+    assert row[0] == 1 and row[1:] == Row(2, 3)
+    b = "B" if case_sensitive else "b"
+    assert row[b] == 2 and getattr(row, b) == 2 and b in row
+    if not case_sensitive:
+        assert row["B"] == 2 and row.B == 2
+    with pytest.raises(KeyError):
+        row["d"]
+    with pytest.raises(AttributeError):
+        row.d
+    assert repr(row) == f"Row(a=1, {b}=2, c=3)"
+    assert row.as_dict() == {"a": 1, b: 2, "c": 3}
+    restored = pickle.loads(pickle.dumps(row))
+    assert restored == row and restored._fields == row._fields
+    assert copy(row) == row
+    assert not rows[0].__dict__
+
+    rows[2]._fields = ["x", "y", "y"]
+    assert rows[2]["x"] == 2
+    with pytest.raises(KeyError):
+        rows[2]["a"]
+    assert rows[0]["a"] == 0
+
+    dup_row = tuple.__new__(Row._builder.build("a", "a").to_row_type(), (1, 2))
+    assert dup_row["a"] == 1
+    assert repr(dup_row) == "Row(a=1, a=2)"
@@ -2,15 +2,31 @@
 # Copyright (c) 2012-2024 Snowflake Computing Inc. All rights reserved.
 #
 
+import gc
 import io
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
 
+from snowflake.connector.cursor import ResultMetadata
+from snowflake.connector.errors import NotSupportedError
 from snowflake.connector.network import ReauthenticationRequest
 from snowflake.snowpark import Session
+from snowflake.snowpark._internal.analyzer.expression import Attribute
+from snowflake.snowpark._internal.analyzer.schema_utils import DescribeQueryCache
 from snowflake.snowpark._internal.analyzer.snowflake_plan import Query, SnowflakePlan
+from snowflake.snowpark._internal.result_cache import (
+    ResultCache,
+    get_written_table_name,
+)
+from snowflake.snowpark._internal.server_connection import (
+    _arrow_table_to_pandas,
+    _fetch_result_batches,
+    _get_fixed_column_scales,
+)
 from snowflake.snowpark.exceptions import (
     SnowparkFetchDataException,
     SnowparkQueryCancelledException,
@@ -19,6 +35,9 @@ from snowflake.snowpark.exceptions import (
     SnowparkUploadFileException,
     SnowparkUploadUdfFileException,
 )
+from snowflake.snowpark.query_history import QueryRecord
+from snowflake.snowpark.row import Row
+from snowflake.snowpark.types import LongType
 
 
 def test_wrap_exception(mock_server_connection):
@@ -95,7 +114,7 @@ def test_run_query_exceptions(mock_server_connection, caplog):
     mock_server_connection._cursor.query = "fake query"
     with mock.patch.object(
         mock_server_connection._cursor,
-        "fetch_pandas_all",
+        "fetch_arrow_all",
         side_effect=KeyboardInterrupt("fake exception"),
     ):
         with pytest.raises(KeyboardInterrupt, match="fake exception"):
@@ -103,7 +122,7 @@ def test_run_query_exceptions(mock_server_connection, caplog):
 
     with mock.patch.object(
         mock_server_connection._cursor,
-        "fetch_pandas_all",
+        "fetch_arrow_all",
         side_effect=BaseException("fake exception"),
     ):
         with pytest.raises(
@@ -139,3 +158,508 @@ def test_get_result_set_exception(mock_server_connection):
     with mock.patch.object(mock_server_connection, "run_query", return_value=None):
         with pytest.raises(SnowparkSQLException, match="doesn't return a ResultSet"):
             mock_server_connection.get_result_set(fake_plan, block=False)
+
+
+def test_describe_cache(mock_server_connection):
+    mock_server_connection._conn.database = "DB"
+    mock_server_connection._conn.schema = "SCHEMA"
+    mock_server_connection._conn.role = "ROLE"
+    with mock.patch(
+        "snowflake.snowpark._internal.server_connection.run_new_describe",
+        return_value=[],
+    ) as mock_describe, mock.patch(
+        "snowflake.snowpark._internal.server_connection.convert_result_meta_to_attribute",
+        return_value=[Attribute('"A"', LongType())],
+    ):
+        # disabled by default
+        mock_server_connection.get_result_attributes("select 1")
+        mock_server_connection.get_result_attributes("select 1")
+        assert mock_describe.call_count == 2
+        assert mock_server_connection._describe_cache.info().current_size == 0
+
+        mock_server_connection._describe_cache.enabled = True
+        first = mock_server_connection.get_result_attributes("select 1")
+        second = mock_server_connection.get_result_attributes(" select 1 ")
+        assert mock_describe.call_count == 3
+        assert [(a.name, a.datatype) for a in first] == [
+            (a.name, a.datatype) for a in second
+        ]
+        # cached attributes are copied so plans don't share expression ids
+        assert first[0].expr_id != second[0].expr_id
+        assert mock_server_connection._describe_cache.info() == (1, 1, 1024, 1)
+
+        # a different schema is a different cache entry
+        mock_server_connection._conn.schema = "OTHER_SCHEMA"
+        mock_server_connection.get_result_attributes("select 1")
+        assert mock_describe.call_count == 4
+
+        # DDL on generated temp objects doesn't invalidate the cache
+        mock_server_connection.run_query(
+            "create temp table t(a int)", is_ddl_on_temp_object=True
+        )
+        assert mock_server_connection._describe_cache.info().current_size == 2
+        mock_server_connection.run_query("drop table t")
+        assert mock_server_connection._describe_cache.info().current_size == 0
+
+
+def test_describe_cache_eviction():
+    cache = DescribeQueryCache(max_size=2)
+    cache.put("a", [Attribute('"A"', LongType())])
+    cache.put("b", [Attribute('"B"', LongType())])
+    assert cache.get("a") is not None
+    cache.put("c", [Attribute('"C"', LongType())])
+    # "b" is the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.info() == (3, 1, 2, 2)
+
+
+def test_result_cache(mock_server_connection):
+    fake_session = mock.create_autospec(Session)
+    fake_session._generate_new_action_id.return_value = 1
+    fake_session._last_canceled_id = 0
+    fake_session._conn = mock_server_connection
+    fake_session._cte_optimization_enabled = False
+
+    def plan(sql):
+        return SnowflakePlan(
+            queries=[Query(sql)], schema_query=sql, session=fake_session
+        )
+
+    listener = mock.Mock()
+    mock_server_connection.add_query_listener(listener)
+    with mock.patch.object(
+        mock_server_connection,
+        "_to_data_or_iter",
+        return_value={"sfqid": "id", "data": [(1,)]},
+    ) as mock_fetch, mock.patch(
+        "snowflake.snowpark._internal.server_connection.get_new_description",
+        return_value=[ResultMetadata("A", 0, None, None, None, None, True)],
+    ):
+        # disabled by default
+        mock_server_connection.execute(plan("select * from t"))
+        mock_server_connection.execute(plan("select * from t"))
+        assert mock_fetch.call_count == 2
+
+        mock_server_connection._result_cache.enabled = True
+        first = mock_server_connection.execute(plan("select * from t"))
+        second = mock_server_connection.execute(plan("select * from t"))
+        assert mock_fetch.call_count == 3
+        assert first == second == [Row(A=1)]
+        assert first is not second
+        listener._add_cached_query.assert_called_once_with(
+            QueryRecord("id", "select * from t")
+        )
+        # iterators and writes are not cached
+        list(mock_server_connection.execute(plan("select * from t"), to_iter=True))
+        mock_server_connection.execute(plan("insert into s select * from u"))
+        mock_server_connection.execute(plan("select * from u"))
+        assert mock_fetch.call_count == 6
+        assert mock_server_connection._result_cache.info()[:2] == (1, 2)
+        assert mock_server_connection._result_cache.info().num_entries == 2
+
+        # only the results of the queries on the written table are invalidated
+        mock_server_connection.run_query('update db.sch."T" set a = 1')
+        assert mock_server_connection._result_cache.info().num_entries == 1
+        mock_server_connection.execute(plan("select * from u"))
+        assert mock_fetch.call_count == 7
+        # DDL on generated temp objects doesn't invalidate the cache
+        mock_server_connection.run_query(
+            "create temp table u(a int)", is_ddl_on_temp_object=True
+        )
+        assert mock_server_connection._result_cache.info().num_entries == 1
+        mock_server_connection.run_query("alter session set timezone = 'UTC'")
+        assert mock_server_connection._result_cache.info().num_entries == 0
+
+
+def test_result_cache_eviction():
+    cache = ResultCache(ttl=60, max_size=2000)
+    row = (1, "a")
+    cache.put("a", [row] * 5, "id1", ["select a"])
+    cache.put("b", [row] * 5, "id2", ["select b"])
+    assert cache.get("a") == ([row] * 5, "id1", "select a")
+    cache.put("c", [row] * 5, "id3", ["select c"])
+    # "b" is the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.info().num_entries == 2
+    assert cache.info().current_size <= 2000
+    # a result that's larger than the cache is not cached
+    cache.put("d", [row] * 100, "id4", ["select d"])
+    assert cache.get("d") is None
+
+    with mock.patch(
+        "snowflake.snowpark._internal.result_cache.time.monotonic",
+        return_value=time.monotonic() + 61,
+    ):
+        assert cache.get("a") is None
+    assert cache.info().num_entries == 1
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("insert into db.sch.t select 1", "t"),
+        ('INSERT OVERWRITE INTO "My.Table" VALUES (1)', '"My.Table"'),
+        ("update t set a = 1", "t"),
+        ("delete from t where a = 1", "t"),
+        ("merge into t using s on t.a = s.a", "t"),
+        ("copy into t from @stage", "t"),
+        ("copy into @stage from t", None),
+        ("create or replace temporary table if not exists t (a int)", "t"),
+        ("truncate table t", "t"),
+        ("alter session set timezone = 'UTC'", None),
+        ("insert into t select 1; insert into s select 1", None),
+        ("alter table t add column b int", "t"),
+        # swapping or renaming a table changes two tables
+        ("alter table t swap with s", None),
+        ('ALTER TABLE IF EXISTS db.sch."T" RENAME TO s', None),
+    ],
+)
+def test_get_written_table_name(query, expected):
+    assert get_written_table_name(query) == expected
+
+
+def test_result_cache_invalidate():
+    cache = ResultCache()
+
+    def fill():
+        cache.put("t", [], "id1", ["select * from t"])
+        cache.put("s", [], "id2", ["select * from s"])
+        cache.put("stage", [], "id3", ["select $1 from @stage"])
+
+    fill()
+    cache.invalidate("select * from t")
+    cache.invalidate("list @stage")
+    assert cache.info().num_entries == 3
+    cache.invalidate("insert into t select 1")
+    assert cache.get("t") is None
+    assert cache.info().num_entries == 2
+    # PUT changes the files of a stage
+    cache.invalidate("put file:///tmp/data.csv @stage")
+    assert cache.info().num_entries == 0
+    # swapping t with s changes s as well
+    fill()
+    cache.invalidate("alter table t swap with s")
+    assert cache.info().num_entries == 0
+    fill()
+    cache.invalidate_table('"S"')
+    assert [cache.get(k) is None for k in ("t", "s", "stage")] == [False, True, False]
+
+
+def test_pipelined_execution(mock_server_connection):
+    fake_session = mock.create_autospec(Session)
+    fake_session._generate_new_action_id.return_value = 1
+    fake_session._last_canceled_id = 0
+    fake_session._conn = mock_server_connection
+    fake_session._cte_optimization_enabled = False
+    scan = Query("select * from table(result_scan('placeholder'))")
+    fake_plan = SnowflakePlan(
+        queries=[
+            # a line comment doesn't comment out the next statement
+            Query("create temp file format ff -- comment", is_ddl_on_temp_object=True),
+            Query("create temp table t", is_ddl_on_temp_object=True),
+            Query("show tables", query_id_place_holder="placeholder"),
+            scan,
+        ],
+        schema_query="fake schema query",
+        post_actions=[Query("drop file format ff", is_ddl_on_temp_object=True)],
+        session=fake_session,
+    )
+    mock_server_connection._pipelined_execution_enabled = True
+    with mock.patch.object(
+        mock_server_connection, "run_query", return_value={"sfqid": "id", "data": []}
+    ) as mock_run_query, mock.patch(
+        "snowflake.snowpark._internal.server_connection.get_new_description"
+    ):
+        mock_server_connection.get_result_set(fake_plan)
+        mock_server_connection.get_result_set(fake_plan)
+    # the pre-queries are merged, but the query whose id is referenced is not
+    assert [c.args[0] for c in mock_run_query.call_args_list[:3]] == [
+        "create temp file format ff -- comment;\ncreate temp table t",
+        "show tables",
+        "select * from table(result_scan('id'))",
+    ]
+    assert [c.kwargs["num_statements"] for c in mock_run_query.call_args_list[:3]] == [
+        2,
+        None,
+        None,
+    ]
+    # the post action is deferred only once and not run after each action
+    assert mock_run_query.call_count == 6
+    assert list(mock_server_connection._pending_post_actions) == ["drop file format ff"]
+
+    mock_server_connection.flush_post_actions()
+    mock_server_connection._cursor.execute.assert_called_once_with(
+        "drop file format ff",
+        num_statements=1,
+        _statement_params={"SNOWPARK_SKIP_TXN_COMMIT_IN_DDL": True},
+    )
+    assert not mock_server_connection._pending_post_actions
+
+    # deferred post actions are submitted asynchronously once there are enough of them
+    mock_server_connection._cursor.execute_async.return_value = {"queryId": "drops"}
+    mock_server_connection._defer_post_actions(
+        [Query(f"drop table t{i}", is_ddl_on_temp_object=True) for i in range(20)]
+    )
+    mock_server_connection._cursor.execute_async.assert_called_once()
+    assert mock_server_connection._cursor.execute_async.call_args.args[0] == ";\n".join(
+        f"drop table t{i}" for i in range(20)
+    )
+    assert mock_server_connection._inflight_post_actions["drop table t0"] == "drops"
+    # the actions of a submitted query that is still running are kept
+    mock_server_connection._conn.is_still_running.return_value = True
+    mock_server_connection._cursor.execute_async.return_value = {"queryId": "drops2"}
+    mock_server_connection._defer_post_actions(
+        [Query(f"drop table s{i}", is_ddl_on_temp_object=True) for i in range(20)]
+    )
+    assert mock_server_connection._cursor.execute_async.call_count == 2
+    mock_server_connection._conn.get_query_status.assert_called_once_with("drops")
+    # a plan that recreates an object waits for the submitted drop
+    mock_server_connection._cancel_deferred_post_actions(
+        [Query("drop table t0", is_ddl_on_temp_object=True)]
+    )
+    mock_server_connection._cursor.get_results_from_sfqid.assert_called_once_with(
+        "drops"
+    )
+    # the other actions of the finished query are forgotten as well
+    assert set(mock_server_connection._inflight_post_actions.values()) == {"drops2"}
+
+
+def test_prune_inflight_post_actions(mock_server_connection, caplog):
+    conn = mock_server_connection._conn
+    conn.get_query_status.side_effect = lambda query_id: query_id
+    conn.is_still_running.side_effect = lambda status: status == "running"
+    conn.is_an_error.side_effect = lambda status: status.startswith("failed")
+    query_ids = iter(["running", *(f"failed{i}" for i in range(10))])
+    mock_server_connection._cursor.execute_async.side_effect = lambda *_, **__: {
+        "queryId": next(query_ids)
+    }
+    with caplog.at_level(logging.WARNING):
+        for i in range(11):
+            mock_server_connection._defer_post_actions(
+                [
+                    Query(f"drop table t{i}_{j}", is_ddl_on_temp_object=True)
+                    for j in range(20)
+                ]
+            )
+            # only the actions of the queries that haven't finished are kept
+            assert len(set(mock_server_connection._inflight_post_actions.values())) == (
+                1 if i == 0 else 2
+            )
+    assert mock_server_connection._cursor.execute_async.call_count == 11
+    assert set(mock_server_connection._inflight_post_actions.values()) == {
+        "running",
+        "failed9",
+    }
+    assert len(mock_server_connection._inflight_post_actions) == 40
+    # the failed queries are logged when they are pruned
+    assert "Failed to run deferred post actions failed0" in caplog.text
+    assert "Failed to run deferred post actions failed8" in caplog.text
+    assert "failed9" not in caplog.text
+
+
+def test_drop_temp_object_when_unreferenced(mock_server_connection):
+    class Owner:
+        pass
+
+    drop_query = Query("drop table if exists t", is_ddl_on_temp_object=True)
+    owner1, owner2, owner3 = Owner(), Owner(), Owner()
+    mock_server_connection.drop_temp_object_when_unreferenced(
+        drop_query, [owner1, owner2]
+    )
+    # an owner added later, e.g. by copying a table, keeps the object alive as well
+    mock_server_connection.drop_temp_object_when_unreferenced(drop_query, [owner3])
+
+    del owner1, owner2
+    gc.collect()
+    mock_server_connection.flush_post_actions()
+    mock_server_connection._cursor.execute.assert_not_called()
+
+    del owner3
+    gc.collect()
+    mock_server_connection.flush_post_actions()
+    mock_server_connection._cursor.execute.assert_called_once_with(
+        "drop table if exists t",
+        num_statements=1,
+        _statement_params={"SNOWPARK_SKIP_TXN_COMMIT_IN_DDL": True},
+    )
+    assert not mock_server_connection._temp_object_owners
+
+
+def test_flush_post_actions_outside_lock(mock_server_connection):
+    lock_acquired = []
+
+    def try_lock():
+        if mock_server_connection._post_actions_lock.acquire(timeout=5):
+            mock_server_connection._post_actions_lock.release()
+            return True
+        return False
+
+    def execute_async(query, **kwargs):
+        # actions can be deferred and canceled by other threads while the query is submitted
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lock_acquired.append(executor.submit(try_lock).result())
+        return {"queryId": "drops"}
+
+    mock_server_connection._cursor.execute_async.side_effect = execute_async
+    mock_server_connection._defer_post_actions(
+        [Query(f"drop table t{i}", is_ddl_on_temp_object=True) for i in range(20)]
+    )
+    assert lock_acquired == [True]
+    assert mock_server_connection._inflight_post_actions["drop table t0"] == "drops"
+    assert not mock_server_connection._flushing_post_actions
+
+
+def test_schedule_single_flush_for_collected_owners(mock_server_connection):
+    refs = [lambda: None]
+    with mock.patch("threading.Thread") as mock_thread:
+        for i in range(30):
+            mock_server_connection._on_temp_object_owner_collected(
+                Query(f"drop table t{i}", is_ddl_on_temp_object=True), refs
+            )
+        # a flush is only scheduled once there are enough unreferenced objects, and only
+        # once until it starts
+        assert mock_thread.call_count == 1
+        mock_server_connection._run_scheduled_flush()
+        mock_server_connection._on_temp_object_owner_collected(
+            Query("drop table s", is_ddl_on_temp_object=True), refs
+        )
+        assert mock_thread.call_count == 1
+        for i in range(20):
+            mock_server_connection._on_temp_object_owner_collected(
+                Query(f"drop table s{i}", is_ddl_on_temp_object=True), refs
+            )
+        assert mock_thread.call_count == 2
+
+
+def test_to_iter_reads_result_batches(mock_server_connection):
+    results_cursor = mock_server_connection._conn.cursor()
+    results_cursor.sfqid = "id"
+    batches = [mock.MagicMock(), mock.MagicMock()]
+    batches[0].create_iter.return_value = iter([(1,), (2,)])
+    batches[1].create_iter.return_value = iter([(3,)])
+    results_cursor.get_result_batches.return_value = batches
+    result = mock_server_connection._to_data_or_iter(results_cursor, to_iter=True)
+    assert result["sfqid"] == "id"
+    # the result is not scanned again
+    results_cursor.execute.assert_not_called()
+    assert list(result["data"]) == [(1,), (2,), (3,)]
+    batches[1].create_iter.assert_called_once_with(connection=results_cursor.connection)
+
+    # errors raised while downloading a batch are surfaced to the caller
+    batches[0].create_iter.return_value = iter([ValueError("download failed")])
+    result = mock_server_connection._to_data_or_iter(results_cursor, to_iter=True)
+    with pytest.raises(ValueError, match="download failed"):
+        next(result["data"])
+
+
+def test_fetch_result_in_parallel(mock_server_connection):
+    results_cursor = mock_server_connection._conn.cursor()
+    results_cursor.sfqid = "id"
+    batches = []
+    for i in range(5):
+        batch = mock.MagicMock()
+        batch.uncompressed_size = 10
+        batch.create_iter.return_value = iter([(i,), (i * 10,)])
+        batches.append(batch)
+    results_cursor.get_result_batches.return_value = batches
+    mock_server_connection._max_result_fetch_workers = 4
+    mock_server_connection._result_fetch_memory_budget = 25
+    result = mock_server_connection._to_data_or_iter(results_cursor)
+    assert result["data"] == [(i,) for j in range(5) for i in (j, j * 10)]
+    results_cursor.fetchall.assert_not_called()
+
+
+def test_fetch_result_batches_memory_budget():
+    submitted = []
+    batches = []
+    for i in range(6):
+        batch = mock.MagicMock()
+        batch.uncompressed_size = 10
+        batch.index = i
+        batches.append(batch)
+
+    def fetch(batch):
+        submitted.append(batch.index)
+        return batch.index
+
+    results = _fetch_result_batches(batches, fetch, 4, 25)
+    # at most two batches fit in the budget, so the third one is not submitted before the
+    # first one is consumed
+    assert next(results) == 0
+    assert 2 not in submitted
+    assert list(results) == [1, 2, 3, 4, 5]
+
+    def failing_fetch(batch):
+        raise ValueError("download failed")
+
+    with pytest.raises(ValueError, match="download failed"):
+        list(_fetch_result_batches(batches, failing_fetch, 4, 25))
+
+
+def test_arrow_table_to_pandas_narrows_fixed_columns():
+    pyarrow = pytest.importorskip("pyarrow")
+    from decimal import Decimal
+
+    decimal_type = pyarrow.decimal128(38, 0)
+    table = pyarrow.table(
+        {
+            "A": pyarrow.array([1, 2], decimal_type),
+            "B": pyarrow.array([1, None], decimal_type),
+            "C": pyarrow.array([10**30, 1], decimal_type),
+            "D": pyarrow.array([Decimal("1.25"), None], pyarrow.decimal128(10, 2)),
+            "E": pyarrow.array([1, 2], decimal_type),
+        }
+    )
+    result_meta = [
+        ResultMetadata(name, 0, None, None, 38, scale, True)
+        for name, scale in zip("ABCDE", [0, 0, 0, 2, 0])
+    ]
+    # E is not a FIXED column
+    result_meta[4] = ResultMetadata("E", 2, None, None, None, None, True)
+    pd_df = _arrow_table_to_pandas(table, _get_fixed_column_scales(result_meta))
+    assert [str(dtype) for dtype in pd_df.dtypes] == [
+        "int64",
+        "float64",
+        "float64",
+        "float64",
+        "object",
+    ]
+    assert pd_df["A"].tolist() == [1, 2]
+    assert pd_df["D"].tolist()[0] == 1.25
+
+
+def test_to_arrow(mock_server_connection):
+    results_cursor = mock_server_connection._conn.cursor()
+    results_cursor.sfqid = "id"
+    table, batches = mock.Mock(), iter([mock.Mock()])
+    results_cursor.fetch_arrow_all.return_value = table
+    results_cursor.fetch_arrow_batches.return_value = batches
+    assert (
+        mock_server_connection._to_data_or_iter(results_cursor, to_arrow=True)["data"]
+        is table
+    )
+    results_cursor.fetch_arrow_all.assert_called_once_with(force_return_table=True)
+    assert (
+        mock_server_connection._to_data_or_iter(
+            results_cursor, to_arrow=True, to_iter=True
+        )["data"]
+        is batches
+    )
+    # the result is not scanned again
+    results_cursor.execute.assert_not_called()
+
+    # non-SELECT statements don't return Arrow results
+    results_cursor.fetch_arrow_all.side_effect = NotSupportedError()
+    results_cursor.fetchall.return_value = [("Statement executed successfully.",)]
+    assert mock_server_connection._to_data_or_iter(results_cursor, to_arrow=True)[
+        "data"
+    ] == [("Statement executed successfully.",)]
+
+    results_cursor.fetch_arrow_all.side_effect = BaseException("fake exception")
+    with pytest.raises(
+        SnowparkFetchDataException, match="Failed to fetch a pyarrow Table"
+    ):
+        mock_server_connection._to_data_or_iter(results_cursor, to_arrow=True)
@@ -4,6 +4,7 @@
 import json
 import logging
 import os
+import re
 from typing import Optional
 from unittest import mock
 from unittest.mock import MagicMock
@@ -31,7 +32,14 @@ from snowflake.snowpark.session import (
     _PYTHON_SNOWPARK_USE_SCOPED_TEMP_OBJECTS_STRING,
     _close_session_atexit,
 )
-from snowflake.snowpark.types import StructField, StructType
+from snowflake.snowpark.types import (
+    ArrayType,
+    IntegerType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+)
 
 
 def test_aliases():
@@ -545,3 +553,369 @@ def test_session_builder_app_name_existing_query_tag():
         created_session = builder.getOrCreate()
         m.assert_called_once()
         assert created_session.query_tag == f"tag,APPNAME={app_name}"
+
+
+def test_run_concurrently(mock_server_connection):
+    session = Session(mock_server_connection)
+    cursors = {}
+
+    def action(i):
+        # each action uses its own cursor while it runs
+        cursors[i] = mock_server_connection._cursor
+        return i
+
+    mock_server_connection._conn.cursor.side_effect = lambda: mock.MagicMock()
+    results = session.run_concurrently(
+        [lambda i=i: action(i) for i in range(10)], max_workers=4
+    )
+    assert results == list(range(10))
+    assert all(
+        c is not mock_server_connection._default_cursor for c in cursors.values()
+    )
+    assert len(mock_server_connection._idle_cursors) <= 4
+    # the default cursor is used outside of run_concurrently
+    assert mock_server_connection._cursor is mock_server_connection._default_cursor
+
+    def failing_action():
+        raise ValueError("fake error")
+
+    with pytest.raises(ValueError, match="fake error"):
+        session.run_concurrently([lambda: 1, failing_action])
+
+
+@pytest.mark.skipif(not is_pandas_available, reason="pyarrow is not available")
+def test_create_dataframe_staged_upload(mock_server_connection):
+    import pyarrow.parquet
+
+    from snowflake.snowpark._internal.analyzer.snowflake_plan import (
+        BatchInsertQuery,
+        StagedInsertQuery,
+    )
+
+    session = Session(mock_server_connection)
+    with pytest.raises(ValueError, match="local_data_upload_threshold"):
+        session.local_data_upload_threshold = 0
+    session.local_data_upload_threshold = 1000
+    schema = StructType(
+        [StructField("a", LongType()), StructField("b c", StringType())]
+    )
+
+    # the data isn't uploaded below the threshold
+    insert_query = session.create_dataframe(
+        [[i, str(i)] for i in range(499)], schema=schema
+    )._plan.queries[1]
+    assert type(insert_query) is BatchInsertQuery
+
+    # nothing is encoded or uploaded until the DataFrame runs
+    with mock.patch.object(
+        mock_server_connection, "upload_stream"
+    ) as upload_stream, mock.patch.object(
+        mock_server_connection, "run_query"
+    ) as run_query:
+        insert_query = session.create_dataframe(
+            [[i, str(i)] for i in range(500)], schema=schema
+        )._plan.queries[1]
+    assert isinstance(insert_query, StagedInsertQuery)
+    upload_stream.assert_not_called()
+    run_query.assert_not_called()
+
+    # every run uploads a file of its own and copies it into the table
+    stage_locations = []
+    for _ in range(2):
+        with mock.patch.object(
+            mock_server_connection, "upload_stream"
+        ) as upload_stream, mock.patch.object(
+            mock_server_connection, "run_query"
+        ) as run_query:
+            mock_server_connection.run_staged_insert(insert_query, session)
+        table = pyarrow.parquet.read_table(upload_stream.call_args.args[0])
+        assert table.column_names == ["A", "b c"]
+        assert table.column("A").to_pylist() == list(range(500))
+        stage_location = upload_stream.call_args.args[1]
+        assert "SNOWPARK_TEMP_STAGE_" in stage_location
+        stage_locations.append(stage_location)
+        copy_query = run_query.call_args.args[0]
+        assert copy_query.strip().startswith("COPY  INTO SNOWPARK_TEMP_TABLE_")
+        assert f"{stage_location}/" in copy_query
+    assert stage_locations[0] != stage_locations[1]
+
+    # the rows are inserted with bound parameters if the stage can't be created or the
+    # file can't be uploaded
+    session._stage_created = False
+    with mock.patch.object(
+        mock_server_connection, "upload_stream"
+    ) as upload_stream, mock.patch.object(
+        mock_server_connection,
+        "run_query",
+        side_effect=ProgrammingError("Insufficient privileges to create a stage"),
+    ), mock.patch.object(
+        mock_server_connection, "run_batch_insert"
+    ) as run_batch_insert:
+        mock_server_connection.run_staged_insert(insert_query, session)
+    upload_stream.assert_not_called()
+    run_batch_insert.assert_called_once_with(insert_query.sql, insert_query.rows)
+    with mock.patch.object(
+        mock_server_connection,
+        "upload_stream",
+        side_effect=ProgrammingError("Upload failed"),
+    ), mock.patch.object(mock_server_connection, "run_query"), mock.patch.object(
+        mock_server_connection, "run_batch_insert"
+    ) as run_batch_insert:
+        mock_server_connection.run_staged_insert(insert_query, session)
+    run_batch_insert.assert_called_once_with(insert_query.sql, insert_query.rows)
+
+    # values that can't be converted to Parquet are inserted with bound parameters
+    insert_query = session.create_dataframe(
+        [[i, i] for i in range(500)], schema=schema
+    )._plan.queries[1]
+    with mock.patch.object(
+        mock_server_connection, "upload_stream"
+    ) as upload_stream, mock.patch.object(
+        mock_server_connection, "run_batch_insert"
+    ) as run_batch_insert:
+        mock_server_connection.run_staged_insert(insert_query, session)
+    upload_stream.assert_not_called()
+    run_batch_insert.assert_called_once_with(insert_query.sql, insert_query.rows)
+    session.local_data_upload_threshold = None
+    insert_query = session.create_dataframe(
+        [[i, str(i)] for i in range(500)], schema=schema
+    )._plan.queries[1]
+    assert type(insert_query) is BatchInsertQuery
+
+
+def test_get_local_value_converter():
+    import datetime
+
+    from snowflake.snowpark.session import _get_local_value_converter
+    from snowflake.snowpark.types import DateType, MapType, VariantType
+
+    assert _get_local_value_converter(LongType()) is None
+    assert _get_local_value_converter(StringType()) is None
+    date_converter = _get_local_value_converter(DateType())
+    assert date_converter(datetime.date(2024, 1, 2)) == "2024-01-02"
+    assert date_converter("2024-01-02") == "2024-01-02"
+    assert _get_local_value_converter(VariantType())({"a": b"\x01"}) == '{"a": "01"}'
+    assert _get_local_value_converter(ArrayType())((1, 2)) == "[1, 2]"
+    with pytest.raises(TypeError, match="Cannot cast"):
+        _get_local_value_converter(ArrayType())("a")
+    with pytest.raises(TypeError, match="Cannot cast"):
+        _get_local_value_converter(MapType())([1])
+
+
+@pytest.mark.skipif(not is_pandas_available, reason="pandas is not available")
+def test_write_pandas_invalidates_result_cache(mock_server_connection):
+    session = Session(mock_server_connection)
+    cache = mock_server_connection._result_cache
+    cache.enabled = True
+    cache.put("t", [], "id1", ['select * from "t"'])
+    cache.put("s", [], "id2", ['select * from "s"'])
+    with mock.patch(
+        "snowflake.snowpark.session.write_pandas",
+        return_value=(True, 1, 1, [("file0", "LOADED")]),
+    ):
+        session.write_pandas(pandas.DataFrame({"a": [1]}), "t", auto_create_table=True)
+    # the connector writes the table without going through the session's queries
+    assert cache.get("t") is None
+    assert cache.get("s") is not None
+
+
+@pytest.mark.skipif(not is_pandas_available, reason="pandas is not available")
+def test_write_pandas_pipelined(mock_server_connection):
+    import io
+
+    session = Session(mock_server_connection)
+    session.pipelined_write_pandas_enabled = True
+    pandas_df = pandas.DataFrame({"id": range(5), "name": list("abcde")})
+    uploads, queries = [], []
+
+    def upload_stream(input_stream, stage_location, dest_filename, **kwargs):
+        uploads.append((stage_location, dest_filename, input_stream.getvalue()))
+
+    def run_query(query, **kwargs):
+        queries.append(query)
+        if "INFER_SCHEMA" in query.upper():
+            return {"data": [("name", "TEXT"), ("id", "NUMBER(38, 0)")]}
+        if query.startswith("COPY INTO"):
+            return {"data": [(f"file{i}.parquet", "LOADED") for i in range(3)]}
+        return {"data": []}
+
+    with mock.patch.object(
+        mock_server_connection, "upload_stream", side_effect=upload_stream
+    ), mock.patch.object(mock_server_connection, "run_query", side_effect=run_query):
+        table = session.write_pandas(
+            pandas_df,
+            "T",
+            database="DB",
+            schema="SC",
+            chunk_size=2,
+            auto_create_table=True,
+            overwrite=True,
+        )
+    assert table.table_name == '"DB"."SC"."T"'
+    # the chunks are streamed to the same directory of the session stage
+    assert [name for _, name, _ in uploads] == [f"file{i}.parquet" for i in range(3)]
+    assert len({location for location, _, _ in uploads}) == 1
+    stage_location = uploads[0][0]
+    assert "SNOWPARK_TEMP_STAGE_" in stage_location
+    assert [len(pandas.read_parquet(io.BytesIO(data))) for *_, data in uploads] == [
+        2,
+        2,
+        1,
+    ]
+    create_table, copy_into = (
+        q for q in queries if q.startswith(("CREATE  TABLE", "COPY INTO"))
+    )
+    assert create_table.startswith(
+        'CREATE  TABLE IF NOT EXISTS "DB"."SC"."SNOWPARK_TEMP_TABLE_'
+    )
+    assert create_table.endswith('("id" NUMBER(38, 0), "name" TEXT)')
+    assert copy_into.startswith(f'COPY INTO {create_table.split()[5]} ("id","name")')
+    assert (
+        f'FROM (SELECT $1:"id"::NUMBER(38, 0),$1:"name"::TEXT FROM \'{stage_location}/\')'
+        in copy_into
+    )
+    assert copy_into.endswith("PURGE=TRUE ON_ERROR='abort_statement'")
+    # the new table replaces the existing one
+    assert queries[-2] == ' DROP  TABLE  If  EXISTS "DB"."SC"."T"'
+    assert (
+        queries[-1] == f'ALTER TABLE {create_table.split()[5]} RENAME TO "DB"."SC"."T"'
+    )
+
+
+def test_upload_streams_bounded(mock_server_connection):
+    uploaded, in_memory = [], []
+
+    def streams():
+        for i in range(20):
+            # the streams that are produced and not uploaded yet
+            in_memory.append(i + 1 - len(uploaded))
+            yield mock.MagicMock(), f"file{i}"
+
+    with mock.patch.object(
+        mock_server_connection,
+        "upload_stream",
+        side_effect=lambda stream, location, name, **kwargs: uploaded.append(name),
+    ):
+        assert (
+            mock_server_connection.upload_streams(streams(), "@stage", parallel=3) == 20
+        )
+    assert sorted(uploaded) == sorted(f"file{i}" for i in range(20))
+    assert max(in_memory) <= 4
+
+
+@pytest.mark.skipif(not is_pandas_available, reason="pandas is not available")
+def test_write_iter(mock_server_connection):
+    import io
+
+    session = Session(mock_server_connection)
+    schema = StructType(
+        [
+            StructField("id", IntegerType()),
+            StructField("name", StringType()),
+            StructField("tags", ArrayType(StringType())),
+        ]
+    )
+
+    def data():
+        yield from ([i, str(i), ["x"] * i] for i in range(3))
+        yield {"name": "c", "id": 3}
+        yield pandas.DataFrame({"a": [4, 5, 6], "b": ["d", None, "f"], "c": [[]] * 3})
+
+    uploads, queries, progress = [], [], []
+
+    def upload_stream(input_stream, stage_location, dest_filename, **kwargs):
+        uploads.append((stage_location, dest_filename, input_stream.getvalue()))
+
+    def run_query(query, **kwargs):
+        queries.append(query)
+        return {"data": []}
+
+    with mock.patch.object(
+        mock_server_connection, "upload_stream", side_effect=upload_stream
+    ), mock.patch.object(mock_server_connection, "run_query", side_effect=run_query):
+        table = session.write_iter(
+            data(),
+            ["DB", "SC", "T"],
+            schema,
+            mode="overwrite",
+            batch_size=2,
+            progress_callback=progress.append,
+        )
+    assert table.table_name == "DB.SC.T"
+    # the rows are batched until a pandas DataFrame, which is split into batches of its own
+    assert [name for _, name, _ in uploads] == [f"data{i}.parquet" for i in range(4)]
+    stage_location = uploads[0][0]
+    assert "SNOWPARK_TEMP_STAGE_" in stage_location
+    assert [
+        pandas.read_parquet(io.BytesIO(data)).values.tolist() for *_, data in uploads
+    ] == [
+        [[0, "0", "[]"], [1, "1", '["x"]']],
+        [[2, "2", '["x", "x"]'], [3, "c", None]],
+        [[4, "d", "[]"], [5, None, "[]"]],
+        [[6, "f", "[]"]],
+    ]
+    assert progress == [2, 4, 6, 7]
+    # the rows are loaded into a new table with a single COPY INTO, which then replaces
+    # the table
+    new_table_name = re.search(r"DB\.SC\.SNOWPARK_TEMP_TABLE_\w+", queries[-4]).group()
+    assert queries[-4:] == [
+        f' CREATE    TABLE {new_table_name} If  NOT  EXISTS ("ID" INT, "NAME" STRING, '
+        '"TAGS" ARRAY)',
+        f' COPY  INTO {new_table_name}("ID", "NAME", "TAGS") FROM ( SELECT $1:"ID"::INT, '
+        '$1:"NAME"::STRING, TO_ARRAY(PARSE_JSON($1:"TAGS")) '
+        f"FROM '{stage_location}/') "
+        "FILE_FORMAT  = ( TYPE  = PARQUET  BINARY_AS_TEXT = False  )  PURGE = True  ",
+        " DROP  TABLE  If  EXISTS DB.SC.T",
+        f"ALTER TABLE {new_table_name} RENAME TO DB.SC.T",
+    ]
+
+
+@pytest.mark.skipif(not is_pandas_available, reason="pyarrow is not available")
+def test_write_iter_failure(mock_server_connection):
+    session = Session(mock_server_connection)
+    schema = StructType([StructField("id", IntegerType())])
+    queries = []
+
+    def run_query(query, **kwargs):
+        queries.append(query)
+        return {"data": []}
+
+    with mock.patch.object(mock_server_connection, "upload_stream"), mock.patch.object(
+        mock_server_connection, "run_query", side_effect=run_query
+    ):
+        with pytest.raises(ValueError, match="1 fields are required by schema"):
+            session.write_iter([[1], [2, 3]], "T", schema, batch_size=1)
+        with pytest.raises(ValueError, match="Unsupported mode"):
+            session.write_iter([[1]], "T", schema, mode="ignore")
+    # the uploaded files are removed, and the table isn't created
+    assert not any("TABLE" in query for query in queries)
+    assert queries[-1].startswith("REMOVE @")
+    assert "SNOWPARK_TEMP_STAGE_" in queries[-1]
+
+
+@pytest.mark.skipif(not is_pandas_available, reason="pyarrow is not available")
+def test_write_iter_overwrite_failure(mock_server_connection):
+    session = Session(mock_server_connection)
+    schema = StructType([StructField("id", IntegerType())])
+    queries = []
+
+    def run_query(query, **kwargs):
+        queries.append(query)
+        if "COPY" in query:
+            raise ProgrammingError("copy failed")
+        if query.startswith("REMOVE"):
+            raise ProgrammingError("remove failed")
+        return {"data": []}
+
+    with mock.patch.object(mock_server_connection, "upload_stream"), mock.patch.object(
+        mock_server_connection, "run_query", side_effect=run_query
+    ):
+        # the error of the cleanup doesn't replace the error of writing the rows
+        with pytest.raises(ProgrammingError, match="copy failed"):
+            session.write_iter([[1]], "T", schema, mode="overwrite")
+    # the table is kept, and the new table is dropped
+    assert not any(re.search(r"\sT\b", query) for query in queries)
+    assert queries[-2].startswith("REMOVE @")
+    assert re.fullmatch(
+        r" DROP  TABLE  If  EXISTS SNOWPARK_TEMP_TABLE_\w+", queries[-1]
+    )
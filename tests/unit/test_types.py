@@ -10,6 +10,8 @@ from array import array
 from collections import defaultdict
 from datetime import date, datetime, time, timezone
 from decimal import Decimal
+from functools import reduce
+from unittest import mock
 
 import pytest
 
@@ -35,6 +37,7 @@ from snowflake.snowpark._internal.type_utils import (
     convert_sp_to_sf_type,
     get_number_precision_scale,
     infer_schema,
+    infer_schema_from_rows,
     infer_type,
     merge_type,
     python_type_to_snow_type,
@@ -803,6 +806,37 @@ def test_infer_schema_exceptions():
         infer_schema([IntegerType()])
 
 
+def test_infer_schema_from_rows():
+    rows = [
+        [1, None, None],
+        (2, "a", None),
+        [3, "b", None],
+        [None, "c", None],
+        [4, "d", []],
+        [5, "e", ["a"]],
+    ]
+    with mock.patch(
+        "snowflake.snowpark._internal.type_utils.infer_schema", wraps=infer_schema
+    ) as wrapped_infer_schema:
+        schema = infer_schema_from_rows(rows * 100, ["a", "b", "c"])
+    assert schema == reduce(
+        merge_type, (infer_schema(row, ["a", "b", "c"]) for row in rows * 100)
+    )
+    assert schema == StructType(
+        [
+            StructField("a", LongType(), True),
+            StructField("b", StringType(), True),
+            StructField("c", ArrayType(StringType()), True),
+        ]
+    )
+    # only the first row of every combination of scalar types is inferred, and the rows
+    # with lists are always inferred
+    assert wrapped_infer_schema.call_count == 3 + 2 * 100
+
+    with pytest.raises(TypeError, match="Cannot merge type"):
+        infer_schema_from_rows([[1]] * 100 + [["a"]])
+
+
 def test_string_type_eq():
     st0 = StringType()
     st1 = StringType(1)